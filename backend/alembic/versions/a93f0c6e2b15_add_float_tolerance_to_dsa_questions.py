@@ -0,0 +1,58 @@
+"""Add float_tolerance to dsa_questions and normalise stored expected outputs
+
+Revision ID: a93f0c6e2b15
+Revises: d8b4e2f61a07
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93f0c6e2b15'
+down_revision: Union[str, Sequence[str], None] = 'd8b4e2f61a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _normalize(text: str) -> str:
+    # Same rule as app.utils.output_compare.normalize_expected at the time of writing.
+    return "\n".join(line.rstrip() for line in text.strip().splitlines())
+
+
+def _normalized_json(cases: list[dict] | None) -> str | None:
+    if cases is None:
+        return None
+    return json.dumps(
+        [{**case, 'expected_stdout': _normalize(case.get('expected_stdout') or '')} for case in cases]
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('dsa_questions', sa.Column('float_tolerance', sa.Float(), nullable=True))
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.text('SELECT id, test_cases, sample_test_cases FROM dsa_questions'))
+    for question_id, test_cases, sample_test_cases in rows.fetchall():
+        conn.execute(
+            sa.text(
+                'UPDATE dsa_questions SET test_cases = CAST(:test_cases AS JSONB), '
+                'sample_test_cases = CAST(:sample_test_cases AS JSONB) WHERE id = :id'
+            ),
+            {
+                'id': question_id,
+                'test_cases': _normalized_json(test_cases),
+                'sample_test_cases': _normalized_json(sample_test_cases),
+            },
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The normalised expected outputs compare the same either way; leave them.
+    op.drop_column('dsa_questions', 'float_tolerance')
@@ -0,0 +1,35 @@
+"""Add a (topic, difficulty, times_served, id) index to dsa_questions
+
+Revision ID: b7e3d91a4c56
+Revises: e1d6b3f70c92
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3d91a4c56'
+down_revision: Union[str, Sequence[str], None] = 'e1d6b3f70c92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_dsa_questions_topic_difficulty_served',
+        'dsa_questions',
+        ['topic', 'difficulty', 'times_served', 'id'],
+        unique=False,
+    )
+    # Its leading column covers every lookup the topic index served.
+    op.drop_index(op.f('ix_dsa_questions_topic'), table_name='dsa_questions')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_dsa_questions_topic'), 'dsa_questions', ['topic'], unique=False)
+    op.drop_index('ix_dsa_questions_topic_difficulty_served', table_name='dsa_questions')
@@ -0,0 +1,49 @@
+"""Add MinHash signatures to dsa_questions
+
+Revision ID: c2a8f4e61d37
+Revises: b7e3d91a4c56
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c2a8f4e61d37"
+down_revision: Union[str, Sequence[str], None] = "b7e3d91a4c56"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows are signed by app.utils.question_similarity.backfill_signatures
+    # on the next generation run.
+    op.add_column(
+        "dsa_questions", sa.Column("minhash", postgresql.ARRAY(sa.BigInteger()), nullable=True)
+    )
+    op.add_column(
+        "dsa_questions",
+        sa.Column("minhash_bands", postgresql.ARRAY(sa.BigInteger()), nullable=True),
+    )
+    op.create_index(
+        "ix_dsa_questions_minhash_bands",
+        "dsa_questions",
+        ["minhash_bands"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_dsa_questions_minhash_bands", table_name="dsa_questions", postgresql_using="gin"
+    )
+    op.drop_column("dsa_questions", "minhash_bands")
+    op.drop_column("dsa_questions", "minhash")
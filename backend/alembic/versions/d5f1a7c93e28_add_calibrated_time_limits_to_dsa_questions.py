@@ -0,0 +1,34 @@
+"""Add calibrated time limits to dsa_questions
+
+Revision ID: d5f1a7c93e28
+Revises: c2a8f4e61d37
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f1a7c93e28'
+down_revision: Union[str, Sequence[str], None] = 'c2a8f4e61d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('dsa_questions', sa.Column('reference_time_ms', sa.Integer(), nullable=True))
+    op.add_column(
+        'dsa_questions',
+        sa.Column('time_limits_ms', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('dsa_questions', 'time_limits_ms')
+    op.drop_column('dsa_questions', 'reference_time_ms')
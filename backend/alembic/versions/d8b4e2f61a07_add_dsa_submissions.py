@@ -0,0 +1,52 @@
+"""Add dsa_submissions for asynchronous DSA submits
+
+Revision ID: d8b4e2f61a07
+Revises: c5e1f7a93b20
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b4e2f61a07'
+down_revision: Union[str, Sequence[str], None] = 'c5e1f7a93b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'dsa_submissions',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('interaction_id', sa.Integer(), nullable=False),
+        sa.Column('source_code', sa.Text(), nullable=False),
+        sa.Column('language', sa.String(length=50), nullable=False),
+        sa.Column('submitted_at', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column(
+            'created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False
+        ),
+        sa.Column(
+            'updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False
+        ),
+        sa.ForeignKeyConstraint(['interaction_id'], ['dsa_interactions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        op.f('ix_dsa_submissions_interaction_id'), 'dsa_submissions', ['interaction_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_dsa_submissions_interaction_id'), table_name='dsa_submissions')
+    op.drop_table('dsa_submissions')
@@ -0,0 +1,32 @@
+"""Add execution_stats to dsa_interactions
+
+Revision ID: e1d6b3f70c92
+Revises: a93f0c6e2b15
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1d6b3f70c92'
+down_revision: Union[str, Sequence[str], None] = 'a93f0c6e2b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'dsa_interactions',
+        sa.Column('execution_stats', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('dsa_interactions', 'execution_stats')
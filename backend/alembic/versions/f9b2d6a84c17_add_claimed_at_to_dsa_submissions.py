@@ -0,0 +1,28 @@
+"""Add claimed_at to dsa_submissions
+
+Revision ID: f9b2d6a84c17
+Revises: d5f1a7c93e28
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f9b2d6a84c17'
+down_revision: Union[str, Sequence[str], None] = 'd5f1a7c93e28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('dsa_submissions', sa.Column('claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('dsa_submissions', 'claimed_at')
@@ -9,6 +9,9 @@ logger = get_logger(__name__)
 
 
 class DsaQuestionGenerator(BaseAgent[DsaGenerationRequest, DsaGenerationResponse]):
+    # A rejected draft is retried with the same request; it needs a new draft.
+    cache_ttl_s = 0
+
     def __init__(self, llm_provider: LLMProviderInterface) -> None:
         super().__init__(
             llm_provider=llm_provider,
@@ -24,8 +24,12 @@ class LiteLLMProvider(LLMProviderInterface):
     def __init__(
         self, model_name: str = settings.LLM_MODEL_NAME, api_key: str = settings.GROQ_API_KEY
     ):
+        self.model_name = model_name
         self.client = ChatLiteLLM(model=model_name, api_key=api_key)
 
+    def model_id(self) -> str:
+        return self.model_name
+
     async def generate_response(  # type: ignore[override]
         self,
         prompt: BasePromptTemplate[Any],
@@ -12,7 +12,7 @@ Topic      : {topic}
 Difficulty : {difficulty}
 Job Roles  : {job_roles}
 
-Already existing problem titles for this topic (DO NOT duplicate any of these):
+Some existing problem titles for this topic (DO NOT duplicate these or close variants):
 {existing_titles}
 
 ═══════════════════════════════════════════════════
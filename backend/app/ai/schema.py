@@ -97,7 +97,7 @@ class DsaGenerationRequest(BaseModel):
     )
     existing_titles: list[str] = Field(
         default_factory=list,
-        description="Titles of questions already generated for this topic, to avoid duplicates",
+        description="Titles of questions already in the bank for this topic, to avoid duplicates",
     )
 
 
@@ -149,6 +149,13 @@ class DsaGenerationResponse(BaseModel):
             "5000 for medium, 10000 for hard."
         )
     )
+    float_tolerance: float | None = Field(
+        default=None,
+        description=(
+            "Only when the answer is a floating-point number: the accepted absolute/relative "
+            "error, e.g. 1e-6. null when the output must match exactly."
+        ),
+    )
 
 
 # Resume Question Generator
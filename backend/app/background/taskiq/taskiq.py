@@ -1,8 +1,13 @@
 import ssl
 
+from taskiq import TaskiqEvents, TaskiqScheduler, TaskiqState
+from taskiq.schedule_sources import LabelScheduleSource
 from taskiq_redis import ListQueueBroker, RedisAsyncResultBackend
 
 from app.config import settings
+from app.utils.http_clients import shutdown_http_clients, startup_http_clients
+from app.utils.piston_client import warm_runtime_registry
+from app.utils.python_pool import stop_python_pool, warm_python_pool
 
 if settings.REDIS_URL.startswith("rediss://"):
     _ssl_ctx: ssl.SSLContext | None = ssl.create_default_context()
@@ -18,3 +23,23 @@ else:
 broker = ListQueueBroker(url=settings.REDIS_URL, socket_timeout=None).with_result_backend(
     RedisAsyncResultBackend(redis_url=settings.REDIS_URL)
 )
+
+# Sends the tasks declared with @broker.task(schedule=[...]) on time; run
+# exactly one `taskiq scheduler app.background.taskiq.taskiq:scheduler`.
+scheduler = TaskiqScheduler(broker=broker, sources=[LabelScheduleSource(broker)])
+
+
+# Worker-side counterpart of the API lifespan: grading loops reuse the pooled
+# Piston client's warm connections instead of reconnecting per test case, and
+# start with the runtime registry loaded and the Python fork servers running.
+@broker.on_event(TaskiqEvents.WORKER_STARTUP)
+async def _open_http_clients(_: TaskiqState) -> None:
+    await startup_http_clients()
+    await warm_runtime_registry()
+    await warm_python_pool()
+
+
+@broker.on_event(TaskiqEvents.WORKER_SHUTDOWN)
+async def _close_http_clients(_: TaskiqState) -> None:
+    await shutdown_http_clients()
+    await stop_python_pool()
@@ -0,0 +1,139 @@
+"""
+Time-limit calibration of questions already in the bank. The reference
+solution runs on every hidden case, generator-backed ones expanded as at
+grading, and its slowest case sets the question's limits through
+app.utils.time_limits, as generation does for new questions:
+
+    python -m app.background.taskiq.tasks.dsa_calibration          # not yet calibrated
+    python -m app.background.taskiq.tasks.dsa_calibration --all    # every question
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from typing import Any
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import undefer
+
+from app.background.taskiq.taskiq import broker
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.logger import get_logger
+from app.models.dsa_question import DsaQuestion
+from app.utils import time_limits
+from app.utils.case_runner import run_cases
+from app.utils.default_providers import default_compiler_runtime
+from app.utils.generated_cases import GeneratedCaseError, expand_cases
+
+logger = get_logger(__name__)
+
+
+async def _calibrate_one(question_id: int) -> str:
+    """Calibrate one question; "calibrated", or why not."""
+    async with AsyncSessionLocal() as session:
+        question = await session.get(
+            DsaQuestion,
+            question_id,
+            options=[undefer(DsaQuestion.test_cases), undefer(DsaQuestion.sample_solution)],
+        )
+    if question is None:
+        return "missing"
+    if not question.sample_solution:
+        return "no_solution"
+
+    runtime = default_compiler_runtime()
+    try:
+        cases = await expand_cases(question, runtime)
+    except GeneratedCaseError as e:
+        logger.warning("Question %d not calibrated: %s", question_id, e)
+        return "solution_failed"
+    # Bounded by the highest limit calibration can give: a reference slower
+    # than that is a question to fix, not a limit to raise.
+    results = await run_cases(
+        runtime,
+        question.sample_solution,
+        "python",
+        [case.get("stdin", "") for case in cases],
+        settings.DSA_TIME_LIMIT_MAX_MS,
+    )
+    failed = [idx for idx, result in enumerate(results, 1) if not result.ok]
+    if failed:
+        logger.warning(
+            "Question %d not calibrated: reference solution failed cases %s", question_id, failed
+        )
+        return "solution_failed"
+    reference_ms = time_limits.reference_time_ms(results)
+    if reference_ms is None:
+        return "unmeasured"
+
+    limit, limits = time_limits.calibrate(reference_ms)
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(DsaQuestion)
+            .where(DsaQuestion.id == question_id)
+            .values(reference_time_ms=reference_ms, time_limit_ms=limit, time_limits_ms=limits)
+        )
+        await session.commit()
+    logger.info(
+        "Question %d: reference %d ms, time limit %d -> %d ms",
+        question_id,
+        reference_ms,
+        question.time_limit_ms,
+        limit,
+    )
+    return "calibrated"
+
+
+async def run_calibrate_time_limits(recalibrate_all: bool = False) -> dict[str, Any]:
+    """
+    Calibrate every question not calibrated yet, or with `recalibrate_all`
+    every question. Returns {"questions", "outcomes": {outcome: n},
+    "elapsed_s"}; a question whose reference solution fails a case, or
+    whose runtime reports no wall time, keeps its limit.
+    """
+    query = select(DsaQuestion.id).order_by(DsaQuestion.id)
+    if not recalibrate_all:
+        query = query.where(DsaQuestion.reference_time_ms.is_(None))
+    async with AsyncSessionLocal() as session:
+        question_ids = list((await session.execute(query)).scalars())
+
+    started = time.monotonic()
+    outcomes: Counter[str] = Counter()
+    for question_id in question_ids:
+        try:
+            outcomes[await _calibrate_one(question_id)] += 1
+        except Exception:
+            logger.exception("Calibrating question %d crashed", question_id)
+            outcomes["error"] += 1
+    report = {
+        "questions": len(question_ids),
+        "outcomes": dict(outcomes),
+        "elapsed_s": round(time.monotonic() - started, 1),
+    }
+    logger.info("DSA time-limit calibration finished: %s", report)
+    return report
+
+
+@broker.task
+async def calibrate_time_limits_task(recalibrate_all: bool = False) -> dict[str, Any]:
+    """TaskIQ-dispatchable wrapper around run_calibrate_time_limits."""
+    return await run_calibrate_time_limits(recalibrate_all)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibrate DSA question time limits.")
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        dest="recalibrate_all",
+        help="recalibrate questions that already have a calibrated limit too",
+    )
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run_calibrate_time_limits(args.recalibrate_all)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
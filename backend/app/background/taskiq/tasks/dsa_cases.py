@@ -0,0 +1,98 @@
+"""
+Generator-backed hidden cases for questions already in the bank (see
+app.utils.generated_cases). The generator is a Python program that reads a
+seed from stdin and prints one case's input; each seed becomes one hidden
+case, its expected-output digest taken from the question's reference
+solution:
+
+    python -m app.background.taskiq.tasks.dsa_cases 42 stress.py --seed 1 --seed 2
+
+The question's calibrated time limit is reset, since the new cases may be
+its slowest; the next dsa_calibration run measures it again.
+"""
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import undefer
+
+from app.database import AsyncSessionLocal
+from app.logger import get_logger
+from app.models.dsa_question import DsaQuestion
+from app.utils.default_providers import default_compiler_runtime
+from app.utils.generated_cases import generated_case
+
+logger = get_logger(__name__)
+
+
+async def run_add_generated_cases(
+    question_id: int, generator: str, seeds: list[int]
+) -> dict[str, Any]:
+    """
+    Append one generator-backed case per seed to the question's test_cases.
+    Returns {"question_id", "added", "total_cases"}; raises
+    GeneratedCaseError, adding nothing, if the generator or the reference
+    solution fails on any seed.
+    """
+    async with AsyncSessionLocal() as session:
+        question = await session.get(
+            DsaQuestion, question_id, options=[undefer(DsaQuestion.sample_solution)]
+        )
+        if question is None:
+            raise ValueError(f"Question {question_id} not found")
+        if not question.sample_solution:
+            raise ValueError(f"Question {question_id} has no sample_solution")
+        solution = question.sample_solution
+
+    runtime = default_compiler_runtime()
+    added = list(
+        await asyncio.gather(
+            *(generated_case(generator, seed, solution, runtime) for seed in seeds)
+        )
+    )
+
+    async with AsyncSessionLocal() as session:
+        # Locked, so a concurrent edit of the cases is not overwritten.
+        question = (
+            await session.execute(
+                select(DsaQuestion)
+                .where(DsaQuestion.id == question_id)
+                .options(undefer(DsaQuestion.test_cases))
+                .with_for_update()
+            )
+        ).scalar_one()
+        question.test_cases = [*(question.test_cases or []), *added]
+        question.reference_time_ms = None
+        total = len(question.test_cases)
+        await session.commit()
+    logger.info("Question %d: added %d generated cases (%d total)", question_id, len(added), total)
+    return {"question_id": question_id, "added": len(added), "total_cases": total}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Add generator-backed hidden cases to a question.")
+    parser.add_argument("question_id", type=int)
+    parser.add_argument("generator", type=Path, help="Python program printing a case's stdin")
+    parser.add_argument(
+        "--seed",
+        type=int,
+        action="append",
+        dest="seeds",
+        required=True,
+        help="seed for one case; repeat for more cases",
+    )
+    args = parser.parse_args()
+    report = asyncio.run(
+        run_add_generated_cases(
+            args.question_id, args.generator.read_text(encoding="utf-8"), args.seeds
+        )
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,46 @@
-from datetime import datetime
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime, timedelta
 from typing import Any
 
-from sqlalchemy import select, update
-from sqlalchemy.orm import selectinload
+from sqlalchemy import (
+    ColumnElement,
+    CompoundSelect,
+    Integer,
+    Select,
+    String,
+    and_,
+    case,
+    column,
+    false,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    true,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 
 from app.background.taskiq.taskiq import broker
+from app.config import settings
 from app.database import AsyncSessionLocal
+from app.interfaces.compiler_runtime import CompilerRuntimeInterface, ExecutionResult
 from app.logger import get_logger
 from app.models.application import Application, CurrentRound, InterviewSession, InterviewStatus
 from app.models.dsa_question import DsaQuestion
-from app.models.interaction import DsaInteraction
-from app.models.interview import CustomInterview
-from app.utils.piston_client import PistonClient
+from app.models.interaction import DsaInteraction, DsaSubmission, SubmissionStatus
+from app.models.interview import DsaTopic
+from app.utils import execution_telemetry, question_picker, time_limits
+from app.utils.admission import Flow
+from app.utils.case_runner import case_status, run_cases
+from app.utils.case_stats import record_case_outcomes
+from app.utils.default_providers import default_compiler_runtime
+from app.utils.generated_cases import CASES_UNAVAILABLE, GeneratedCaseError, expand_cases
 
 logger = get_logger(__name__)
 
@@ -19,6 +48,123 @@ logger = get_logger(__name__)
 # ── Job 1: Assign DSA questions to an interview session ──────────────────────
 
 
+def _least_served_picks(
+    session_id: int, pending_rows: list[tuple[int, str, str, int]]
+) -> Select[Any]:
+    """
+    (session_id, topic_id, question_id) for each pending (topic_id, topic,
+    difficulty, slot) row that has a matching question, in one query: the
+    questions of each (topic, difficulty) are ranked least served first (id
+    breaks ties) and slot k takes rank k, wrapping around when a topic is
+    listed more often than it has questions — the picks one least-served
+    query per topic, counting its own increments, would make.
+    """
+    pending = values(
+        column("topic_id", Integer),
+        column("topic", String),
+        column("difficulty", String),
+        column("slot", Integer),
+        name="pending",
+    ).data(pending_rows)
+    group = (DsaQuestion.topic, DsaQuestion.difficulty)
+    ranked = (
+        select(
+            DsaQuestion.id,
+            DsaQuestion.topic,
+            DsaQuestion.difficulty,
+            func.row_number()
+            .over(partition_by=group, order_by=(DsaQuestion.times_served, DsaQuestion.id))
+            .label("rank"),
+            func.count().over(partition_by=group).label("choices"),
+        )
+        .where(
+            tuple_(*group).in_(
+                sorted({(topic, difficulty) for _, topic, difficulty, _ in pending_rows})
+            )
+        )
+        .subquery("ranked")
+    )
+    return select(literal(session_id), pending.c.topic_id, ranked.c.id).join_from(
+        pending,
+        ranked,
+        and_(
+            ranked.c.topic == pending.c.topic,
+            ranked.c.difficulty == pending.c.difficulty,
+            ranked.c.rank == (pending.c.slot - 1) % ranked.c.choices + 1,
+        ),
+    )
+
+
+async def _assign_least_served_in_db(
+    db: AsyncSession, session_id: int, pending_rows: list[tuple[int, str, str, int]]
+) -> list[tuple[int | None, int | None]]:
+    """
+    The question picker's fallback: pick and insert in one INSERT … SELECT
+    (_least_served_picks), then count the picks in times_served with one
+    UPDATE. Returns the (topic_id, question_id) pairs inserted.
+    """
+    assigned = await db.execute(
+        insert(DsaInteraction)
+        .from_select(
+            ["session_id", "topic_id", "question_id"],
+            _least_served_picks(session_id, pending_rows),
+        )
+        .returning(DsaInteraction.topic_id, DsaInteraction.question_id)
+    )
+    picks = [(topic_id, question_id) for topic_id, question_id in assigned]
+    served = Counter(question_id for _, question_id in picks)
+    if served:
+        increments = values(column("id", Integer), column("n", Integer), name="served").data(
+            list(served.items())
+        )
+        # Atomic increment: assigns for OTHER sessions can pick the same
+        # questions concurrently; a Python += would lose counts.
+        await db.execute(
+            update(DsaQuestion)
+            .where(DsaQuestion.id == increments.c.id)
+            .values(times_served=DsaQuestion.times_served + increments.c.n)
+            .execution_options(synchronize_session=False)
+        )
+    return picks
+
+
+def _slotted(topics: list[tuple[int, str, str]]) -> list[tuple[int, str, str, int]]:
+    """(topic_id, topic, difficulty, slot) rows, `slot` numbering the topics
+    sharing a (topic, difficulty) in the order given."""
+    slots: Counter[tuple[str, str]] = Counter()
+    rows = []
+    for topic_id, topic, difficulty in topics:
+        slots[(topic, difficulty)] += 1
+        rows.append((topic_id, topic, difficulty, slots[(topic, difficulty)]))
+    return rows
+
+
+async def _assign_picked(
+    db: AsyncSession, session_id: int, chosen: list[tuple[int, int]]
+) -> list[tuple[int | None, int | None]]:
+    """
+    Insert the question picker's (topic_id, question_id) choices in one
+    statement, skipping questions that no longer exist. Returns the pairs
+    inserted.
+    """
+    if not chosen:
+        return []
+    pairs = values(column("topic_id", Integer), column("question_id", Integer), name="chosen").data(
+        chosen
+    )
+    assigned = await db.execute(
+        insert(DsaInteraction)
+        .from_select(
+            ["session_id", "topic_id", "question_id"],
+            select(literal(session_id), pairs.c.topic_id, DsaQuestion.id).join_from(
+                pairs, DsaQuestion, DsaQuestion.id == pairs.c.question_id
+            ),
+        )
+        .returning(DsaInteraction.topic_id, DsaInteraction.question_id)
+    )
+    return [(topic_id, question_id) for topic_id, question_id in assigned]
+
+
 async def run_assign_dsa_questions(session_id: int) -> list[int]:
     """
     For each DsaTopic in the session's interview, pick a matching DsaQuestion
@@ -34,12 +180,18 @@ async def run_assign_dsa_questions(session_id: int) -> list[int]:
     pending" from "nothing will arrive". Runs after the session left the
     questions/DSA rounds (or ended) assign nothing.
 
+    Questions come from app.utils.question_picker (least served per
+    (topic, difficulty), counted in Redis, no shared row written per
+    assignment), or — with DSA_QUESTION_PICKER="db" or Redis down — from
+    _assign_least_served_in_db. Either way the lock is held for a fixed
+    number of statements whatever the topic count.
+
     Returns list of the session's DsaInteraction IDs.
     """
     logger.info("Assigning DSA questions for session=%d", session_id)
 
     async with AsyncSessionLocal() as db:
-        # session → application → interview (with dsa_topics)
+        # session → application → the interview's DSA topics
         locked = await db.execute(
             select(InterviewSession).where(InterviewSession.id == session_id).with_for_update()
         )
@@ -65,57 +217,63 @@ async def run_assign_dsa_questions(session_id: int) -> list[int]:
             logger.error("Application %d not found", session.application_id)
             return []
 
-        result = await db.execute(
-            select(CustomInterview)
-            .options(selectinload(CustomInterview.dsa_topics))
-            .where(CustomInterview.id == app.interview_id)
-        )
-        interview = result.scalar_one_or_none()
-        if not interview:
-            logger.error("Interview %d not found", app.interview_id)
-            return []
-
-        assigned_result = await db.execute(
-            select(DsaInteraction.topic_id).where(DsaInteraction.session_id == session_id)
-        )
-        already_assigned = {row for row in assigned_result.scalars().all() if row is not None}
-
-        for topic in interview.dsa_topics:
-            if topic.id in already_assigned:
-                continue
-
-            q_result = await db.execute(
-                select(DsaQuestion)
+        # Topics of the interview this session has no question for yet, in id
+        # order.
+        pending_result = await db.execute(
+            select(DsaTopic.id, DsaTopic.topic, DsaTopic.difficulty)
+            .where(
+                DsaTopic.interview_id == app.interview_id,
+                ~select(DsaInteraction.id)
                 .where(
-                    DsaQuestion.topic == topic.topic,
-                    DsaQuestion.difficulty == topic.difficulty,
+                    DsaInteraction.session_id == session_id,
+                    DsaInteraction.topic_id == DsaTopic.id,
                 )
-                .order_by(DsaQuestion.times_served.asc())
-                .limit(1)
-            )
-            question = q_result.scalar_one_or_none()
-
-            if not question:
-                logger.warning(
-                    "No DsaQuestion found for topic=%s difficulty=%s — skipping",
-                    topic.topic,
-                    topic.difficulty,
-                )
-                continue
-
-            interaction = DsaInteraction(
-                session_id=session_id,
-                topic_id=topic.id,
-                question_id=question.id,
-            )
-            db.add(interaction)
-            # Atomic increment: assigns for OTHER sessions can pick the same
-            # question concurrently; a Python += would lose counts.
-            await db.execute(
-                update(DsaQuestion)
-                .where(DsaQuestion.id == question.id)
-                .values(times_served=DsaQuestion.times_served + 1)
+                .exists(),
             )
+            .order_by(DsaTopic.id)
+        )
+        pending_topics = [
+            (topic_id, topic, difficulty) for topic_id, topic, difficulty in pending_result
+        ]
+        pending_rows = _slotted(pending_topics)
+
+        if pending_rows:
+            wanted = Counter((topic, difficulty) for _, topic, difficulty, _ in pending_rows)
+            picked = await question_picker.pick(db, wanted)
+            if picked is None:
+                picks = await _assign_least_served_in_db(db, session_id, pending_rows)
+            else:
+                chosen = [
+                    (topic_id, picked[(topic, difficulty)][slot - 1])
+                    for topic_id, topic, difficulty, slot in pending_rows
+                    if picked[(topic, difficulty)]
+                ]
+                picks = await _assign_picked(db, session_id, chosen)
+                if len(picks) < len(chosen):
+                    # The picker handed out questions deleted since its sets
+                    # were built: pick those topics from the DB instead, and
+                    # rebuild their groups next time.
+                    inserted = {topic_id for topic_id, _ in picks}
+                    skipped = _slotted(
+                        [
+                            (topic_id, topic, difficulty)
+                            for topic_id, topic, difficulty, _ in pending_rows
+                            if picked[(topic, difficulty)] and topic_id not in inserted
+                        ]
+                    )
+                    await question_picker.forget(
+                        {(topic, difficulty) for _, topic, difficulty, _ in skipped}
+                    )
+                    picks += await _assign_least_served_in_db(db, session_id, skipped)
+
+            picked_topics = {topic_id for topic_id, _ in picks}
+            for topic_id, topic, difficulty in pending_topics:
+                if topic_id not in picked_topics:
+                    logger.warning(
+                        "No DsaQuestion found for topic=%s difficulty=%s — skipping",
+                        topic,
+                        difficulty,
+                    )
 
         if session.dsa_assigned_at is None:
             session.dsa_assigned_at = datetime.utcnow()
@@ -129,6 +287,8 @@ async def run_assign_dsa_questions(session_id: int) -> list[int]:
         created_ids = list(id_result.scalars().all())
 
     logger.info("Assigned %d DSA questions for session %d", len(created_ids), session_id)
+    # Off the session lock: fold recent picks into times_served, if due.
+    await question_picker.reconcile()
     return created_ids
 
 
@@ -146,7 +306,7 @@ async def run_code(
     """
     Execute code via Piston and return stdout/stderr/exit_code.
     """
-    client = PistonClient()
+    client = default_compiler_runtime()
     result = await client.execute(
         source_code=source_code,
         language=language,
@@ -170,19 +330,138 @@ async def run_code_task(
 # ── Job 3: Evaluate DSA submission ───────────────────────────────────────────
 
 
+async def grade_cases(
+    question: DsaQuestion,
+    source_code: str,
+    language: str,
+    runtime: CompilerRuntimeInterface,
+    flow: Flow,
+    on_case: Callable[[int, str], None] | None = None,
+) -> tuple[list[dict[str, Any]], list[ExecutionResult]]:
+    """
+    The database-free core of run_evaluate_submission: every hidden case of
+    `question` (test_cases and sample_solution loaded) run and judged. Returns
+    [{"case", "status"}, ...] in case order, with the raw results. Raises
+    GeneratedCaseError if a generator-backed case can't be expanded.
+    """
+    try:
+        cases = await expand_cases(question, runtime, flow)
+    except GeneratedCaseError:
+        logger.exception("Hidden cases of question %d unavailable", question.id)
+        raise
+
+    def report(idx: int, result: ExecutionResult) -> None:
+        if on_case is not None:
+            on_case(
+                idx + 1,
+                case_status(
+                    result, cases[idx].get("expected_stdout") or "", question.float_tolerance
+                ),
+            )
+
+    results = await run_cases(
+        runtime,
+        source_code,
+        language,
+        [case.get("stdin", "") for case in cases],
+        time_limits.time_limit_ms(question, language),
+        flow,
+        on_result=report,
+    )
+    case_results: list[dict[str, Any]] = [
+        {
+            "case": idx,
+            "status": case_status(
+                result, case.get("expected_stdout") or "", question.float_tolerance
+            ),
+        }
+        for idx, (case, result) in enumerate(zip(cases, results, strict=True), 1)
+    ]
+    return case_results, results
+
+
+def _record_submission(
+    dsa_interaction_id: int, submitted_at: datetime | None, graded: dict[str, Any]
+) -> CompoundSelect[Any]:
+    """
+    One statement recording a graded run: (attempts, counted, recorded).
+
+    The run counts an attempt only while the interaction's session is still
+    ONGOING in the DSA round; its `graded` columns are stored only if it is
+    the last SUBMITTED run so far (an overlapping run for an older
+    submission may finish grading later — it counts its attempt but keeps
+    the newer solution). The interaction's own session row — correlated,
+    so no other session is touched — is checked FOR SHARE: finish /
+    disqualification, which update it, wait for the write and vice versa,
+    while overlapping submits of one session only wait on the interaction
+    row for as long as the UPDATE takes. When the run is not counted, the
+    unchanged attempts come from the same statement.
+    """
+    in_dsa_round = (
+        select(InterviewSession.id)
+        .where(
+            InterviewSession.id == DsaInteraction.session_id,
+            InterviewSession.status == InterviewStatus.ONGOING.value,
+            InterviewSession.current_round == CurrentRound.DSA.value,
+        )
+        .with_for_update(read=True)
+        .exists()
+    )
+    if submitted_at is None:
+        stored: dict[str, Any] = graded
+        recorded: ColumnElement[bool] = true()
+    else:
+        is_latest = or_(
+            DsaInteraction.last_submitted_at.is_(None),
+            DsaInteraction.last_submitted_at <= submitted_at,
+        )
+        stored = {
+            name: case(
+                (is_latest, literal(value, getattr(DsaInteraction, name).type)),
+                else_=getattr(DsaInteraction, name),
+            )
+            for name, value in {**graded, "last_submitted_at": submitted_at}.items()
+        }
+        # RETURNING sees the new row: a stored run set last_submitted_at to
+        # submitted_at, a superseded one left it later than that.
+        recorded = DsaInteraction.last_submitted_at <= submitted_at
+    written = (
+        update(DsaInteraction)
+        .where(
+            DsaInteraction.id == dsa_interaction_id,
+            in_dsa_round,
+        )
+        .values(attempts=DsaInteraction.attempts + 1, **stored)
+        .returning(
+            DsaInteraction.attempts,
+            true().label("counted"),
+            recorded.label("recorded"),
+        )
+        .cte("written")
+    )
+    return select(written.c.attempts, written.c.counted, written.c.recorded).union_all(
+        select(DsaInteraction.attempts, false(), false()).where(
+            DsaInteraction.id == dsa_interaction_id, ~select(written).exists()
+        )
+    )
+
+
 async def run_evaluate_submission(
     dsa_interaction_id: int,
     source_code: str,
     language: str,
     submitted_at: datetime | None = None,
+    on_case: Callable[[int, str], None] | None = None,
 ) -> dict[str, Any]:
     """
     Run candidate code INDEPENDENTLY against each entry in question.test_cases.
-    Each test case is one Piston invocation; a crash on one case does not affect
-    the others. Per-case time limit comes from question.time_limit_ms.
+    Each test case is one Piston invocation, run concurrently through
+    app.utils.case_runner; a crash on one case does not affect the others.
+    Per-case time limit is the question's for the submission's language
+    (app.utils.time_limits).
 
     Resubmission is allowed and the last SUBMITTED code wins: the final write
-    happens under a row lock, `attempts` counts every recorded grading run, and
+    is one conditional UPDATE (_record_submission), `attempts` counts every recorded grading run, and
     `submitted_at` (captured when the HTTP request arrived) orders overlapping
     runs so a slow-grading older submission cannot overwrite a newer one.
     Nothing is stored — and the summary says recorded=False — if the session
@@ -192,12 +471,16 @@ async def run_evaluate_submission(
 
     Per-case results carry status only, never the hidden case's
     stdin/expected/actual (candidates can resubmit, so echoing outputs would
-    leak the hidden test cases).
+    leak the hidden test cases). `on_case(case, status)`, if given, hears each
+    of them as soon as its run finishes, for the streaming submit endpoint.
 
     Returns a summary of THIS grading run:
         {"case_results": [{"case": 1, "status": "passed"|"failed"|"error"}, ...],
          "passed": int, "total": int, "score": float,
-         "attempts": int, "recorded": bool}
+         "attempts": int, "recorded": bool,
+         "execution_stats": execution_telemetry.summarize() of the runs}
+    The recorded run's execution_stats are also stored on the interaction;
+    they are for operators and never reach the candidate.
     """
     logger.info("Evaluating submission for dsa_interaction=%d", dsa_interaction_id)
 
@@ -207,110 +490,66 @@ async def run_evaluate_submission(
             logger.error("DsaInteraction %d not found", dsa_interaction_id)
             return {}
 
-        question = await db.get(DsaQuestion, interaction.question_id)
+        question = await db.get(
+            DsaQuestion,
+            interaction.question_id,
+            options=[undefer(DsaQuestion.test_cases), undefer(DsaQuestion.sample_solution)],
+        )
         if not question:
             logger.error("DsaQuestion not found for interaction %d", dsa_interaction_id)
             return {}
 
-        cases: list[dict[str, Any]] = question.test_cases or []
-        client = PistonClient()
-        case_results: list[dict[str, Any]] = []
-
-        for idx, case in enumerate(cases, 1):
-            stdin = case.get("stdin", "")
-            expected = case.get("expected_stdout", "").strip()
-
-            result = await client.execute(
-                source_code=source_code,
-                language=language,
-                stdin=stdin,
-                run_timeout_ms=question.time_limit_ms,
-            )
-
-            if result.exit_code != 0:
-                case_results.append({"case": idx, "status": "error"})
-                continue
-
-            case_results.append(
-                {
-                    "case": idx,
-                    "status": "passed" if result.stdout.strip() == expected else "failed",
-                }
-            )
-
+        case_results, results = await grade_cases(
+            question,
+            source_code,
+            language,
+            default_compiler_runtime(),
+            Flow(session_id=interaction.session_id, kind="submit"),
+            on_case,
+        )
         passed = sum(1 for c in case_results if c["status"] == "passed")
         total = len(case_results)
         score = (passed / total) * 10.0 if total > 0 else 0.0
+        execution_stats = execution_telemetry.summarize(results)
 
-        # Re-read session then interaction under row locks (consistent order to
-        # avoid deadlocks) so concurrent grading / finish / disqualification
-        # serialize; populate_existing forces fresh state past the identity map.
-        locked_session = (
-            (
-                await db.execute(
-                    select(InterviewSession)
-                    .where(InterviewSession.id == interaction.session_id)
-                    .with_for_update()
-                    .execution_options(populate_existing=True)
+        # Feed the per-case tallies behind fail-fast dry runs. Committed on its
+        # own, before the recording write below, so its row locks stay short.
+        if not any(result.compile_error for result in results):
+            await record_case_outcomes(db, question.id, [c["status"] for c in case_results])
+            await db.commit()
+
+        attempts, counted, is_latest = (
+            await db.execute(
+                _record_submission(
+                    dsa_interaction_id,
+                    submitted_at,
+                    {
+                        "code": source_code,
+                        "language": language,
+                        "score": score,
+                        "passed_cases": passed,
+                        "total_cases": total,
+                        "execution_stats": execution_stats,
+                    },
                 )
-            ).scalar_one_or_none()
-            if interaction.session_id is not None
-            else None
-        )
-        if (
-            locked_session is None
-            or locked_session.status != InterviewStatus.ONGOING.value
-            or locked_session.current_round != CurrentRound.DSA.value
-        ):
+            )
+        ).one()
+        await db.commit()
+        if not counted:
             logger.warning(
                 "Session left the DSA round while grading interaction %d — result not recorded",
                 dsa_interaction_id,
             )
-            # interaction was read before the Piston loop; re-read the counter
-            # so the response matches what GET /sessions/{id}/dsa shows.
-            fresh_attempts = (
-                await db.execute(
-                    select(DsaInteraction.attempts).where(DsaInteraction.id == dsa_interaction_id)
-                )
-            ).scalar_one()
             return {
                 "case_results": case_results,
                 "passed": passed,
                 "total": total,
                 "score": score,
-                "attempts": fresh_attempts,
+                "attempts": attempts,
                 "recorded": False,
+                "execution_stats": execution_stats,
             }
 
-        locked = await db.execute(
-            select(DsaInteraction)
-            .where(DsaInteraction.id == dsa_interaction_id)
-            .with_for_update()
-            .execution_options(populate_existing=True)
-        )
-        interaction = locked.scalar_one()
-
-        interaction.attempts = interaction.attempts + 1
-        attempts = interaction.attempts
-
-        # Last SUBMITTED wins: an overlapping run for an older submission may
-        # finish grading later — count its attempt but keep the newer solution.
-        is_latest = (
-            submitted_at is None
-            or interaction.last_submitted_at is None
-            or submitted_at >= interaction.last_submitted_at
-        )
-        if is_latest:
-            interaction.code = source_code
-            interaction.language = language
-            interaction.score = score
-            interaction.passed_cases = passed
-            interaction.total_cases = total
-            if submitted_at is not None:
-                interaction.last_submitted_at = submitted_at
-
-        await db.commit()
-
         logger.info(
             "Submission evaluated: %d/%d passed (score=%.1f) for interaction %d "
             "(attempt %d, stored=%s)",
@@ -329,17 +568,100 @@ async def run_evaluate_submission(
         "score": score,
         "attempts": attempts,
         "recorded": is_latest,
+        "execution_stats": execution_stats,
     }
 
 
+async def run_evaluate_tracked_submission(
+    submission_id: int,
+    dsa_interaction_id: int,
+    source_code: str,
+    language: str,
+    submitted_at: datetime | None,
+) -> dict[str, Any]:
+    """
+    run_evaluate_submission() for an asynchronous submit: claims the
+    DsaSubmission row (queued → running), grades, and stores the summary on
+    it (done) or why there is none (failed) for the client polling the
+    handle. A redelivered task does nothing if the submission already
+    finished, or if another worker claimed it less than
+    DSA_SUBMISSION_LEASE_S ago and may still be grading it.
+    """
+    now = datetime.utcnow()
+    lease_expired = now - timedelta(seconds=settings.DSA_SUBMISSION_LEASE_S)
+    async with AsyncSessionLocal() as db:
+        claimed = await db.execute(
+            update(DsaSubmission)
+            .where(
+                DsaSubmission.id == submission_id,
+                or_(
+                    DsaSubmission.status == SubmissionStatus.QUEUED.value,
+                    and_(
+                        DsaSubmission.status == SubmissionStatus.RUNNING.value,
+                        DsaSubmission.claimed_at < lease_expired,
+                    ),
+                ),
+            )
+            .values(status=SubmissionStatus.RUNNING.value, claimed_at=now)
+            .returning(DsaSubmission.id)
+        )
+        await db.commit()
+    if claimed.scalar_one_or_none() is None:
+        logger.warning(
+            "DsaSubmission %d missing, already graded or being graded — skipping", submission_id
+        )
+        return {}
+
+    try:
+        summary = await run_evaluate_submission(
+            dsa_interaction_id, source_code, language, submitted_at
+        )
+    except GeneratedCaseError:
+        # Retrying can't help until the question is fixed.
+        await _finish_submission(submission_id, SubmissionStatus.FAILED, error=CASES_UNAVAILABLE)
+        return {}
+    except Exception:
+        await _finish_submission(submission_id, SubmissionStatus.FAILED, error="Grading failed")
+        raise
+    if not summary:
+        await _finish_submission(
+            submission_id,
+            SubmissionStatus.FAILED,
+            error="This DSA question is no longer available",
+        )
+    else:
+        await _finish_submission(submission_id, SubmissionStatus.DONE, result=summary)
+    return summary
+
+
+async def _finish_submission(
+    submission_id: int,
+    status: SubmissionStatus,
+    result: dict[str, Any] | None = None,
+    error: str | None = None,
+) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(DsaSubmission)
+            .where(DsaSubmission.id == submission_id)
+            .values(status=status.value, result=result, error=error, finished_at=datetime.utcnow())
+        )
+        await db.commit()
+
+
 @broker.task
 async def evaluate_submission_task(
     dsa_interaction_id: int,
     source_code: str,
     language: str,
     submitted_at_iso: str | None = None,
+    submission_id: int | None = None,
 ) -> dict[str, Any]:
     # ISO string rather than datetime so the argument survives JSON transport;
     # omitting it would bypass last-submitted-wins ordering.
     submitted_at = datetime.fromisoformat(submitted_at_iso) if submitted_at_iso else None
+    if submission_id is not None:
+        return await run_evaluate_tracked_submission(
+            submission_id, dsa_interaction_id, source_code, language, submitted_at
+        )
     return await run_evaluate_submission(dsa_interaction_id, source_code, language, submitted_at)
@@ -1,4 +1,34 @@
+"""
+DSA question generation: LLM draft → reference solution checked against
+every case → saved to the bank.
+
+Drafts too close to a bank question (app.utils.question_similarity) are
+rejected before any sandbox time is spent on them; the prompt names only
+DSA_GENERATION_PROMPT_TITLES existing titles, so its size stays flat as the
+bank grows. Validation runs hidden and sample cases in one fail-fast fan-out
+(case_runner.run_cases_until), so a broken draft costs a single sandbox
+call, and the reference solution's timings on it set the saved question's
+time limits (app.utils.time_limits). LLM calls are bounded per process by
+DSA_GENERATION_LLM_CONCURRENCY whatever the caller, and sandbox calls share
+the admission scheduler as background work, so a fill never crowds out live
+interviews.
+
+run_fill_dsa_bank() generates many questions at once — N per (topic,
+difficulty) — and reports throughput and why drafts were rejected:
+
+    python -m app.background.taskiq.tasks.dsa_generation Arrays:easy=5 Graphs:hard=3
+"""
+
+import argparse
+import asyncio
 import json
+import time
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from enum import StrEnum
+from pathlib import Path
+from typing import Any
 
 from sqlalchemy import select
 
@@ -6,140 +36,381 @@ from app.ai.dsa_generator import DsaQuestionGenerator
 from app.ai.lite_llm import LiteLLMProvider
 from app.ai.schema import DsaGenerationRequest, DsaGenerationResponse, TestCase
 from app.background.taskiq.taskiq import broker
+from app.config import settings
 from app.database import AsyncSessionLocal
+from app.interfaces.compiler_runtime import ExecutionResult
 from app.logger import get_logger
 from app.models.dsa_question import DsaQuestion
-from app.utils.piston_client import PistonClient
+from app.utils import time_limits
+from app.utils.case_runner import run_cases_until
+from app.utils.default_providers import default_compiler_runtime
+from app.utils.output_compare import normalize_expected, outputs_match
+from app.utils.question_similarity import (
+    backfill_signatures,
+    bands,
+    find_near_duplicate,
+    signature,
+)
 
 logger = get_logger(__name__)
 
+# One per process, shared by single generations and fills alike.
+_llm_slots = asyncio.Semaphore(settings.DSA_GENERATION_LLM_CONCURRENCY)
+
+
+class GenerationOutcome(StrEnum):
+    SAVED = "saved"
+    LLM_FAILED = "llm_failed"
+    # The reference solution crashed or timed out on a case.
+    SOLUTION_FAILED = "solution_failed"
+    # It ran, but disagreed with a case's expected output.
+    OUTPUT_MISMATCH = "output_mismatch"
+    NEAR_DUPLICATE = "near_duplicate"
+    ERROR = "error"
 
-async def _validate_cases(
-    cases: list[TestCase],
-    solution: str,
-    time_limit_ms: int,
-    label: str,
-    problem_name: str,
-) -> bool:
+
+async def _validate(
+    generated: DsaGenerationResponse,
+) -> tuple[GenerationOutcome | None, int | None]:
     """
-    Run `solution` against EACH case independently. Return True iff every case
-    produces expected_stdout (after normalisation). One crash does not affect others.
+    Run the reference solution against the hidden cases, then the sample
+    cases, each independently and compared exactly as submissions are
+    graded, stopping at the first case that fails. Returns why the draft is
+    rejected (None if every case passed) and, when it passed, the slowest
+    case's wall time to calibrate the time limit from (None if the runtime
+    doesn't report it).
     """
-    client = PistonClient()
-
-    for idx, case in enumerate(cases, 1):
-        result = await client.execute(
-            source_code=solution,
-            language="python",
-            stdin=case.stdin,
-            run_timeout_ms=time_limit_ms,
-        )
+    cases: list[tuple[str, int, TestCase]] = [
+        *(("test_cases", idx, case) for idx, case in enumerate(generated.test_cases, 1)),
+        *(
+            ("sample_test_cases", idx, case)
+            for idx, case in enumerate(generated.sample_test_cases, 1)
+        ),
+    ]
+    failures: list[GenerationOutcome] = []
 
+    def failed(position: int, result: ExecutionResult) -> bool:
+        label, idx, case = cases[position]
         if not result.ok:
             logger.warning(
                 "Validation FAILED ('%s' %s case %d): solution exited %d. stderr=%s",
-                problem_name,
+                generated.problem_name,
                 label,
                 idx,
                 result.exit_code,
                 result.stderr[:200],
             )
-            return False
-
-        if result.stdout.strip() != case.expected_stdout.strip():
+            failures.append(GenerationOutcome.SOLUTION_FAILED)
+            return True
+        if not outputs_match(result.stdout, case.expected_stdout, generated.float_tolerance):
             logger.warning(
                 "Validation FAILED ('%s' %s case %d): output mismatch.\nExpected: %r\nActual  : %r",
-                problem_name,
+                generated.problem_name,
                 label,
                 idx,
-                case.expected_stdout.strip()[:200],
-                result.stdout.strip()[:200],
+                case.expected_stdout[:200],
+                result.stdout[:200],
             )
-            return False
+            failures.append(GenerationOutcome.OUTPUT_MISMATCH)
+            return True
+        return False
+
+    runs = await run_cases_until(
+        default_compiler_runtime(),
+        generated.sample_solution,
+        "python",
+        [case.stdin for _, _, case in cases],
+        failed,
+        run_timeout_ms=generated.time_limit_ms,
+    )
+    if failures:
+        return failures[0], None
+    return None, time_limits.reference_time_ms([run for run in runs if run is not None])
 
-    return True
 
+def _stored_case(case: TestCase) -> dict[str, str]:
+    # Normalised once here rather than on every comparison.
+    return {"stdin": case.stdin, "expected_stdout": normalize_expected(case.expected_stdout)}
 
-async def run_generate_dsa_question(topic: str, difficulty: str, job_roles: list[str]) -> bool:
+
+async def _existing_titles(topic: str, difficulty: str) -> list[str]:
     """
-    Core logic: generate → validate every test case via Piston → save.
-    Callable directly (seeder) or via the TaskIQ task below.
-    Returns True if a question was saved, False otherwise.
+    Up to DSA_GENERATION_PROMPT_TITLES titles of the topic for the prompt,
+    the same difficulty first, newest first: the questions a new draft is
+    likeliest to repeat. Near-duplicates past them are caught after
+    generation instead.
     """
-    logger.info(
-        "DSA generation started: topic=%s difficulty=%s job_roles=%s",
-        topic,
-        difficulty,
-        job_roles,
-    )
-
     async with AsyncSessionLocal() as session:
         result = await session.execute(
-            select(DsaQuestion.problem_name).where(DsaQuestion.topic == topic)
+            select(DsaQuestion.problem_name)
+            .where(DsaQuestion.topic == topic)
+            .order_by((DsaQuestion.difficulty == difficulty).desc(), DsaQuestion.id.desc())
+            .limit(settings.DSA_GENERATION_PROMPT_TITLES)
         )
-        existing_titles = list(result.scalars().all())
+        return list(result.scalars().all())
+
+
+async def _sign_bank() -> None:
+    async with AsyncSessionLocal() as session:
+        signed = await backfill_signatures(session)
+        await session.commit()
+    if signed:
+        logger.info("Computed near-duplicate signatures for %d bank questions", signed)
 
-    logger.debug("Found %d existing titles for topic '%s'", len(existing_titles), topic)
 
+async def _generate_one(
+    topic: str, difficulty: str, job_roles: list[str], existing_titles: Sequence[str]
+) -> tuple[GenerationOutcome, str | None]:
+    """
+    generate → check for near-duplicates → validate → save. Returns the
+    outcome and a title later drafts should avoid: the saved question's, or
+    the bank question a near-duplicate draft repeated.
+    """
     generator = DsaQuestionGenerator(llm_provider=LiteLLMProvider())
     req = DsaGenerationRequest(
         topic=topic,
         difficulty=difficulty,
         job_roles=job_roles,
-        existing_titles=existing_titles,
+        existing_titles=list(existing_titles),
     )
 
-    generated: DsaGenerationResponse | None = await generator.generate(req)
+    async with _llm_slots:
+        generated: DsaGenerationResponse | None = await generator.generate(req)
     if generated is None:
         logger.error("LLM generation returned None for %s/%s", topic, difficulty)
-        return False
+        return GenerationOutcome.LLM_FAILED, None
+
+    sig = signature(generated.problem_name, generated.description)
+    async with AsyncSessionLocal() as session:
+        duplicate = await find_near_duplicate(session, generated.problem_name, sig)
+    if duplicate is not None:
+        logger.warning(
+            "Rejected '%s' [%s/%s]: near-duplicate of '%s' (similarity %.2f)",
+            generated.problem_name,
+            topic,
+            difficulty,
+            *duplicate,
+        )
+        return GenerationOutcome.NEAR_DUPLICATE, duplicate[0]
 
     logger.info(
-        "Generated question: '%s' — validating %d hidden + %d sample cases via Piston...",
+        "Generated question: '%s' — validating %d hidden + %d sample cases...",
         generated.problem_name,
         len(generated.test_cases),
         len(generated.sample_test_cases),
     )
-
-    if not await _validate_cases(
-        generated.test_cases,
-        generated.sample_solution,
-        generated.time_limit_ms,
-        "test_cases",
-        generated.problem_name,
-    ):
-        return False
-
-    if not await _validate_cases(
-        generated.sample_test_cases,
-        generated.sample_solution,
-        generated.time_limit_ms,
-        "sample_test_cases",
-        generated.problem_name,
-    ):
-        return False
+    rejection, reference_ms = await _validate(generated)
+    if rejection is not None:
+        return rejection, None
 
     question = DsaQuestion(
         problem_name=generated.problem_name,
         topic=topic,
         difficulty=difficulty,
         description=generated.description,
-        test_cases=[tc.model_dump() for tc in generated.test_cases],
-        sample_test_cases=[tc.model_dump() for tc in generated.sample_test_cases],
+        test_cases=[_stored_case(tc) for tc in generated.test_cases],
+        sample_test_cases=[_stored_case(tc) for tc in generated.sample_test_cases],
         sample_solution=generated.sample_solution,
         time_limit_ms=generated.time_limit_ms,
+        float_tolerance=generated.float_tolerance,
         job_roles=json.dumps(job_roles),
+        minhash=sig,
+        minhash_bands=bands(sig),
     )
+    if reference_ms is not None:
+        time_limits.apply(question, reference_ms)
 
     async with AsyncSessionLocal() as session:
         session.add(question)
         await session.commit()
 
-    logger.info("Saved question '%s' [%s/%s] ✓", generated.problem_name, topic, difficulty)
-    return True
+    logger.info(
+        "Saved question '%s' [%s/%s] ✓ (time limit %d ms)",
+        generated.problem_name,
+        topic,
+        difficulty,
+        question.time_limit_ms,
+    )
+    return GenerationOutcome.SAVED, generated.problem_name
+
+
+async def run_generate_dsa_question(topic: str, difficulty: str, job_roles: list[str]) -> bool:
+    """
+    Core logic: generate → validate every test case → save.
+    Callable directly or via the TaskIQ task below.
+    Returns True if a question was saved, False otherwise.
+    """
+    logger.info(
+        "DSA generation started: topic=%s difficulty=%s job_roles=%s",
+        topic,
+        difficulty,
+        job_roles,
+    )
+    await _sign_bank()
+    existing_titles = await _existing_titles(topic, difficulty)
+    logger.debug("Found %d existing titles for topic '%s'", len(existing_titles), topic)
+
+    outcome, _ = await _generate_one(topic, difficulty, job_roles, existing_titles)
+    return outcome == GenerationOutcome.SAVED
+
+
+@dataclass
+class _FillTarget:
+    topic: str
+    difficulty: str
+    requested: int
+    attempts: int = 0
+    outcomes: Counter[str] = field(default_factory=Counter)
+
+    def report(self) -> dict[str, Any]:
+        saved = self.outcomes[GenerationOutcome.SAVED]
+        return {
+            "topic": self.topic,
+            "difficulty": self.difficulty,
+            "requested": self.requested,
+            "saved": saved,
+            "attempts": self.attempts,
+            "rejected": {k: v for k, v in self.outcomes.items() if k != GenerationOutcome.SAVED},
+            "rejection_rate": round(1 - saved / self.attempts, 3) if self.attempts else None,
+        }
+
+
+async def run_fill_dsa_bank(
+    targets: Sequence[tuple[str, str, int]], job_roles: list[str]
+) -> dict[str, Any]:
+    """
+    Generate `count` validated questions for each (topic, difficulty,
+    count) target, up to DSA_FILL_CONCURRENCY generations at a time. A
+    rejected draft is retried until the target is met or has used
+    DSA_FILL_MAX_ATTEMPTS_PER_QUESTION x count attempts. Titles saved during
+    the fill, and the bank titles near-duplicate drafts repeated, head the
+    titles later drafts of the same topic and difficulty are told to avoid.
+
+    Returns {"targets": [{"topic", "difficulty", "requested", "saved",
+    "attempts", "rejected": {outcome: n}, "rejection_rate"}, ...], "saved",
+    "attempts", "rejection_rate", "elapsed_s", "questions_per_min"}.
+    """
+    fill = [_FillTarget(topic, difficulty, count) for topic, difficulty, count in targets]
+    await _sign_bank()
+    titles = {(t.topic, t.difficulty): await _existing_titles(t.topic, t.difficulty) for t in fill}
+    queue: asyncio.Queue[_FillTarget] = asyncio.Queue()
+    for target in fill:
+        for _ in range(target.requested):
+            queue.put_nowait(target)
+
+    async def worker() -> None:
+        while True:
+            target = await queue.get()
+            try:
+                target.attempts += 1
+                avoid = titles[(target.topic, target.difficulty)]
+                try:
+                    outcome, title = await _generate_one(
+                        target.topic,
+                        target.difficulty,
+                        job_roles,
+                        avoid[: settings.DSA_GENERATION_PROMPT_TITLES],
+                    )
+                except Exception:
+                    logger.exception(
+                        "DSA generation for %s/%s crashed", target.topic, target.difficulty
+                    )
+                    outcome, title = GenerationOutcome.ERROR, None
+                target.outcomes[outcome] += 1
+                if title is not None and title not in avoid:
+                    avoid.insert(0, title)
+                # Re-queued before this attempt is marked done, so the fill
+                # can't finish while a retry is still to come.
+                if (
+                    outcome != GenerationOutcome.SAVED
+                    and target.attempts
+                    < target.requested * settings.DSA_FILL_MAX_ATTEMPTS_PER_QUESTION
+                ):
+                    queue.put_nowait(target)
+            finally:
+                queue.task_done()
+
+    logger.info(
+        "DSA bank fill started: %s",
+        ", ".join(f"{t.topic}/{t.difficulty} x{t.requested}" for t in fill),
+    )
+    started = time.monotonic()
+    # Workers wait on the queue rather than leave when it is momentarily
+    # empty: another worker's rejected draft may still put a retry on it.
+    workers = [
+        asyncio.create_task(worker())
+        for _ in range(min(settings.DSA_FILL_CONCURRENCY, queue.qsize()))
+    ]
+    try:
+        await queue.join()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+    elapsed = time.monotonic() - started
+
+    saved = sum(t.outcomes[GenerationOutcome.SAVED] for t in fill)
+    attempts = sum(t.attempts for t in fill)
+    report = {
+        "targets": [t.report() for t in fill],
+        "saved": saved,
+        "attempts": attempts,
+        "rejection_rate": round(1 - saved / attempts, 3) if attempts else None,
+        "elapsed_s": round(elapsed, 1),
+        "questions_per_min": round(saved / elapsed * 60, 2) if elapsed else None,
+    }
+    logger.info(
+        "DSA bank fill done: %d/%d saved in %.0fs (%d attempts)",
+        saved,
+        sum(t.requested for t in fill),
+        elapsed,
+        attempts,
+    )
+    return report
 
 
 @broker.task
 async def generate_dsa_question_task(topic: str, difficulty: str, job_roles: list[str]) -> bool:
     """TaskIQ-dispatchable wrapper around run_generate_dsa_question."""
     return await run_generate_dsa_question(topic, difficulty, job_roles)
+
+
+@broker.task
+async def fill_dsa_bank_task(
+    targets: list[tuple[str, str, int]], job_roles: list[str]
+) -> dict[str, Any]:
+    """TaskIQ-dispatchable wrapper around run_fill_dsa_bank."""
+    return await run_fill_dsa_bank(targets, job_roles)
+
+
+def _target(spec: str) -> tuple[str, str, int]:
+    # "Topic:difficulty=count"; the topic may itself contain ':'.
+    pair, _, count = spec.rpartition("=")
+    topic, _, difficulty = pair.rpartition(":")
+    if not topic or not difficulty or not count.isdigit():
+        raise argparse.ArgumentTypeError(f"expected TOPIC:DIFFICULTY=COUNT, got {spec!r}")
+    return topic, difficulty, int(count)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fill the DSA question bank.")
+    parser.add_argument("targets", nargs="+", type=_target, metavar="TOPIC:DIFFICULTY=COUNT")
+    parser.add_argument("--job-role", action="append", default=[], dest="job_roles")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+    report = asyncio.run(run_fill_dsa_bank(args.targets, args.job_roles or ["Software Engineer"]))
+    for target in report["targets"]:
+        print(
+            f"{target['topic']}/{target['difficulty']}: {target['saved']}/{target['requested']} "
+            f"saved in {target['attempts']} attempts, rejected {target['rejected']}"
+        )
+    print(
+        f"{report['saved']} saved, rejection rate {report['rejection_rate']}, "
+        f"{report['elapsed_s']}s ({report['questions_per_min']}/min)"
+    )
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
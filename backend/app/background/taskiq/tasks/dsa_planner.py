@@ -0,0 +1,167 @@
+"""
+Bank-depth planner: tops up the DSA question pools of upcoming interviews
+before they start, so question generation — minutes of LLM and sandbox
+time — never lands on an interview's critical path, and assignment never
+finds a (topic, difficulty) empty.
+
+Every DSA_PLANNER_CRON tick (`taskiq scheduler`), interviews that are
+running or start within DSA_PLANNER_HORIZON_H are scanned. Each of their
+DsaTopics is expected to serve one question per application (an upper
+bound: not every applicant is shortlisted), and a (topic, difficulty) pool
+should hold one question per DSA_PLANNER_CANDIDATES_PER_QUESTION of that
+demand, clamped to [DSA_PLANNER_MIN_DEPTH, DSA_PLANNER_MAX_DEPTH]. The
+shortfalls, soonest interview first and capped at DSA_PLANNER_MAX_PER_RUN
+questions, are generated by run_fill_dsa_bank within the planner run. A
+Redis lock keeps a slow fill and the next tick from overlapping; it holds a
+random token, so a tick whose lock expired mid-fill can't release the next
+tick's.
+"""
+
+import math
+import secrets
+from datetime import timedelta
+from typing import Any
+
+from redis.exceptions import RedisError
+from sqlalchemy import func, select, tuple_
+
+from app.background.taskiq.taskiq import broker
+from app.background.taskiq.tasks.dsa_generation import run_fill_dsa_bank
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.logger import get_logger
+from app.models.application import Application
+from app.models.dsa_question import DsaQuestion
+from app.models.interview import CustomInterview, DsaTopic
+from app.utils.cache_backends import redis_from_url
+
+logger = get_logger(__name__)
+
+_LOCK_KEY = "interxai:dsa:planner"
+# Deletes the lock only if it still holds this tick's token.
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+# Positions of the planned interviews passed to the LLM as job roles.
+_MAX_JOB_ROLES = 5
+
+
+def _wanted_depth(demand: int) -> int:
+    return max(
+        settings.DSA_PLANNER_MIN_DEPTH,
+        min(
+            settings.DSA_PLANNER_MAX_DEPTH,
+            math.ceil(demand / settings.DSA_PLANNER_CANDIDATES_PER_QUESTION),
+        ),
+    )
+
+
+async def plan_dsa_bank() -> tuple[list[tuple[str, str, int]], list[str]]:
+    """
+    The (topic, difficulty, questions to generate) shortfalls of upcoming
+    interviews, most urgent first and capped at DSA_PLANNER_MAX_PER_RUN,
+    and the job roles to generate them for.
+    """
+    horizon = func.now() + timedelta(hours=settings.DSA_PLANNER_HORIZON_H)
+    upcoming = (CustomInterview.end_time > func.now(), CustomInterview.start_time <= horizon)
+    # Applications of the upcoming interviews only, not of every interview ever held.
+    applications = (
+        select(Application.interview_id, func.count().label("n"))
+        .join(CustomInterview, CustomInterview.id == Application.interview_id)
+        .where(*upcoming)
+        .group_by(Application.interview_id)
+        .subquery("applications")
+    )
+    async with AsyncSessionLocal() as db:
+        demand_rows = (
+            await db.execute(
+                select(
+                    DsaTopic.topic,
+                    DsaTopic.difficulty,
+                    func.coalesce(func.sum(applications.c.n), 0).label("demand"),
+                    func.min(CustomInterview.start_time).label("first_start"),
+                )
+                .join(CustomInterview, CustomInterview.id == DsaTopic.interview_id)
+                .outerjoin(applications, applications.c.interview_id == CustomInterview.id)
+                .where(*upcoming)
+                .group_by(DsaTopic.topic, DsaTopic.difficulty)
+                .order_by(func.min(CustomInterview.start_time))
+            )
+        ).all()
+        if not demand_rows:
+            return [], []
+        depth_rows = await db.execute(
+            select(DsaQuestion.topic, DsaQuestion.difficulty, func.count())
+            .where(
+                tuple_(DsaQuestion.topic, DsaQuestion.difficulty).in_(
+                    [(row.topic, row.difficulty) for row in demand_rows]
+                )
+            )
+            .group_by(DsaQuestion.topic, DsaQuestion.difficulty)
+        )
+        depth = {(topic, difficulty): n for topic, difficulty, n in depth_rows}
+        positions = (
+            await db.execute(
+                select(CustomInterview.position).where(*upcoming).distinct().limit(_MAX_JOB_ROLES)
+            )
+        ).scalars()
+        job_roles = sorted(positions)
+
+    targets = []
+    budget = settings.DSA_PLANNER_MAX_PER_RUN
+    for row in demand_rows:
+        have = depth.get((row.topic, row.difficulty), 0)
+        missing = min(_wanted_depth(row.demand) - have, budget)
+        if missing > 0:
+            logger.info(
+                "DSA pool %s/%s: %d questions for ~%d candidates from %s; generating %d",
+                row.topic,
+                row.difficulty,
+                have,
+                row.demand,
+                row.first_start,
+                missing,
+            )
+            targets.append((row.topic, row.difficulty, missing))
+            budget -= missing
+    return targets, job_roles
+
+
+async def run_dsa_bank_planner() -> dict[str, Any] | None:
+    """
+    One planner tick: plan, then fill. The fill report, or None when there
+    was nothing to do or another tick still holds the lock.
+    """
+    redis = redis_from_url(settings.REDIS_URL)
+    token = secrets.token_hex(16)
+    try:
+        try:
+            if not await redis.set(_LOCK_KEY, token, nx=True, ex=settings.DSA_PLANNER_LOCK_S):
+                logger.info("DSA bank planner already running; skipping this tick")
+                return None
+        except RedisError as e:
+            logger.warning("DSA bank planner skipped, Redis unavailable: %s", e)
+            return None
+
+        try:
+            targets, job_roles = await plan_dsa_bank()
+            if not targets:
+                logger.info("DSA bank planner: every upcoming pool is deep enough")
+                return None
+            return await run_fill_dsa_bank(targets, job_roles or ["Software Engineer"])
+        finally:
+            try:
+                await redis.register_script(_RELEASE_SCRIPT)(keys=[_LOCK_KEY], args=[token])
+            except RedisError as e:
+                logger.warning("DSA bank planner lock not released (expires by itself): %s", e)
+    finally:
+        await redis.aclose()
+
+
+@broker.task(schedule=[{"cron": settings.DSA_PLANNER_CRON}])
+async def dsa_bank_planner_task() -> dict[str, Any] | None:
+    """Scheduled by `taskiq scheduler app.background.taskiq.taskiq:scheduler`."""
+    return await run_dsa_bank_planner()
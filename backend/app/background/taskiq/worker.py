@@ -28,6 +28,11 @@ class TaskiqWorker(BackgroundWorkerInterface):
     ) -> None:
         await dsa_generation.generate_dsa_question_task.kiq(topic, difficulty, job_roles)
 
+    async def fill_dsa_bank_task(
+        self, targets: list[tuple[str, str, int]], job_roles: list[str]
+    ) -> None:
+        await dsa_generation.fill_dsa_bank_task.kiq(targets, job_roles)
+
     async def assign_dsa_questions_task(self, session_id: int) -> None:
         await dsa_execution.assign_dsa_questions_task.kiq(session_id)
 
@@ -40,9 +45,10 @@ class TaskiqWorker(BackgroundWorkerInterface):
         source_code: str,
         language: str,
         submitted_at_iso: str | None = None,
+        submission_id: int | None = None,
     ) -> None:
         await dsa_execution.evaluate_submission_task.kiq(
-            dsa_interaction_id, source_code, language, submitted_at_iso
+            dsa_interaction_id, source_code, language, submitted_at_iso, submission_id
         )
 
     async def generate_resume_questions_task(self, session_id: int) -> None:
@@ -28,8 +28,115 @@ class Settings(BaseSettings):
     SUPABASE_KEY: str = ""
     SUPABASE_BUCKET_NAME: str = "resumes"
 
-    # Piston (code execution)
+    # Piston (code execution). Comma-separated for several nodes.
     PISTON_URL: str = "http://localhost:2000"
+    # Hidden-case fan-out (app.utils.case_runner): cases of ONE submission in
+    # flight at once, and sandbox calls in flight across the whole process.
+    DSA_CASE_CONCURRENCY: int = 4
+    DSA_GLOBAL_CONCURRENCY: int = 32
+    # Admission (app.utils.admission): per-session token bucket, in hidden
+    # cases, for /dsa/run and /dsa/test; submits skip it and get
+    # DSA_SUBMIT_WEIGHT x a scratch run's share of the queue. Scratch runs
+    # are turned away with 429 once the queue's estimated wait passes the cap.
+    DSA_SESSION_TOKENS_PER_S: float = 1.0
+    DSA_SESSION_BURST: int = 40
+    DSA_SUBMIT_WEIGHT: int = 4
+    DSA_ADMISSION_MAX_WAIT_S: float = 10.0
+    # Failing cases after which a fail-fast /dsa/test stops (compile errors stop at once).
+    DSA_FAIL_FAST_MAX_FAILURES: int = 1
+    # Per-case stdout cap: more is an "output_limit_exceeded" verdict, and
+    # Piston responses are read no further than the cases' share of it.
+    DSA_MAX_OUTPUT_BYTES: int = 1024 * 1024
+    # Generator-backed hidden cases (app.utils.generated_cases): per-run time
+    # limit for the generator and reference solution, and the local expansion
+    # cache (defaults to the system temp dir).
+    DSA_GENERATOR_TIMEOUT_MS: int = 10000
+    DSA_CASE_CACHE_DIR: str = ""
+    DSA_CASE_CACHE_MAX_ENTRIES: int = 500
+    # DSA question generation (app.background.taskiq.tasks.dsa_generation):
+    # LLM calls in flight per process, generations a bank fill runs at once,
+    # and the attempts a fill spends per question asked for before giving up.
+    DSA_GENERATION_LLM_CONCURRENCY: int = 4
+    DSA_FILL_CONCURRENCY: int = 8
+    DSA_FILL_MAX_ATTEMPTS_PER_QUESTION: int = 3
+    # Near-duplicate drafts (app.utils.question_similarity): the estimated
+    # shingle similarity to a bank question at which a draft is rejected,
+    # and how many existing titles the generation prompt names.
+    DSA_DUPLICATE_THRESHOLD: float = 0.6
+    DSA_GENERATION_PROMPT_TITLES: int = 20
+    # Calibrated time limits (app.utils.time_limits): the reference
+    # solution's slowest case times DSA_TIME_LIMIT_FACTOR, within
+    # [DSA_TIME_LIMIT_MIN_MS, DSA_TIME_LIMIT_MAX_MS].
+    DSA_TIME_LIMIT_FACTOR: float = 3.0
+    DSA_TIME_LIMIT_MIN_MS: int = 1000
+    DSA_TIME_LIMIT_MAX_MS: int = 10000
+    # Bank-depth planner (app.background.taskiq.tasks.dsa_planner), run on
+    # DSA_PLANNER_CRON by `taskiq scheduler`: pools of interviews running or
+    # starting within DSA_PLANNER_HORIZON_H are topped up to one question per
+    # DSA_PLANNER_CANDIDATES_PER_QUESTION applications, within
+    # [DSA_PLANNER_MIN_DEPTH, DSA_PLANNER_MAX_DEPTH], generating at most
+    # DSA_PLANNER_MAX_PER_RUN questions a run. DSA_PLANNER_LOCK_S bounds a
+    # run that dies holding the lock.
+    DSA_PLANNER_CRON: str = "*/30 * * * *"
+    DSA_PLANNER_HORIZON_H: int = 48
+    DSA_PLANNER_CANDIDATES_PER_QUESTION: int = 25
+    DSA_PLANNER_MIN_DEPTH: int = 3
+    DSA_PLANNER_MAX_DEPTH: int = 30
+    DSA_PLANNER_MAX_PER_RUN: int = 20
+    DSA_PLANNER_LOCK_S: int = 3600
+    # Question selection at assignment (app.utils.question_picker): "redis"
+    # hands out the least-served question of each (topic, difficulty) from a
+    # sorted set and folds the counts into times_served every
+    # DSA_PICKER_RECONCILE_S; "db" (also the fallback when Redis is down)
+    # picks and increments in Postgres on every assignment. The sets are
+    # rebuilt from the DB every DSA_PICKER_REFRESH_S to pick up bank changes.
+    DSA_QUESTION_PICKER: str = "redis"
+    DSA_PICKER_RECONCILE_S: int = 30
+    DSA_PICKER_REFRESH_S: int = 600
+    # Longest a GET /dsa/submissions/{id}?wait_s=... long-poll may hold on.
+    DSA_SUBMISSION_MAX_WAIT_S: float = 25.0
+    # How long a worker's claim on an asynchronous submit holds: a redelivered
+    # task leaves a running submission alone until its claim is this old
+    # (the worker grading it presumably died). Keep it above the slowest
+    # grading, or a slow submission is graded twice.
+    DSA_SUBMISSION_LEASE_S: int = 900
+    # Per-operation read timeouts for the pooled Piston client.
+    PISTON_EXECUTE_TIMEOUT_S: float = 30.0
+    PISTON_RUNTIMES_TIMEOUT_S: float = 10.0
+    # Installed-runtime registry (app.utils.piston_runtimes): refresh interval,
+    # and the retry delay after a failed load.
+    PISTON_RUNTIMES_TTL_S: float = 300.0
+    PISTON_RUNTIMES_RETRY_S: float = 30.0
+    PISTON_MAX_CONNECTIONS: int = 64
+    PISTON_MAX_KEEPALIVE: int = 32
+    # Opt-in batch mode (app.utils.piston_batch): up to PISTON_BATCH_MAX_CASES
+    # hidden cases per /execute call, compiled once and forked per case.
+    PISTON_BATCH_ENABLED: bool = False
+    PISTON_BATCH_MAX_CASES: int = 8
+    # The Piston server's own PISTON_RUN_TIMEOUT cap (15000 in docker-compose);
+    # a batched invocation's overall budget never exceeds it.
+    PISTON_MAX_RUN_TIMEOUT_MS: int = 15000
+    # Execution result cache (app.utils.execution_cache): "memory", "redis" or "none".
+    EXECUTION_CACHE_BACKEND: str = "memory"
+    EXECUTION_CACHE_MAX_ENTRIES: int = 10000
+    EXECUTION_CACHE_TTL_S: int = 3600
+    # LLM response cache (app.utils.llm_cache): "memory", "redis" or "none";
+    # agents may keep entries for less, or opt out (BaseAgent.cache_ttl_s).
+    LLM_CACHE_BACKEND: str = "memory"
+    LLM_CACHE_MAX_ENTRIES: int = 1000
+    LLM_CACHE_TTL_S: int = 86400
+
+    # Local subprocess sandbox (app.utils.local_sandbox), used when
+    # COMPILER_RUNTIME="local". Cache dir defaults to the system temp dir.
+    LOCAL_SANDBOX_CACHE_DIR: str = ""
+    LOCAL_SANDBOX_CACHE_MAX_ENTRIES: int = 2000
+    LOCAL_SANDBOX_COMPILE_TIMEOUT_S: float = 30.0
+    LOCAL_SANDBOX_MEMORY_MB: int = 512
+    LOCAL_SANDBOX_MAX_OUTPUT_BYTES: int = 1024 * 1024
+    LOCAL_SANDBOX_MAX_PROCESSES: int = 512
+    # Warm Python fork servers (app.utils.python_pool) that run Python cases
+    # locally whatever COMPILER_RUNTIME is; 0 leaves Python to that runtime.
+    PYTHON_POOL_SIZE: int = 0
 
     # Interview proctoring
     IMMEDIATE_DISQUALIFICATION: bool = False
@@ -37,12 +144,30 @@ class Settings(BaseSettings):
     # Confirmed violations that mark a session cheated.
     PROCTOR_VIOLATION_THRESHOLD: int = 3
     # Proctoring vision service (docker-compose overrides VISION_URL to http://vision:8000).
+    # Comma-separated for several nodes.
     VISION_URL: str = "http://localhost:8001"
     VISION_SHARED_SECRET: str = ""
     VISION_TIMEOUT_S: float = 10.0
+    VISION_MAX_CONNECTIONS: int = 32
+    VISION_MAX_KEEPALIVE: int = 16
+
+    # Pooled upstream HTTP clients (app.utils.http_clients), shared by Piston
+    # and vision. HTTP/2 needs the optional `h2` package.
+    HTTP_CONNECT_TIMEOUT_S: float = 5.0
+    HTTP_POOL_TIMEOUT_S: float = 10.0
+    HTTP_KEEPALIVE_EXPIRY_S: float = 30.0
+    HTTP2_ENABLED: bool = False
+    # Multi-node balancing for both (app.utils.upstream_pool).
+    UPSTREAM_PROBE_INTERVAL_S: float = 10.0
+    UPSTREAM_PROBE_TIMEOUT_S: float = 2.0
+    UPSTREAM_EJECT_AFTER_FAILURES: int = 3
+    UPSTREAM_EJECT_S: float = 30.0
+    UPSTREAM_MAX_ATTEMPTS: int = 2
 
     # Providers
     STORAGE_PROVIDER: str = "supabase"
+    # Code execution: "piston" or "local" (subprocess sandbox, no Piston needed).
+    COMPILER_RUNTIME: str = "piston"
     BACKGROUND_WORKER: str = "taskiq"
     EMAIL_PROVIDER: str = "smtp"
 
@@ -19,6 +19,17 @@ class NotFoundError(Exception):
         self.detail = detail
 
 
+class TooManyRequestsError(Exception):
+    def __init__(self, detail: str = "Too Many Requests", retry_after_s: int = 1):
+        self.detail = detail
+        self.retry_after_s = retry_after_s
+
+
+class ServiceUnavailableError(Exception):
+    def __init__(self, detail: str = "Service Unavailable"):
+        self.detail = detail
+
+
 def register_common_exception_handlers(app: FastAPI) -> None:
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(
@@ -54,3 +65,22 @@ def register_common_exception_handlers(app: FastAPI) -> None:
             status_code=404,
             content={"detail": exc.detail},
         )
+
+    @app.exception_handler(TooManyRequestsError)
+    async def too_many_requests_exception_handler(
+        _request: Request, exc: TooManyRequestsError
+    ) -> JSONResponse:
+        return JSONResponse(
+            status_code=429,
+            content={"detail": exc.detail},
+            headers={"Retry-After": str(exc.retry_after_s)},
+        )
+
+    @app.exception_handler(ServiceUnavailableError)
+    async def service_unavailable_exception_handler(
+        _request: Request, exc: ServiceUnavailableError
+    ) -> JSONResponse:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": exc.detail},
+        )
@@ -22,6 +22,12 @@ class BackgroundWorkerInterface(ABC):
     ) -> None:
         pass
 
+    @abstractmethod
+    async def fill_dsa_bank_task(
+        self, targets: list[tuple[str, str, int]], job_roles: list[str]
+    ) -> None:
+        pass
+
     @abstractmethod
     async def assign_dsa_questions_task(self, session_id: int) -> None:
         pass
@@ -37,6 +43,7 @@ class BackgroundWorkerInterface(ABC):
         source_code: str,
         language: str,
         submitted_at_iso: str | None = None,
+        submission_id: int | None = None,
     ) -> None:
         pass
 
@@ -5,16 +5,22 @@ from langchain_core.prompts.base import BasePromptTemplate
 from pydantic import BaseModel
 
 from app.interfaces.llm_provider import LLMProviderInterface
+from app.utils.llm_cache import cached_llm_provider
 
 
 class BaseAgent[T_in: BaseModel, T_out: BaseModel]:
+    # How long identical requests are answered from the LLM response cache
+    # (app.utils.llm_cache): None for LLM_CACHE_TTL_S, 0 to never cache —
+    # for agents whose every call must produce something new.
+    cache_ttl_s: int | None = None
+
     def __init__(
         self,
         llm_provider: LLMProviderInterface,
         prompt: BasePromptTemplate[Any],
         output_model: type[T_out],
     ) -> None:
-        self.llm_provider = llm_provider
+        self.llm_provider = cached_llm_provider(llm_provider, self.cache_ttl_s, output_model)
         self.output_parser = JsonOutputParser(pydantic_object=output_model)
         self.output_model = output_model
         self.prompt = prompt
@@ -0,0 +1,25 @@
+from abc import ABC, abstractmethod
+from collections.abc import Mapping, Sequence
+
+
+class CacheBackendInterface(ABC):
+    """
+    String key → string value store with per-entry expiry. Backends are
+    best-effort: a read that can't reach the store is a miss, a write that
+    can't is dropped — a cache outage must never fail the caller.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> str | None:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl_s: int) -> None:
+        pass
+
+    async def get_many(self, keys: Sequence[str]) -> list[str | None]:
+        return [await self.get(key) for key in keys]
+
+    async def set_many(self, items: Mapping[str, str], ttl_s: int) -> None:
+        for key, value in items.items():
+            await self.set(key, value, ttl_s)
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
 
 from pydantic import BaseModel, computed_field
 
@@ -7,6 +8,26 @@ class ExecutionResult(BaseModel):
     stdout: str
     stderr: str
     exit_code: int
+    # Telemetry, each field None where the runtime doesn't report it (see
+    # app.utils.execution_telemetry). Wall and CPU time of the program's run;
+    # peak resident memory; the build's wall time, when this call built it;
+    # and the caller-side time from request to result, which also covers
+    # sandbox queueing and transport.
+    wall_time_ms: int | None = None
+    cpu_time_ms: int | None = None
+    memory_bytes: int | None = None
+    compile_time_ms: int | None = None
+    round_trip_ms: int | None = None
+    # Why the run ended early: the signal that killed it ("SIGKILL", ...),
+    # and whether that was the time limit.
+    signal: str | None = None
+    timed_out: bool = False
+    # The program never ran: it failed to build (stderr is the compiler's).
+    compile_error: bool = False
+    # The run printed more than the runtime would accept and was cut off.
+    output_limit_exceeded: bool = False
+    # Answered from app.utils.execution_cache; the telemetry is the original run's.
+    cached: bool = False
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -14,6 +35,18 @@ class ExecutionResult(BaseModel):
         return self.exit_code == 0
 
 
+class RuntimeInfo(BaseModel):
+    """One installed language runtime, as the sandbox reports it."""
+
+    language: str
+    version: str
+    aliases: list[str] = []
+
+
+class UnsupportedLanguageError(Exception):
+    """The sandbox has no runtime installed for the requested language."""
+
+
 class CompilerRuntimeInterface(ABC):
     @abstractmethod
     async def execute(
@@ -26,5 +59,50 @@ class CompilerRuntimeInterface(ABC):
         pass
 
     @abstractmethod
-    async def list_runtimes(self) -> list[str]:
+    async def list_runtimes(self) -> list[RuntimeInfo]:
         pass
+
+    async def validate_language(self, language: str) -> None:  # noqa: B027
+        """
+        Raise UnsupportedLanguageError if `language` can't run here. Lets
+        callers reject a submission before dispatching any case; the default
+        accepts everything and leaves the verdict to execute().
+        """
+
+    def runtime_id(self, language: str) -> str:
+        """
+        Canonical name of the runtime `language` resolves to, so aliases of
+        the same runtime ("py", "python3") share execution-cache entries.
+        """
+        return language.lower()
+
+    def batch_size(self, language: str) -> int:  # noqa: ARG002
+        """
+        How many cases of one submission a single execute_batch() call may
+        carry for `language`. 1 — the default — means the runtime has no batch
+        mode and callers should issue one execute() per case.
+        """
+        return 1
+
+    async def execute_batch(
+        self,
+        source_code: str,
+        language: str,
+        stdins: Sequence[str],
+        run_timeout_ms: int | None = None,
+    ) -> list[ExecutionResult]:
+        """
+        Run the program once per stdin — each run still independent, with its
+        own per-case time limit — and return the results in stdin order.
+        Runtimes with a batch mode override this to share compilation and
+        sandbox setup across the cases; this fallback just loops execute().
+        """
+        return [
+            await self.execute(
+                source_code=source_code,
+                language=language,
+                stdin=stdin,
+                run_timeout_ms=run_timeout_ms,
+            )
+            for stdin in stdins
+        ]
@@ -6,3 +6,10 @@ class LLMProviderInterface(ABC):
     @abstractmethod
     async def generate_response(self, prompt: Any, **kwargs: Any) -> Any:
         pass
+
+    def model_id(self) -> str:
+        """
+        The model answering generate_response(), so responses cached for one
+        model (app.utils.llm_cache) are never served for another.
+        """
+        return type(self).__name__
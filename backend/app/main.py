@@ -28,8 +28,12 @@ from app.routers.leaderboard import router as leaderboard_router
 from app.routers.organization import router as organization_router
 from app.routers.session import router as session_router
 from app.routers.user import router as user_router
+from app.utils import metrics
 from app.utils.default_providers import default_worker_provider
+from app.utils.http_clients import http_clients_lifespan
 from app.utils.lifespan import combine_lifespans
+from app.utils.piston_client import piston_runtimes_lifespan
+from app.utils.python_pool import python_pool_lifespan
 
 logger = get_logger(__name__)
 
@@ -42,11 +46,19 @@ async def worker_lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
 
 
 # Compose the worker lifespan with the mounted MCP app's own lifespan instead of
-# reaching into its session manager.
+# reaching into its session manager, plus the pooled Piston/vision clients and
+# the Piston runtime registry (loaded once the clients exist) and the warm
+# Python fork servers.
 app = FastAPI(
     title=settings.APP_NAME,
     debug=settings.DEBUG,
-    lifespan=combine_lifespans(worker_lifespan, mcp_lifespan),
+    lifespan=combine_lifespans(
+        worker_lifespan,
+        http_clients_lifespan,
+        piston_runtimes_lifespan,
+        python_pool_lifespan,
+        mcp_lifespan,
+    ),
 )
 
 app.add_middleware(
@@ -78,3 +90,9 @@ logger.info("Application initialized: %s", settings.APP_NAME)
 @app.get("/health")
 async def health_check() -> dict[str, str]:
     return {"status": "healthy", "app": settings.APP_NAME, "version": "0.1.0"}
+
+
+@app.get("/metrics")
+async def metrics_snapshot() -> dict[str, dict[str, float]]:
+    """Process-local counters and gauges (see app.utils.metrics)."""
+    return metrics.snapshot()
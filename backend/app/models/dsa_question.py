@@ -1,7 +1,16 @@
 from typing import Any
 
-from sqlalchemy import Integer, String, Text
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import (
+    BigInteger,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import BaseTable
@@ -9,24 +18,94 @@ from app.models.base import BaseTable
 
 class DsaQuestion(BaseTable):
     __tablename__ = "dsa_questions"
+    __table_args__ = (
+        # Backs least-served selection (assignment's DB path, the question
+        # picker's set builds): a group's questions in times_served order,
+        # straight off the index. Also serves lookups by topic alone.
+        Index(
+            "ix_dsa_questions_topic_difficulty_served",
+            "topic",
+            "difficulty",
+            "times_served",
+            "id",
+        ),
+        # Near-duplicate candidates: questions sharing any LSH band hash.
+        Index("ix_dsa_questions_minhash_bands", "minhash_bands", postgresql_using="gin"),
+    )
 
     problem_name: Mapped[str] = mapped_column(String(255), nullable=False)
-    topic: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    topic: Mapped[str] = mapped_column(String(100), nullable=False)
     difficulty: Mapped[str] = mapped_column(String(20), nullable=False, index=True)
-    description: Mapped[str] = mapped_column(Text, nullable=False)
+    # The bulky columns are deferred and raise if read without undefer():
+    # listings never pay for them, and a forgotten undefer fails loudly
+    # instead of lazy-loading (which AsyncSession can't do anyway).
+    description: Mapped[str] = mapped_column(
+        Text, nullable=False, deferred=True, deferred_raiseload=True
+    )
 
-    # Each entry: {"stdin": str, "expected_stdout": str}. Multi-line values use "\n".
-    test_cases: Mapped[list[dict[str, Any]]] = mapped_column(JSONB, nullable=False)
+    # Each entry: {"stdin": str, "expected_stdout": str}. Multi-line values use "\n";
+    # expected_stdout is stored normalised (app.utils.output_compare.normalize_expected).
+    # Stress cases may instead be {"generator", "seed", "expected_sha256"},
+    # expanded at grading time (app.utils.generated_cases).
+    test_cases: Mapped[list[dict[str, Any]]] = mapped_column(
+        JSONB, nullable=False, deferred=True, deferred_raiseload=True
+    )
     sample_test_cases: Mapped[list[dict[str, Any]] | None] = mapped_column(JSONB, nullable=True)
 
-    sample_solution: Mapped[str | None] = mapped_column(Text, nullable=True)
+    sample_solution: Mapped[str | None] = mapped_column(
+        Text, nullable=True, deferred=True, deferred_raiseload=True
+    )
     time_limit_ms: Mapped[int] = mapped_column(Integer, nullable=False, default=5000)
+    # Calibrated from the reference solution (app.utils.time_limits): its
+    # slowest case's wall time, and the limit per runtime name; both NULL
+    # while time_limit_ms is still the LLM's.
+    reference_time_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    time_limits_ms: Mapped[dict[str, int] | None] = mapped_column(JSONB, nullable=True)
+    # Numeric tokens may differ by this much (absolute, or relative past 1);
+    # None means outputs must match exactly.
+    float_tolerance: Mapped[float | None] = mapped_column(Float, nullable=True)
 
     job_roles: Mapped[str | None] = mapped_column(Text, nullable=True)
     times_served: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # MinHash signature of title + description and its LSH band hashes
+    # (app.utils.question_similarity), for near-duplicate detection at
+    # generation. NULL until signed.
+    minhash: Mapped[list[int] | None] = mapped_column(
+        ARRAY(BigInteger), nullable=True, deferred=True, deferred_raiseload=True
+    )
+    minhash_bands: Mapped[list[int] | None] = mapped_column(
+        ARRAY(BigInteger), nullable=True, deferred=True, deferred_raiseload=True
+    )
 
     def __repr__(self) -> str:
         return (
             f"<DsaQuestion(name='{self.problem_name}', "
             f"topic='{self.topic}', difficulty='{self.difficulty}')>"
         )
+
+
+class DsaCaseStat(BaseTable):
+    """
+    Running pass/fail tally for one hidden case of a question, fed by every
+    dry run and graded submission. Fail-fast dry runs schedule the cases
+    that fail most often first. `case_index` is the 1-based position in
+    DsaQuestion.test_cases, so the tally restarts if the cases are rewritten.
+    """
+
+    __tablename__ = "dsa_case_stats"
+    __table_args__ = (
+        UniqueConstraint("question_id", "case_index", name="uq_dsa_case_stats_question_case"),
+    )
+
+    question_id: Mapped[int] = mapped_column(
+        ForeignKey("dsa_questions.id", ondelete="CASCADE"), nullable=False
+    )
+    case_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    passed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return (
+            f"<DsaCaseStat(question_id={self.question_id}, case={self.case_index}, "
+            f"passed={self.passed}, failed={self.failed})>"
+        )
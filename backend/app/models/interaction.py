@@ -1,6 +1,9 @@
 from datetime import datetime
+from enum import StrEnum
+from typing import Any
 
 from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import BaseTable
@@ -78,6 +81,9 @@ class DsaInteraction(BaseTable):
     passed_cases: Mapped[int | None] = mapped_column(Integer, nullable=True)
     total_cases: Mapped[int | None] = mapped_column(Integer, nullable=True)
     last_submitted_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # app.utils.execution_telemetry.summarize() of the recorded run: where its
+    # time went (wall/CPU/compile/round trip), peak memory, timeouts, signals.
+    execution_stats: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
 
     session = relationship(
         "InterviewSession", back_populates="dsa_sessions", foreign_keys=[session_id]
@@ -89,6 +95,46 @@ class DsaInteraction(BaseTable):
         return f"<DsaInteraction(session_id={self.session_id}, topic_id={self.topic_id}, question_id={self.question_id})>"
 
 
+class SubmissionStatus(StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class DsaSubmission(BaseTable):
+    """
+    One asynchronous submit (POST /sessions/{id}/dsa/submissions): the code as
+    submitted, queued for evaluate_submission_task, and — once graded — the
+    same summary a synchronous submit returns. The DsaInteraction remains the
+    record of the candidate's solution; this row is the handle clients poll.
+    """
+
+    __tablename__ = "dsa_submissions"
+
+    interaction_id: Mapped[int] = mapped_column(
+        ForeignKey("dsa_interactions.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    source_code: Mapped[str] = mapped_column(Text, nullable=False)
+    language: Mapped[str] = mapped_column(String(50), nullable=False)
+    # When the HTTP request arrived: orders it against other submits.
+    submitted_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default=SubmissionStatus.QUEUED.value
+    )
+    result: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # When a worker last claimed it (queued → running); a running row is
+    # reclaimed only once this is DSA_SUBMISSION_LEASE_S old.
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    interaction = relationship("DsaInteraction", foreign_keys=[interaction_id])
+
+    def __repr__(self) -> str:
+        return f"<DsaSubmission(id={self.id}, interaction_id={self.interaction_id}, status={self.status})>"
+
+
 class ResumeConversation(BaseTable):
     __tablename__ = "resume_conversations"
 
@@ -7,6 +7,7 @@ from app.database import get_db
 from app.exceptions.common import ForbiddenError, NotFoundError
 from app.logger import get_logger
 from app.models.application import Application, InterviewSession
+from app.models.dsa_question import DsaQuestion
 from app.models.interaction import DsaInteraction, Interaction, ResumeQuestion
 from app.models.interview import CustomInterview, CustomQuestion
 from app.models.organization import Organization
@@ -175,7 +176,13 @@ async def get_interview_leaderboard(
             .selectinload(Interaction.follow_up_questions),
             selectinload(Application.sessions)
             .selectinload(InterviewSession.dsa_sessions)
-            .selectinload(DsaInteraction.question),
+            .selectinload(DsaInteraction.question)
+            .load_only(
+                DsaQuestion.problem_name,
+                DsaQuestion.description,
+                DsaQuestion.topic,
+                DsaQuestion.difficulty,
+            ),
             selectinload(Application.sessions)
             .selectinload(InterviewSession.dsa_sessions)
             .selectinload(DsaInteraction.topic),
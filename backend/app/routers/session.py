@@ -1,7 +1,10 @@
+import asyncio
+import time
 from datetime import datetime
-from typing import Literal
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
@@ -11,23 +14,42 @@ from app.ai.lite_llm import LiteLLMProvider
 from app.ai.schema import FollowUpDeciderRequest
 from app.background.taskiq.tasks.dsa_execution import run_evaluate_submission
 from app.config import settings
-from app.database import get_db
-from app.exceptions.common import BadRequestError, ForbiddenError, NotFoundError
+from app.database import AsyncSessionLocal, get_db
+from app.exceptions.common import (
+    BadRequestError,
+    ForbiddenError,
+    NotFoundError,
+    ServiceUnavailableError,
+)
+from app.interfaces.compiler_runtime import (
+    CompilerRuntimeInterface,
+    ExecutionResult,
+    UnsupportedLanguageError,
+)
 from app.interfaces.vision import VisionError
 from app.logger import get_logger
 from app.models.application import CurrentRound, InterviewSession, InterviewStatus
 from app.models.dsa_question import DsaQuestion
-from app.models.interaction import DsaInteraction, FollowUpQuestion, Interaction
+from app.models.interaction import (
+    DsaInteraction,
+    DsaSubmission,
+    FollowUpQuestion,
+    Interaction,
+    SubmissionStatus,
+)
 from app.models.interview import CustomQuestion
 from app.models.proctoring import ViolationType
 from app.models.user import User
 from app.schemas.session import (
     AnswerRequest,
     CustomQuestionPayload,
+    DsaLanguage,
     DsaRoundQuestion,
     DsaRoundResponse,
     DsaRunRequest,
     DsaRunResponse,
+    DsaSubmissionHandle,
+    DsaSubmissionStatusResponse,
     DsaSubmitRequest,
     DsaSubmitResponse,
     DsaTestCaseStatus,
@@ -39,8 +61,13 @@ from app.schemas.session import (
     InterviewStateResponse,
     ResumeQuestionPayload,
 )
+from app.utils import time_limits
+from app.utils.admission import Flow, scheduler
 from app.utils.authorization import get_current_user
-from app.utils.default_providers import default_worker_provider
+from app.utils.case_runner import case_status, run_cases, run_cases_until
+from app.utils.case_stats import failure_first_order, record_case_outcomes
+from app.utils.default_providers import default_compiler_runtime, default_worker_provider
+from app.utils.generated_cases import CASES_UNAVAILABLE, GeneratedCaseError, expand_cases
 from app.utils.interview_flow import (
     MAX_FOLLOWUPS,
     conversation_context,
@@ -57,19 +84,22 @@ from app.utils.interview_flow import (
     transition_to_dsa,
     transition_to_resume,
 )
-from app.utils.piston_client import PistonClient
 from app.utils.session_lifecycle import (
     TERMINAL_STATUSES,
     assert_session_alive,
     complete_if_time_exceeded,
     disqualify_if_stale,
 )
+from app.utils.sse import OnCase, stream_case_results
 from app.utils.vision_client import VisionClient
 
 logger = get_logger(__name__)
 
 router: APIRouter = APIRouter(prefix="/sessions", tags=["sessions"])
 
+# How often a long-polling GET /dsa/submissions/{id} re-reads the row.
+_SUBMISSION_POLL_INTERVAL_S = 0.5
+
 
 async def _load_owned_session(session_id: int, user: User, db: AsyncSession) -> InterviewSession:
     result = await db.execute(
@@ -352,7 +382,12 @@ async def _handle_resume_answer(
 
 
 async def _load_dsa_context(
-    session_id: int, interaction_id: int, user: User, db: AsyncSession
+    session_id: int,
+    interaction_id: int,
+    user: User,
+    db: AsyncSession,
+    *,
+    with_test_cases: bool = False,
 ) -> tuple[InterviewSession, DsaInteraction, DsaQuestion]:
     """
     Shared guard for the DSA run/test/submit endpoints: ownership, liveness,
@@ -368,7 +403,9 @@ async def _load_dsa_context(
             f"DSA endpoints are only valid during the DSA round (current: {session.current_round})"
         )
 
-    interaction, question = await dsa_interaction_by_id(session_id, interaction_id, db)
+    interaction, question = await dsa_interaction_by_id(
+        session_id, interaction_id, db, with_test_cases=with_test_cases
+    )
     return session, interaction, question
 
 
@@ -415,6 +452,7 @@ async def dsa_round(
                 description=question.description,
                 sample_test_cases=question.sample_test_cases,
                 time_limit_ms=question.time_limit_ms,
+                time_limits_ms=question.time_limits_ms,
                 attempts=interaction.attempts,
                 score=interaction.score,
                 passed_cases=interaction.passed_cases,
@@ -422,9 +460,23 @@ async def dsa_round(
             )
             for interaction, question in pairs
         ],
+        languages=[
+            DsaLanguage(language=r.language, version=r.version, aliases=r.aliases)
+            for r in await default_compiler_runtime().list_runtimes()
+        ],
     )
 
 
+async def _dsa_runtime(language: str) -> CompilerRuntimeInterface:
+    """The sandbox runtime, after rejecting a language it can't run with a 400."""
+    runtime = default_compiler_runtime()
+    try:
+        await runtime.validate_language(language)
+    except UnsupportedLanguageError as e:
+        raise BadRequestError(str(e)) from e
+    return runtime
+
+
 @router.post("/{session_id}/dsa/run", response_model=DsaRunResponse)
 async def dsa_run(
     session_id: int,
@@ -439,15 +491,21 @@ async def dsa_run(
 
     This endpoint does NOT touch the DsaInteraction — it's the candidate's
     scratchpad. The interaction_id only supplies the question's time limit.
+    Runs count against the session's execution quota (app.utils.admission);
+    over quota, or with the runner overloaded, it's a 429 with Retry-After.
     """
     _, _, question = await _load_dsa_context(session_id, body.interaction_id, user, db)
 
-    client = PistonClient()
-    result = await client.execute(
-        source_code=body.source_code,
-        language=body.language,
-        stdin=body.stdin,
-        run_timeout_ms=question.time_limit_ms,
+    runtime = await _dsa_runtime(body.language)
+    flow = Flow(session_id=session_id, kind="run")
+    scheduler.admit(flow, cost=1)
+    [result] = await run_cases(
+        runtime,
+        body.source_code,
+        body.language,
+        [body.stdin],
+        time_limits.time_limit_ms(question, body.language),
+        flow,
     )
     return DsaRunResponse(
         stdout=result.stdout,
@@ -468,32 +526,137 @@ async def dsa_test(
     cases. Like /dsa/submit, the response carries only per-case status and
     counts — never the cases' inputs or outputs. Does NOT update the
     DsaInteraction; code and score are only persisted on /dsa/submit.
+
+    With fail_fast, the historically most-failed cases run first and the run
+    stops at a compile error (reported on case 1, as a full run would show it
+    on every case) or after DSA_FAIL_FAST_MAX_FAILURES failures; the cases
+    never run are "skipped". Either way the verdicts feed the per-case
+    tallies that order the next fail-fast run. Each hidden case counts against
+    the session's execution quota, as for /dsa/run.
     """
-    _, _, question = await _load_dsa_context(session_id, body.interaction_id, user, db)
+    question, runtime, flow, order = await _prepare_dsa_test(session_id, body, user, db)
+    return await _grade_dsa_test(body, question, runtime, flow, order)
+
+
+@router.post("/{session_id}/dsa/test/stream")
+async def dsa_test_stream(
+    session_id: int,
+    body: DsaTestRequest,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    /dsa/test as Server-Sent Events: an `event: case` (DsaTestCaseStatus) as
+    each case finishes, then `event: summary` with the DsaTestResponse, or
+    `event: error` with {"detail": ...}. Access, language and quota are
+    checked before the stream opens, so those still fail as plain HTTP
+    errors. Disconnecting cancels the cases not yet run.
+
+    A fail-fast run that hits a compile error streams no case events; its
+    summary reports it on case 1 as /dsa/test does.
+    """
+    question, runtime, flow, order = await _prepare_dsa_test(session_id, body, user, db)
+    # Hand the pooled connection back for the length of the stream; grading
+    # doesn't use this session again.
+    await db.commit()
+    return stream_case_results(
+        lambda on_case: _grade_dsa_test(body, question, runtime, flow, order, on_case),
+        finish_on_disconnect=False,
+    )
 
-    cases: list[dict[str, str]] = question.test_cases or []
-    client = PistonClient()
-    results: list[DsaTestCaseStatus] = []
 
-    for idx, case in enumerate(cases, 1):
-        stdin = case.get("stdin", "")
-        expected = (case.get("expected_stdout") or "").strip()
+async def _prepare_dsa_test(
+    session_id: int, body: DsaTestRequest, user: User, db: AsyncSession
+) -> tuple[DsaQuestion, CompilerRuntimeInterface, Flow, list[int] | None]:
+    """
+    The question, runtime and admitted flow of a dry run, and for fail_fast
+    the order to run its cases in — everything grading needs from the
+    request's DB session.
+    """
+    _, _, question = await _load_dsa_context(
+        session_id, body.interaction_id, user, db, with_test_cases=True
+    )
+    runtime = await _dsa_runtime(body.language)
+    flow = Flow(session_id=session_id, kind="test")
+    total = len(question.test_cases or [])
+    scheduler.admit(flow, cost=total)
+    # Generated cases expand one-to-one, so the stored count orders them too.
+    order = await failure_first_order(db, question.id, total) if body.fail_fast else None
+    return question, runtime, flow, order
 
-        run = await client.execute(
-            source_code=body.source_code,
-            language=body.language,
-            stdin=stdin,
-            run_timeout_ms=question.time_limit_ms,
+
+async def _grade_dsa_test(
+    body: DsaTestRequest,
+    question: DsaQuestion,
+    runtime: CompilerRuntimeInterface,
+    flow: Flow,
+    order: list[int] | None,
+    on_case: OnCase | None = None,
+) -> DsaTestResponse:
+    try:
+        cases = await expand_cases(question, runtime, flow)
+    except GeneratedCaseError as e:
+        logger.error("Hidden cases of question %d unavailable: %s", question.id, e)
+        raise ServiceUnavailableError(CASES_UNAVAILABLE) from e
+    stdins = [case.get("stdin", "") for case in cases]
+    time_limit_ms = time_limits.time_limit_ms(question, body.language)
+
+    def status_of(idx: int, run: ExecutionResult | None) -> str:
+        return case_status(run, cases[idx].get("expected_stdout") or "", question.float_tolerance)
+
+    def report(idx: int, run: ExecutionResult) -> None:
+        if on_case is not None and not run.compile_error:
+            on_case(DsaTestCaseStatus(case=idx + 1, status=status_of(idx, run)))
+
+    runs: list[ExecutionResult | None]
+    if order is not None:
+        failures = 0
+
+        def stop(idx: int, run: ExecutionResult) -> bool:
+            nonlocal failures
+            report(idx, run)
+            if run.compile_error:
+                return True
+            if status_of(idx, run) != "passed":
+                failures += 1
+            return failures >= settings.DSA_FAIL_FAST_MAX_FAILURES
+
+        runs = await run_cases_until(
+            runtime,
+            body.source_code,
+            body.language,
+            stdins,
+            stop,
+            order=order,
+            run_timeout_ms=time_limit_ms,
+            flow=flow,
         )
-        if run.exit_code != 0:
-            results.append(DsaTestCaseStatus(case=idx, status="error"))
-            continue
-        results.append(
-            DsaTestCaseStatus(
-                case=idx,
-                status="passed" if run.stdout.strip() == expected else "failed",
+        compile_error = next((run for run in runs if run is not None and run.compile_error), None)
+        if compile_error is not None:
+            runs = [compile_error] + [None] * (len(cases) - 1)
+    else:
+        runs = list(
+            await run_cases(
+                runtime,
+                body.source_code,
+                body.language,
+                stdins,
+                time_limit_ms,
+                flow,
+                on_result=report,
             )
         )
+    results = [
+        DsaTestCaseStatus(case=idx + 1, status=status_of(idx, run)) for idx, run in enumerate(runs)
+    ]
+
+    # A compile error says nothing about which cases are hard.
+    if not any(run is not None and run.compile_error for run in runs):
+        # A short transaction of its own, not the request's session, which a
+        # stream handed back before grading.
+        async with AsyncSessionLocal() as db:
+            await record_case_outcomes(db, question.id, [r.status for r in results])
+            await db.commit()
 
     passed = sum(1 for r in results if r.status == "passed")
     return DsaTestResponse(case_results=results, passed=passed, total=len(results))
@@ -521,15 +684,156 @@ async def dsa_submit(
     """
     submitted_at = datetime.utcnow()
     await _load_dsa_context(session_id, body.interaction_id, user, db)
+    await _dsa_runtime(body.language)
 
     # Grades + commits in its own session under row locks; the summary describes
     # THIS run, so the response never mixes results from concurrent attempts.
-    summary = await run_evaluate_submission(
-        body.interaction_id, body.source_code, body.language, submitted_at
+    try:
+        summary = await run_evaluate_submission(
+            body.interaction_id, body.source_code, body.language, submitted_at
+        )
+    except GeneratedCaseError as e:
+        raise ServiceUnavailableError(CASES_UNAVAILABLE) from e
+    return _submit_response(summary)
+
+
+@router.post("/{session_id}/dsa/submit/stream")
+async def dsa_submit_stream(
+    session_id: int,
+    body: DsaSubmitRequest,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    /dsa/submit as Server-Sent Events: an `event: case` (DsaTestCaseStatus) as
+    each case finishes, then `event: summary` with the DsaSubmitResponse from
+    the same locked write as /dsa/submit, or `event: error`. A client that
+    disconnects mid-run does not lose the submission: grading carries on and
+    is recorded, and GET /sessions/{id}/dsa shows the outcome.
+    """
+    submitted_at = datetime.utcnow()
+    await _load_dsa_context(session_id, body.interaction_id, user, db)
+    await _dsa_runtime(body.language)
+    # Grading uses its own DB session; don't hold this one's connection open.
+    await db.commit()
+
+    async def grade(on_case: OnCase) -> DsaSubmitResponse:
+        try:
+            summary = await run_evaluate_submission(
+                body.interaction_id,
+                body.source_code,
+                body.language,
+                submitted_at,
+                on_case=lambda case, status: on_case(DsaTestCaseStatus(case=case, status=status)),
+            )
+        except GeneratedCaseError as e:
+            raise ServiceUnavailableError(CASES_UNAVAILABLE) from e
+        return _submit_response(summary)
+
+    return stream_case_results(grade, finish_on_disconnect=True)
+
+
+@router.post(
+    "/{session_id}/dsa/submissions",
+    response_model=DsaSubmissionHandle,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def dsa_submit_async(
+    session_id: int,
+    body: DsaSubmitRequest,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+) -> DsaSubmissionHandle:
+    """
+    /dsa/submit without waiting for the grade: the submission is recorded and
+    handed to evaluate_submission_task on the worker, and the response is a
+    handle to poll with GET /sessions/{id}/dsa/submissions/{submission_id}.
+    Grading, ordering (last SUBMITTED wins, by this request's arrival) and
+    the stored result are exactly those of a synchronous submit; only where
+    the sandbox runs is waited on differs.
+    """
+    submitted_at = datetime.utcnow()
+    await _load_dsa_context(session_id, body.interaction_id, user, db)
+    await _dsa_runtime(body.language)
+
+    submission = DsaSubmission(
+        interaction_id=body.interaction_id,
+        source_code=body.source_code,
+        language=body.language,
+        submitted_at=submitted_at,
+        status=SubmissionStatus.QUEUED.value,
     )
+    db.add(submission)
+    await db.commit()
+
+    try:
+        await default_worker_provider().evaluate_submission_task(
+            body.interaction_id,
+            body.source_code,
+            body.language,
+            submitted_at.isoformat(),
+            submission_id=submission.id,
+        )
+    except Exception:
+        submission.status = SubmissionStatus.FAILED.value
+        submission.error = "Could not queue the submission"
+        submission.finished_at = datetime.utcnow()
+        await db.commit()
+        raise
+
+    return DsaSubmissionHandle(submission_id=submission.id, status=submission.status)
+
+
+@router.get(
+    "/{session_id}/dsa/submissions/{submission_id}",
+    response_model=DsaSubmissionStatusResponse,
+)
+async def dsa_submission(
+    session_id: int,
+    submission_id: int,
+    wait_s: float = 0.0,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+) -> DsaSubmissionStatusResponse:
+    """
+    Progress of an asynchronous submit. With wait_s > 0 this is a long poll:
+    the response is held until grading finishes or wait_s (capped at
+    DSA_SUBMISSION_MAX_WAIT_S) runs out, so a client learns the outcome as
+    soon as it exists without hammering the endpoint. Readable after the DSA
+    round has ended — a grade queued just before /dsa/finish still lands.
+    """
+    await _load_owned_session(session_id, user, db)
+    submission = (
+        await db.execute(
+            select(DsaSubmission)
+            .join(DsaInteraction, DsaInteraction.id == DsaSubmission.interaction_id)
+            .where(DsaSubmission.id == submission_id, DsaInteraction.session_id == session_id)
+        )
+    ).scalar_one_or_none()
+    if submission is None:
+        raise NotFoundError("Submission not found")
+
+    deadline = time.monotonic() + min(max(wait_s, 0.0), settings.DSA_SUBMISSION_MAX_WAIT_S)
+    while (
+        submission.status in (SubmissionStatus.QUEUED.value, SubmissionStatus.RUNNING.value)
+        and time.monotonic() < deadline
+    ):
+        # Don't hold a pooled connection while waiting.
+        await db.commit()
+        await asyncio.sleep(_SUBMISSION_POLL_INTERVAL_S)
+        await db.refresh(submission)
+
+    return DsaSubmissionStatusResponse(
+        submission_id=submission.id,
+        status=submission.status,
+        result=_submit_response(submission.result) if submission.result else None,
+        error=submission.error,
+    )
+
+
+def _submit_response(summary: dict[str, Any]) -> DsaSubmitResponse:
     if not summary:
         raise BadRequestError("This DSA question is no longer available")
-
     return DsaSubmitResponse(
         case_results=[DsaTestCaseStatus(**c) for c in summary["case_results"]],
         passed=summary["passed"],
@@ -58,6 +58,9 @@ class DsaTestRequest(BaseModel):
     interaction_id: int
     source_code: str
     language: str
+    # Stop at a compile error or after DSA_FAIL_FAST_MAX_FAILURES failing
+    # cases; the cases never run come back "skipped".
+    fail_fast: bool = False
 
 
 class DsaTestCaseStatus(BaseModel):
@@ -66,7 +69,8 @@ class DsaTestCaseStatus(BaseModel):
     engineer the hidden test cases across attempts."""
 
     case: int
-    status: str  # passed | failed | error
+    # passed | failed | error | output_limit_exceeded | skipped (fail-fast dry runs only)
+    status: str
 
 
 class DsaTestResponse(BaseModel):
@@ -75,6 +79,13 @@ class DsaTestResponse(BaseModel):
     total: int
 
 
+class DsaSubmissionHandle(BaseModel):
+    """Returned by an asynchronous submit; poll GET .../dsa/submissions/{submission_id}."""
+
+    submission_id: int
+    status: str  # queued | running | done | failed
+
+
 class CustomQuestionPayload(BaseModel):
     type: Literal["custom"] = "custom"
     interaction_id: int
@@ -124,6 +135,16 @@ class DsaSubmitResponse(BaseModel):
     recorded: bool
 
 
+class DsaSubmissionStatusResponse(BaseModel):
+    """An asynchronous submit's progress: `result` once status is "done",
+    `error` once it is "failed"."""
+
+    submission_id: int
+    status: str  # queued | running | done | failed
+    result: DsaSubmitResponse | None = None
+    error: str | None = None
+
+
 class DsaRoundQuestion(BaseModel):
     """One DSA question as shown in the round overview, including the
     candidate's own submission state so the frontend can render progress."""
@@ -133,12 +154,23 @@ class DsaRoundQuestion(BaseModel):
     description: str
     sample_test_cases: list[dict[str, str]] | None = None
     time_limit_ms: int
+    # Per runtime name ("java", "c++", ...) where calibrated; languages not
+    # listed use time_limit_ms.
+    time_limits_ms: dict[str, int] | None = None
     attempts: int
     score: float | None = None
     passed_cases: int | None = None
     total_cases: int | None = None
 
 
+class DsaLanguage(BaseModel):
+    """A language the sandbox can run, for the editor's language picker."""
+
+    language: str
+    version: str
+    aliases: list[str]
+
+
 class DsaRoundResponse(BaseModel):
     """The whole DSA round. status=="preparing" means the background
     assignment task hasn't finished yet — poll again (the server re-dispatches
@@ -149,3 +181,5 @@ class DsaRoundResponse(BaseModel):
     session_id: int
     status: Literal["preparing", "ready"]
     questions: list[DsaRoundQuestion]
+    # Installed sandbox runtimes; empty if the sandbox hasn't been reachable.
+    languages: list[DsaLanguage] = []
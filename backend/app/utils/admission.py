@@ -0,0 +1,188 @@
+"""
+Admission control for sandbox executions.
+
+Every Piston invocation of this process goes through one AdmissionScheduler,
+which replaces a plain global semaphore with three things:
+
+- a global in-flight cap (DSA_GLOBAL_CONCURRENCY);
+- weighted fair queuing between flows — one flow per (session, kind) — so
+  a candidate hammering /dsa/test waits behind their own backlog instead of
+  in front of everyone else's. Submits weigh DSA_SUBMIT_WEIGHT times a
+  scratch run, which is how they get priority without starving runs;
+- per-session token buckets (DSA_SESSION_TOKENS_PER_S, DSA_SESSION_BURST),
+  charged one token per hidden case at request admission.
+
+admit() is the fast-fail half, called by the routers before any work: an
+empty bucket, or a queue whose estimated wait exceeds
+DSA_ADMISSION_MAX_WAIT_S, is an immediate 429 with Retry-After. Submits skip
+both checks — they are the one request a candidate must never lose — and
+just queue at their higher weight. slot() is the scheduling half, held by
+app.utils.case_runner around each sandbox invocation.
+
+State is per process, like the semaphore it replaces; run more API replicas
+and each one admits its own share.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Literal
+
+from app.config import settings
+from app.exceptions.common import TooManyRequestsError
+from app.utils import metrics
+
+# Past this many tracked sessions, refilled buckets are pruned on admit().
+_MAX_IDLE_BUCKETS = 1024
+
+ExecutionKind = Literal["submit", "test", "run", "background"]
+
+
+@dataclass(frozen=True)
+class Flow:
+    """Who an execution is for. session_id=None is internal work (validation)."""
+
+    session_id: int | None
+    kind: ExecutionKind
+
+    @property
+    def weight(self) -> float:
+        return float(settings.DSA_SUBMIT_WEIGHT) if self.kind == "submit" else 1.0
+
+
+BACKGROUND_FLOW = Flow(session_id=None, kind="background")
+
+
+@dataclass
+class _Bucket:
+    tokens: float
+    updated_at: float
+
+
+class AdmissionScheduler:
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(1, capacity)
+        self.in_flight = 0
+        # (finish tag, arrival seq, waiter) — the smallest tag runs next.
+        self._queue: list[tuple[float, int, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+        # Self-clocked fair queuing: virtual time is the tag last dispatched,
+        # and each flow's next tag continues from its own previous one.
+        self._virtual_time = 0.0
+        self._last_tag: dict[Flow, float] = {}
+        self._buckets: dict[int, _Bucket] = {}
+        # Smoothed seconds one sandbox invocation holds a slot.
+        self._service_s = 1.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def estimated_wait_s(self) -> float:
+        return self.queue_depth / self.capacity * self._service_s
+
+    def admit(self, flow: Flow, cost: int) -> None:
+        """
+        Accept or reject a request about to run `cost` sandbox cases, raising
+        TooManyRequestsError with a Retry-After when it should back off.
+        """
+        if flow.kind == "submit" or flow.session_id is None:
+            return
+
+        wait_s = self.estimated_wait_s()
+        if wait_s > settings.DSA_ADMISSION_MAX_WAIT_S:
+            metrics.incr("admission.rejected.overload")
+            raise TooManyRequestsError(
+                "The code runner is busy; try again shortly",
+                retry_after_s=math.ceil(wait_s - settings.DSA_ADMISSION_MAX_WAIT_S) or 1,
+            )
+
+        now = time.monotonic()
+        burst = float(settings.DSA_SESSION_BURST)
+        if len(self._buckets) > _MAX_IDLE_BUCKETS:
+            self._drop_full_buckets(now, burst)
+        bucket = self._buckets.setdefault(flow.session_id, _Bucket(burst, now))
+        bucket.tokens = min(
+            burst, bucket.tokens + (now - bucket.updated_at) * settings.DSA_SESSION_TOKENS_PER_S
+        )
+        bucket.updated_at = now
+        # A request bigger than the burst only needs a full bucket, then runs
+        # the bucket into debt that later requests wait out.
+        needed = min(float(cost), burst)
+        if bucket.tokens < needed:
+            metrics.incr("admission.rejected.quota")
+            raise TooManyRequestsError(
+                "Too many code runs; slow down",
+                retry_after_s=math.ceil(
+                    (needed - bucket.tokens) / settings.DSA_SESSION_TOKENS_PER_S
+                ),
+            )
+        bucket.tokens -= cost
+
+    def _drop_full_buckets(self, now: float, burst: float) -> None:
+        # A bucket that has refilled is indistinguishable from a new one.
+        rate = settings.DSA_SESSION_TOKENS_PER_S
+        self._buckets = {
+            session_id: bucket
+            for session_id, bucket in self._buckets.items()
+            if bucket.tokens + (now - bucket.updated_at) * rate < burst
+        }
+
+    @asynccontextmanager
+    async def slot(self, flow: Flow) -> AsyncIterator[None]:
+        """Hold one of the `capacity` in-flight slots, granted in fair-queue order."""
+        await self._acquire(flow)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._service_s += 0.2 * (time.monotonic() - started - self._service_s)
+            self.in_flight -= 1
+            self._dispatch()
+
+    async def _acquire(self, flow: Flow) -> None:
+        tag = max(self._virtual_time, self._last_tag.get(flow, 0.0)) + 1.0 / flow.weight
+        self._last_tag[flow] = tag
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (tag, next(self._seq), waiter))
+        enqueued = time.monotonic()
+        # With a free slot this grants `waiter` straight away.
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Granted a slot in the same tick we were cancelled: hand it on.
+            if waiter.done() and not waiter.cancelled():
+                self.in_flight -= 1
+                self._dispatch()
+            raise
+        metrics.incr("admission.admitted")
+        metrics.incr("admission.wait_ms_total", int((time.monotonic() - enqueued) * 1000))
+
+    def _dispatch(self) -> None:
+        while self._queue and self.in_flight < self.capacity:
+            tag, _, waiter = heapq.heappop(self._queue)
+            if waiter.cancelled():
+                continue
+            self._virtual_time = max(self._virtual_time, tag)
+            self.in_flight += 1
+            waiter.set_result(None)
+        if not self._queue:
+            # Flows whose tags virtual time has passed would restart from it
+            # anyway; drop them so the map doesn't grow with every session.
+            self._last_tag = {f: t for f, t in self._last_tag.items() if t > self._virtual_time}
+        self._publish()
+
+    def _publish(self) -> None:
+        metrics.set_gauge("admission.queue_depth", self.queue_depth)
+        metrics.set_gauge("admission.in_flight", self.in_flight)
+        metrics.set_gauge("admission.estimated_wait_s", round(self.estimated_wait_s(), 3))
+
+
+# One scheduler per process: every sandbox call here shares its capacity.
+scheduler = AdmissionScheduler(settings.DSA_GLOBAL_CONCURRENCY)
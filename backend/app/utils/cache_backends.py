@@ -0,0 +1,99 @@
+"""
+CacheBackendInterface implementations: an in-process LRU and Redis.
+
+The memory backend is per process — fine for one API instance, and each
+taskiq worker warms its own. The Redis backend shares entries between every
+API replica and worker, at the price of a round trip per lookup.
+"""
+
+import ssl
+import time
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.interfaces.cache_backend import CacheBackendInterface
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def redis_from_url(url: str) -> Redis:
+    kwargs: dict[str, Any] = {}
+    # Same relaxed TLS as the taskiq broker for managed rediss:// URLs.
+    if url.startswith("rediss://"):
+        kwargs["ssl_cert_reqs"] = ssl.CERT_NONE
+    return Redis.from_url(url, **kwargs)
+
+
+class MemoryCacheBackend(CacheBackendInterface):
+    """
+    LRU bounded to `max_entries`; expired entries are dropped when read. No
+    locking needed — everything runs on the event loop.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    async def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl_s: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl_s, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class RedisCacheBackend(CacheBackendInterface):
+    """Entries as plain Redis strings with SETEX expiry under `prefix`."""
+
+    def __init__(self, prefix: str, url: str | None = None) -> None:
+        self.prefix = prefix
+        self.url = url or settings.REDIS_URL
+        self._redis: Redis | None = None
+
+    def _client(self) -> Redis:
+        if self._redis is None:
+            self._redis = redis_from_url(self.url)
+        return self._redis
+
+    async def get(self, key: str) -> str | None:
+        return (await self.get_many([key]))[0]
+
+    async def set(self, key: str, value: str, ttl_s: int) -> None:
+        await self.set_many({key: value}, ttl_s)
+
+    async def get_many(self, keys: Sequence[str]) -> list[str | None]:
+        if not keys:
+            return []
+        try:
+            values = await self._client().mget([self.prefix + key for key in keys])
+            return [value.decode() if isinstance(value, bytes) else value for value in values]
+        except RedisError as e:
+            logger.warning("Cache read from Redis failed; treating as miss: %s", e)
+            return [None] * len(keys)
+
+    async def set_many(self, items: Mapping[str, str], ttl_s: int) -> None:
+        if not items:
+            return
+        try:
+            async with self._client().pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.setex(self.prefix + key, ttl_s, value)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Cache write to Redis failed; dropping: %s", e)
@@ -0,0 +1,183 @@
+"""
+Shared hidden-test-case engine for DSA grading and dry runs.
+
+Every case is still an independent sandbox invocation (a crash on one case
+cannot affect another); they are just no longer awaited one after another.
+Two bounds keep the fan-out polite:
+
+- DSA_CASE_CONCURRENCY caps how many cases of ONE submission are in flight,
+  so a 20-case question can't grab the whole sandbox by itself;
+- the process-wide admission scheduler (app.utils.admission) caps sandbox
+  calls across every submission at DSA_GLOBAL_CONCURRENCY and hands free
+  slots out fairly between sessions, so a synchronized interview start
+  queues here instead of opening thousands of Piston requests at once.
+
+Results always come back in case order, whatever order the runs finish in.
+run_cases_until() is the fail-fast flavour used by dry runs: it schedules
+cases in a caller-chosen order and cancels the rest once the caller's stop
+condition is met.
+"""
+
+import asyncio
+from collections.abc import Callable, Sequence
+
+from app.config import settings
+from app.interfaces.compiler_runtime import CompilerRuntimeInterface, ExecutionResult
+from app.utils import execution_telemetry
+from app.utils.admission import BACKGROUND_FLOW, Flow, scheduler
+from app.utils.output_compare import outputs_match
+
+
+async def _run_chunk(
+    runtime: CompilerRuntimeInterface,
+    submission_slots: asyncio.Semaphore,
+    source_code: str,
+    language: str,
+    chunk: Sequence[str],
+    run_timeout_ms: int | None,
+    flow: Flow,
+) -> list[ExecutionResult]:
+    # Per-submission slot first, so a submission waiting on its own cap
+    # never sits on a global slot another submission could use.
+    async with submission_slots, scheduler.slot(flow):
+        if len(chunk) > 1:
+            results = await runtime.execute_batch(source_code, language, chunk, run_timeout_ms)
+        else:
+            results = [
+                await runtime.execute(
+                    source_code=source_code,
+                    language=language,
+                    stdin=chunk[0],
+                    run_timeout_ms=run_timeout_ms,
+                )
+            ]
+    execution_telemetry.record(flow.kind, results)
+    return results
+
+
+async def run_cases(
+    runtime: CompilerRuntimeInterface,
+    source_code: str,
+    language: str,
+    stdins: Sequence[str],
+    run_timeout_ms: int | None = None,
+    flow: Flow = BACKGROUND_FLOW,
+    on_result: Callable[[int, ExecutionResult], None] | None = None,
+) -> list[ExecutionResult]:
+    """
+    Run `source_code` once per stdin, concurrently, and return the results in
+    the same order as `stdins`. If any run raises (sandbox unreachable, HTTP
+    error), the remaining runs are cancelled and that first error propagates —
+    the same outcome the sequential loop had.
+
+    When the runtime has a batch mode for `language`, consecutive cases are
+    grouped into chunks of runtime.batch_size(); each chunk is one sandbox
+    invocation and takes one slot under both bounds. `flow` says whose work
+    this is, for the scheduler's fair queuing. `on_result(index, result)`, if
+    given, is called as each result arrives, for callers streaming progress.
+    """
+    submission_slots = asyncio.Semaphore(settings.DSA_CASE_CONCURRENCY)
+    size = max(1, runtime.batch_size(language))
+
+    async def run_chunk(start: int) -> list[ExecutionResult]:
+        chunk_results = await _run_chunk(
+            runtime,
+            submission_slots,
+            source_code,
+            language,
+            stdins[start : start + size],
+            run_timeout_ms,
+            flow,
+        )
+        if on_result is not None:
+            for offset, result in enumerate(chunk_results):
+                on_result(start + offset, result)
+        return chunk_results
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(run_chunk(start)) for start in range(0, len(stdins), size)]
+    except ExceptionGroup as eg:
+        raise eg.exceptions[0] from None
+
+    return [result for task in tasks for result in task.result()]
+
+
+class _EarlyStopError(Exception):
+    """Raised inside run_cases_until's task group to cancel the other runs."""
+
+
+async def run_cases_until(
+    runtime: CompilerRuntimeInterface,
+    source_code: str,
+    language: str,
+    stdins: Sequence[str],
+    stop: Callable[[int, ExecutionResult], bool],
+    order: Sequence[int] | None = None,
+    run_timeout_ms: int | None = None,
+    flow: Flow = BACKGROUND_FLOW,
+) -> list[ExecutionResult | None]:
+    """
+    Fail-fast variant of run_cases(). Cases are scheduled in `order` (indices
+    into `stdins`; stored order by default) and `stop(index, result)` is
+    called as each result arrives. Once it returns True, runs still queued or
+    in flight are cancelled; their slots come back as None.
+
+    The first chunk runs alone, so code that doesn't compile — or fails the
+    case most likely to fail — costs one sandbox invocation, not a fan-out.
+    """
+    schedule = list(range(len(stdins))) if order is None else list(order)
+    submission_slots = asyncio.Semaphore(settings.DSA_CASE_CONCURRENCY)
+    size = max(1, runtime.batch_size(language))
+    chunks = [schedule[i : i + size] for i in range(0, len(schedule), size)]
+    results: list[ExecutionResult | None] = [None] * len(stdins)
+
+    async def run_chunk(indices: list[int]) -> None:
+        chunk_results = await _run_chunk(
+            runtime,
+            submission_slots,
+            source_code,
+            language,
+            [stdins[idx] for idx in indices],
+            run_timeout_ms,
+            flow,
+        )
+        stopped = False
+        for idx, result in zip(indices, chunk_results, strict=True):
+            results[idx] = result
+            # No short-circuit: stop() sees every result the chunk produced.
+            stopped = stop(idx, result) or stopped
+        if stopped:
+            raise _EarlyStopError
+
+    try:
+        try:
+            if chunks:
+                await run_chunk(chunks[0])
+            async with asyncio.TaskGroup() as tg:
+                for chunk in chunks[1:]:
+                    tg.create_task(run_chunk(chunk))
+        except* _EarlyStopError:
+            pass
+    except ExceptionGroup as eg:
+        raise eg.exceptions[0] from None
+
+    return results
+
+
+def case_status(
+    result: ExecutionResult | None, expected_stdout: str, float_tolerance: float | None = None
+) -> str:
+    """
+    Verdict for one hidden case: "output_limit_exceeded" past
+    DSA_MAX_OUTPUT_BYTES, "error" on a non-zero exit, else passed/failed by
+    app.utils.output_compare; "skipped" for a case a fail-fast run never
+    got to.
+    """
+    if result is None:
+        return "skipped"
+    if result.output_limit_exceeded or len(result.stdout) > settings.DSA_MAX_OUTPUT_BYTES:
+        return "output_limit_exceeded"
+    if result.exit_code != 0:
+        return "error"
+    return "passed" if outputs_match(result.stdout, expected_stdout, float_tolerance) else "failed"
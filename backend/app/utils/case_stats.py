@@ -0,0 +1,58 @@
+"""
+Per-case pass/fail tallies (DsaCaseStat) and the failure-first schedule that
+fail-fast dry runs derive from them.
+"""
+
+from collections.abc import Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.dsa_question import DsaCaseStat
+
+
+async def failure_first_order(db: AsyncSession, question_id: int, total: int) -> list[int]:
+    """
+    0-based case indices, most-often-failed first. The rate is smoothed
+    ((failed + 1) / (runs + 2)) so a case seen once doesn't outrank one that
+    failed 40 of 50 times; untracked cases sit at 0.5 and ties keep stored order.
+    """
+    rows = await db.execute(
+        select(DsaCaseStat.case_index, DsaCaseStat.passed, DsaCaseStat.failed).where(
+            DsaCaseStat.question_id == question_id
+        )
+    )
+    rate = {case: (failed + 1) / (passed + failed + 2) for case, passed, failed in rows}
+    return sorted(range(total), key=lambda idx: -rate.get(idx + 1, 0.5))
+
+
+async def record_case_outcomes(db: AsyncSession, question_id: int, statuses: Sequence[str]) -> None:
+    """
+    Add one run's verdicts (statuses[i] is case i + 1) to the tallies in a
+    single upsert; "skipped" cases are not counted. Increments happen in
+    SQL, so concurrent runs never lose updates. The caller commits.
+    """
+    rows = [
+        {
+            "question_id": question_id,
+            "case_index": idx,
+            "passed": int(status == "passed"),
+            "failed": int(status in ("failed", "error")),
+        }
+        for idx, status in enumerate(statuses, 1)
+        if status != "skipped"
+    ]
+    if not rows:
+        return
+    stmt = insert(DsaCaseStat).values(rows)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            constraint="uq_dsa_case_stats_question_case",
+            set_={
+                "passed": DsaCaseStat.passed + stmt.excluded.passed,
+                "failed": DsaCaseStat.failed + stmt.excluded.failed,
+                "updated_at": func.now(),
+            },
+        )
+    )
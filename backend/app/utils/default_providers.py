@@ -1,5 +1,6 @@
 from app.config import settings
 from app.interfaces.background_worker import BackgroundWorkerInterface
+from app.interfaces.compiler_runtime import CompilerRuntimeInterface
 from app.interfaces.email_provider import EmailProvider
 from app.interfaces.storage_proivder import StorageProviderInterface
 
@@ -29,3 +30,25 @@ def default_email_provider() -> EmailProvider:
         return SmtpEmailProvider()
 
     raise ValueError(f"Unknown email provider: '{settings.EMAIL_PROVIDER}'")
+
+
+def default_compiler_runtime() -> CompilerRuntimeInterface:
+    # Both sit behind the content-addressed execution result cache.
+    from app.utils.execution_cache import cached_runtime
+
+    runtime: CompilerRuntimeInterface
+    if settings.COMPILER_RUNTIME == "piston":
+        from app.utils.piston_client import PistonClient
+
+        runtime = PistonClient()
+    elif settings.COMPILER_RUNTIME == "local":
+        from app.utils.local_sandbox import LocalSandboxRuntime
+
+        runtime = LocalSandboxRuntime()
+    else:
+        raise ValueError(f"Unknown compiler runtime: '{settings.COMPILER_RUNTIME}'")
+    if settings.PYTHON_POOL_SIZE > 0:
+        from app.utils.python_pool import PythonPoolRuntime
+
+        runtime = PythonPoolRuntime(runtime)
+    return cached_runtime(runtime)
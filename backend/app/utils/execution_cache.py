@@ -0,0 +1,137 @@
+"""
+Content-addressed cache of sandbox executions.
+
+Candidates re-click Run/Test/Submit on unchanged code all the time, and every
+click used to re-run every hidden case in Piston. A run is a pure function of
+(source, runtime, stdin, time limit), so CachedRuntime keys each one on the
+SHA-256 of exactly that tuple and answers repeats from the cache. Grading
+bookkeeping is untouched — an identical resubmission still bumps `attempts`,
+it just costs no sandbox time.
+
+Runs the sandbox killed (exit code -1: time limit or signal) are never
+stored: whether a borderline solution times out depends on how loaded the
+sandbox was, and a cached TLE would make that verdict sticky.
+
+EXECUTION_CACHE_BACKEND picks the store: "memory" (per-process LRU),
+"redis" (shared by every API replica and worker) or "none". Hits and misses
+are counted in app.utils.metrics.
+"""
+
+import hashlib
+import json
+from collections.abc import Sequence
+
+from app.config import settings
+from app.interfaces.cache_backend import CacheBackendInterface
+from app.interfaces.compiler_runtime import CompilerRuntimeInterface, ExecutionResult, RuntimeInfo
+from app.utils import metrics
+from app.utils.cache_backends import MemoryCacheBackend, RedisCacheBackend
+
+_backend: CacheBackendInterface | None = None
+
+
+def execution_cache_backend() -> CacheBackendInterface | None:
+    """The process-wide execution cache store, or None when caching is off."""
+    global _backend
+    if settings.EXECUTION_CACHE_BACKEND == "none":
+        return None
+    if _backend is None:
+        if settings.EXECUTION_CACHE_BACKEND == "memory":
+            _backend = MemoryCacheBackend(settings.EXECUTION_CACHE_MAX_ENTRIES)
+        elif settings.EXECUTION_CACHE_BACKEND == "redis":
+            _backend = RedisCacheBackend(prefix="interxai:exec:v2:")
+        else:
+            raise ValueError(
+                f"Unknown execution cache backend: '{settings.EXECUTION_CACHE_BACKEND}'"
+            )
+    return _backend
+
+
+def cached_runtime(runtime: CompilerRuntimeInterface) -> CompilerRuntimeInterface:
+    """Wrap `runtime` in the execution cache, unless caching is disabled."""
+    backend = execution_cache_backend()
+    return runtime if backend is None else CachedRuntime(runtime, backend)
+
+
+class CachedRuntime(CompilerRuntimeInterface):
+    """
+    Decorator over another runtime: lookups first, and only the misses reach
+    the wrapped runtime — batched, if it has a batch mode.
+    """
+
+    def __init__(self, inner: CompilerRuntimeInterface, backend: CacheBackendInterface) -> None:
+        self.inner = inner
+        self.backend = backend
+
+    async def execute(
+        self,
+        source_code: str,
+        language: str,
+        stdin: str = "",
+        run_timeout_ms: int | None = None,
+    ) -> ExecutionResult:
+        return (await self.execute_batch(source_code, language, [stdin], run_timeout_ms))[0]
+
+    async def execute_batch(
+        self,
+        source_code: str,
+        language: str,
+        stdins: Sequence[str],
+        run_timeout_ms: int | None = None,
+    ) -> list[ExecutionResult]:
+        runtime = self.inner.runtime_id(language)
+        keys = [self._key(source_code, runtime, stdin, run_timeout_ms) for stdin in stdins]
+        stored = await self.backend.get_many(keys)
+
+        results: list[ExecutionResult | None] = [
+            None
+            if value is None
+            else ExecutionResult.model_validate_json(value).model_copy(update={"cached": True})
+            for value in stored
+        ]
+        missing = [idx for idx, result in enumerate(results) if result is None]
+        metrics.incr("execution_cache.hits", len(stdins) - len(missing))
+        metrics.incr("execution_cache.misses", len(missing))
+        if not missing:
+            return [result for result in results if result is not None]
+
+        if len(missing) == 1:
+            fresh = [
+                await self.inner.execute(
+                    source_code=source_code,
+                    language=language,
+                    stdin=stdins[missing[0]],
+                    run_timeout_ms=run_timeout_ms,
+                )
+            ]
+        else:
+            fresh = await self.inner.execute_batch(
+                source_code, language, [stdins[idx] for idx in missing], run_timeout_ms
+            )
+
+        to_store: dict[str, str] = {}
+        for idx, result in zip(missing, fresh, strict=True):
+            results[idx] = result
+            if result.exit_code != -1:
+                to_store[keys[idx]] = result.model_dump_json()
+        await self.backend.set_many(to_store, settings.EXECUTION_CACHE_TTL_S)
+
+        return [result for result in results if result is not None]
+
+    async def list_runtimes(self) -> list[RuntimeInfo]:
+        return await self.inner.list_runtimes()
+
+    async def validate_language(self, language: str) -> None:
+        await self.inner.validate_language(language)
+
+    def runtime_id(self, language: str) -> str:
+        return self.inner.runtime_id(language)
+
+    def batch_size(self, language: str) -> int:
+        return self.inner.batch_size(language)
+
+    @staticmethod
+    def _key(source_code: str, runtime: str, stdin: str, run_timeout_ms: int | None) -> str:
+        # JSON framing keeps the fields unambiguous ("ab"+"c" ≠ "a"+"bc").
+        material = json.dumps([source_code, runtime, stdin, run_timeout_ms])
+        return hashlib.sha256(material.encode()).hexdigest()
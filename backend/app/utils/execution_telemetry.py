@@ -0,0 +1,86 @@
+"""
+Where the time of a grading run went, from the telemetry fields of its
+ExecutionResults.
+
+record() feeds every sandbox call into app.utils.metrics, per execution kind
+(run/test/submit/background): counters of cases, cache hits, time-limit
+kills, signals and output-limit cuts, plus running totals of wall, CPU,
+compile and round-trip milliseconds and of peak memory, so a scraper can
+derive averages and tell sandbox queueing (round trip minus wall) from
+compile time and the candidate's own runtime. summarize() condenses one
+submission's results into the JSON stored on DsaInteraction.execution_stats.
+
+Which fields are filled depends on the runtime: Piston reports all of them
+(CPU time and memory from 3.1 on), the Python pool all but compile time,
+the local sandbox wall time, compile time, signal and timeout only. Cached
+results carry the original run's numbers and are left out of the timings.
+"""
+
+from collections import Counter
+from collections.abc import Sequence
+from typing import Any
+
+from app.interfaces.compiler_runtime import ExecutionResult
+from app.utils import metrics
+
+# ExecutionResult field -> running-total counter.
+_TOTALS = {
+    "wall_time_ms": "wall_ms_total",
+    "cpu_time_ms": "cpu_ms_total",
+    "compile_time_ms": "compile_ms_total",
+    "round_trip_ms": "round_trip_ms_total",
+}
+
+
+def record(kind: str, results: Sequence[ExecutionResult]) -> None:
+    prefix = f"execution.{kind}"
+    metrics.incr(f"{prefix}.cases", len(results))
+    for result in results:
+        if result.cached:
+            metrics.incr(f"{prefix}.cached")
+            continue
+        for field, counter in _TOTALS.items():
+            value = getattr(result, field)
+            if value is not None:
+                metrics.incr(f"{prefix}.{counter}", value)
+        if result.memory_bytes is not None:
+            metrics.incr(f"{prefix}.memory_kb_total", result.memory_bytes // 1024)
+        if result.timed_out:
+            metrics.incr(f"{prefix}.timeouts")
+        if result.signal is not None:
+            metrics.incr(f"{prefix}.signals.{result.signal}")
+        if result.output_limit_exceeded:
+            metrics.incr(f"{prefix}.output_limit_exceeded")
+
+
+def _spread(values: list[int]) -> dict[str, int] | None:
+    return {"sum": sum(values), "max": max(values)} if values else None
+
+
+def summarize(results: Sequence[ExecutionResult | None]) -> dict[str, Any]:
+    """
+    {"cases", "cached", "wall_ms", "cpu_ms", "round_trip_ms" ({"sum", "max"}
+    or None), "compile_ms", "max_memory_bytes", "timeouts", "signals",
+    "output_limit_exceeded"} over `results`; None entries (cases never run)
+    count towards "cases" only.
+    """
+    ran = [r for r in results if r is not None]
+    fresh = [r for r in ran if not r.cached]
+
+    def values(field: str) -> list[int]:
+        return [v for r in fresh if (v := getattr(r, field)) is not None]
+
+    compile_times = values("compile_time_ms")
+    memory = values("memory_bytes")
+    return {
+        "cases": len(results),
+        "cached": len(ran) - len(fresh),
+        "wall_ms": _spread(values("wall_time_ms")),
+        "cpu_ms": _spread(values("cpu_time_ms")),
+        "round_trip_ms": _spread(values("round_trip_ms")),
+        "compile_ms": max(compile_times) if compile_times else None,
+        "max_memory_bytes": max(memory) if memory else None,
+        "timeouts": sum(1 for r in ran if r.timed_out),
+        "signals": dict(Counter(r.signal for r in ran if r.signal is not None)),
+        "output_limit_exceeded": sum(1 for r in ran if r.output_limit_exceeded),
+    }
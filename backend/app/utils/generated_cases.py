@@ -0,0 +1,210 @@
+"""
+Generator-backed hidden cases.
+
+Besides literal {"stdin", "expected_stdout"} entries, DsaQuestion.test_cases
+may hold
+
+    {"generator": <Python source>, "seed": <int>, "expected_sha256": <hex>}
+
+The generator reads the seed from stdin and prints the case's stdin; the
+question's sample_solution, run on that input, gives the expected output,
+and the SHA-256 of its normalize_expected() form must equal
+expected_sha256. A large-N stress case thus costs a few hundred bytes in the
+row instead of megabytes, and a generator or solution that drifted is
+caught instead of silently grading against different data.
+
+expand_cases() turns such entries into literal ones just before grading.
+Both programs run through the compiler runtime, so a generated input is
+bounded like any program's output (DSA_MAX_OUTPUT_BYTES). Expansions are
+cached on local disk under DSA_CASE_CACHE_DIR, one directory per
+(question, case, seed, generator), and the expected output is re-checked
+against the digest on every read; the DSA_CASE_CACHE_MAX_ENTRIES most
+recently used are kept.
+
+generated_case() authors an entry from a generator and a seed, taking the
+digest from the reference solution's output; the dsa_cases job
+(app.background.taskiq.tasks.dsa_cases) adds such cases to a question
+already in the bank.
+"""
+
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from app.config import settings
+from app.interfaces.compiler_runtime import CompilerRuntimeInterface
+from app.logger import get_logger
+from app.models.dsa_question import DsaQuestion
+from app.utils.admission import BACKGROUND_FLOW, Flow, scheduler
+from app.utils.output_compare import normalize_expected
+
+logger = get_logger(__name__)
+
+# Generators and reference solutions are both Python (see app.ai.prompts).
+_LANGUAGE = "python"
+_EXPAND_LOCKS = [asyncio.Lock() for _ in range(64)]
+# What a candidate is told when grading can't start for want of a case.
+CASES_UNAVAILABLE = (
+    "This question's hidden test cases could not be prepared; please try again later"
+)
+
+
+class GeneratedCaseError(Exception):
+    """A generator-backed case could not be expanded into a trustworthy input."""
+
+
+def is_generated(case: dict[str, Any]) -> bool:
+    return "generator" in case
+
+
+def _cache_dir() -> Path:
+    path = Path(settings.DSA_CASE_CACHE_DIR or tempfile.gettempdir()) / "interxai-cases"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+async def generated_case(
+    generator: str,
+    seed: int,
+    solution: str,
+    runtime: CompilerRuntimeInterface,
+    flow: Flow = BACKGROUND_FLOW,
+) -> dict[str, Any]:
+    """
+    The generator-backed test_cases entry for `generator` run with `seed`,
+    its digest taken from `solution`'s output. Raises GeneratedCaseError
+    when either program fails.
+    """
+    _, expected = await _generate(runtime, flow, generator, seed, solution, f"seed {seed}")
+    return {"generator": generator, "seed": seed, "expected_sha256": _digest(expected)}
+
+
+async def expand_cases(
+    question: DsaQuestion,
+    runtime: CompilerRuntimeInterface,
+    flow: Flow = BACKGROUND_FLOW,
+) -> list[dict[str, str]]:
+    """
+    question.test_cases with every generator-backed entry replaced by its
+    literal {"stdin", "expected_stdout"} form. Needs test_cases and, when
+    any case is generated, sample_solution loaded. Raises GeneratedCaseError
+    when a case can't be expanded, rather than grade against a bad input.
+    """
+    cases: list[dict[str, Any]] = question.test_cases or []
+    if not any(is_generated(case) for case in cases):
+        return cases
+    if not question.sample_solution:
+        raise GeneratedCaseError(
+            f"Question {question.id} has generated cases but no sample_solution"
+        )
+    solution = question.sample_solution
+
+    async def expand(index: int, case: dict[str, Any]) -> dict[str, str]:
+        if not is_generated(case):
+            return case
+        return await _expanded(question.id, index, case, solution, runtime, flow)
+
+    return list(await asyncio.gather(*(expand(i, case) for i, case in enumerate(cases, 1))))
+
+
+async def _expanded(
+    question_id: int,
+    index: int,
+    case: dict[str, Any],
+    solution: str,
+    runtime: CompilerRuntimeInterface,
+    flow: Flow,
+) -> dict[str, str]:
+    key = f"{question_id}-{index}-{case['seed']}-{_digest(case['generator'])[:16]}"
+    entry = _cache_dir() / key
+    # One expansion per key at a time; concurrent graders wait for the first.
+    async with _EXPAND_LOCKS[hash(key) % len(_EXPAND_LOCKS)]:
+        cached = _read(entry, case["expected_sha256"])
+        if cached is not None:
+            return cached
+        stdin, expected = await _generate(
+            runtime, flow, case["generator"], case["seed"], solution, key
+        )
+        if _digest(expected) != case["expected_sha256"]:
+            raise GeneratedCaseError(f"Case {key}: expected output does not match its digest")
+        _write(entry, stdin, expected)
+    return {"stdin": stdin, "expected_stdout": expected}
+
+
+async def _generate(
+    runtime: CompilerRuntimeInterface,
+    flow: Flow,
+    generator: str,
+    seed: int,
+    solution: str,
+    key: str,
+) -> tuple[str, str]:
+    """The generated stdin and the solution's normalized output on it."""
+    stdin = await _run(runtime, flow, generator, f"{seed}\n", key, "generator")
+    return stdin, normalize_expected(await _run(runtime, flow, solution, stdin, key, "solution"))
+
+
+async def _run(
+    runtime: CompilerRuntimeInterface,
+    flow: Flow,
+    source: str,
+    stdin: str,
+    key: str,
+    role: str,
+) -> str:
+    async with scheduler.slot(flow):
+        result = await runtime.execute(
+            source_code=source,
+            language=_LANGUAGE,
+            stdin=stdin,
+            run_timeout_ms=settings.DSA_GENERATOR_TIMEOUT_MS,
+        )
+    if not result.ok or result.output_limit_exceeded:
+        raise GeneratedCaseError(
+            f"Case {key}: {role} failed (exit {result.exit_code}): {result.stderr[:200]}"
+        )
+    return result.stdout
+
+
+def _read(entry: Path, expected_sha256: str) -> dict[str, str] | None:
+    try:
+        expected = (entry / "expected").read_text(encoding="utf-8")
+        if _digest(expected) != expected_sha256:
+            logger.warning("Discarding cached case %s: digest mismatch", entry.name)
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        stdin = (entry / "stdin").read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+    os.utime(entry)  # most recently used, for eviction
+    return {"stdin": stdin, "expected_stdout": expected}
+
+
+def _write(entry: Path, stdin: str, expected: str) -> None:
+    # Written in a private directory and renamed into place, so another
+    # worker process never reads a half-written case.
+    staging = Path(tempfile.mkdtemp(prefix=".case-", dir=entry.parent))
+    (staging / "stdin").write_text(stdin, encoding="utf-8")
+    (staging / "expected").write_text(expected, encoding="utf-8")
+    try:
+        staging.rename(entry)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+    _evict(entry.parent)
+
+
+def _evict(cache_dir: Path) -> None:
+    entries = [p for p in cache_dir.iterdir() if not p.name.startswith(".")]
+    excess = len(entries) - settings.DSA_CASE_CACHE_MAX_ENTRIES
+    if excess > 0:
+        entries.sort(key=lambda p: p.stat().st_mtime)
+        for stale in entries[:excess]:
+            shutil.rmtree(stale, ignore_errors=True)
@@ -0,0 +1,133 @@
+"""
+Long-lived, keep-alive HTTP clients for the sandbox (Piston) and vision
+upstreams.
+
+Opening an ``httpx.AsyncClient`` per call means a fresh TCP (and TLS)
+handshake for every test case and every proctoring frame. Instead each
+upstream gets ONE pooled client for the lifetime of the process: the API
+creates them in its lifespan (:func:`http_clients_lifespan`) and the taskiq
+worker on WORKER_STARTUP, and both close them on shutdown.
+
+Callers that run outside either lifecycle (the DSA seeder, one-off scripts)
+still work — the getters build the client lazily on first use.
+
+Each upstream is also a pool of nodes (app.utils.upstream_pool): PISTON_URL
+and VISION_URL take comma-separated lists, and the same lifecycle starts and
+stops the pools' health probes.
+"""
+
+import importlib.util
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import FastAPI
+
+from app.config import settings
+from app.logger import get_logger
+from app.utils.upstream_pool import UpstreamPool, endpoint_list
+
+logger = get_logger(__name__)
+
+_clients: dict[str, httpx.AsyncClient] = {}
+_pools: dict[str, UpstreamPool] = {}
+
+
+def _http2_enabled() -> bool:
+    if not settings.HTTP2_ENABLED:
+        return False
+    # httpx only speaks HTTP/2 with the optional `h2` package installed.
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP2_ENABLED is set but `h2` is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def _build(max_connections: int, max_keepalive: int) -> httpx.AsyncClient:
+    # The default timeout only bounds connecting and waiting for a pooled
+    # connection; each operation passes its own read timeout per request.
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_S,
+        ),
+        timeout=httpx.Timeout(
+            None,
+            connect=settings.HTTP_CONNECT_TIMEOUT_S,
+            pool=settings.HTTP_POOL_TIMEOUT_S,
+        ),
+        http2=_http2_enabled(),
+    )
+
+
+def piston_http() -> httpx.AsyncClient:
+    """The shared pooled client for Piston."""
+    client = _clients.get("piston")
+    if client is None or client.is_closed:
+        client = _clients["piston"] = _build(
+            settings.PISTON_MAX_CONNECTIONS, settings.PISTON_MAX_KEEPALIVE
+        )
+    return client
+
+
+def vision_http() -> httpx.AsyncClient:
+    """The shared pooled client for the vision service."""
+    client = _clients.get("vision")
+    if client is None or client.is_closed:
+        client = _clients["vision"] = _build(
+            settings.VISION_MAX_CONNECTIONS, settings.VISION_MAX_KEEPALIVE
+        )
+    return client
+
+
+def piston_pool() -> UpstreamPool:
+    """The Piston nodes named by PISTON_URL."""
+    pool = _pools.get("piston")
+    if pool is None:
+        pool = _pools["piston"] = UpstreamPool(
+            "piston", endpoint_list(settings.PISTON_URL), "/api/v2/runtimes"
+        )
+    return pool
+
+
+def vision_pool() -> UpstreamPool:
+    """The vision nodes named by VISION_URL."""
+    pool = _pools.get("vision")
+    if pool is None:
+        pool = _pools["vision"] = UpstreamPool(
+            "vision", endpoint_list(settings.VISION_URL), "/health"
+        )
+    return pool
+
+
+async def startup_http_clients() -> None:
+    """Open the pooled upstream clients up front, so the first request doesn't pay for it."""
+    piston_pool().start_probes(piston_http())
+    vision_pool().start_probes(vision_http())
+    logger.info(
+        "Upstream HTTP clients ready (piston: %d node(s), vision: %d node(s))",
+        len(piston_pool().nodes),
+        len(vision_pool().nodes),
+    )
+
+
+async def shutdown_http_clients() -> None:
+    """Stop the health probes, then close every pooled client and forget the node pools."""
+    for pool in _pools.values():
+        await pool.stop_probes()
+    _pools.clear()
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+@asynccontextmanager
+async def http_clients_lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """The API's lifespan for the pooled clients. Compose it into main's lifespan."""
+    await startup_http_clients()
+    try:
+        yield
+    finally:
+        await shutdown_http_clients()
@@ -2,6 +2,7 @@ from datetime import datetime
 
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 
 from app.exceptions.common import BadRequestError, NotFoundError
 from app.logger import get_logger
@@ -113,30 +114,43 @@ async def session_dsa_interactions(
     All DsaInteractions assigned to this session (oldest first), each paired
     with its DsaQuestion. Interactions whose question row was deleted
     (question_id is NULL via ondelete=SET NULL) are excluded by the join.
+    Questions come with their description but not their hidden cases or
+    reference solution.
     """
     result = await db.execute(
         select(DsaInteraction, DsaQuestion)
         .join(DsaQuestion, DsaInteraction.question_id == DsaQuestion.id)
         .where(DsaInteraction.session_id == session_id)
+        .options(undefer(DsaQuestion.description))
         .order_by(DsaInteraction.id.asc())
     )
     return list(result.tuples().all())
 
 
 async def dsa_interaction_by_id(
-    session_id: int, interaction_id: int, db: AsyncSession
+    session_id: int, interaction_id: int, db: AsyncSession, *, with_test_cases: bool = False
 ) -> tuple[DsaInteraction, DsaQuestion]:
     """
     Load one of this session's DsaInteractions by id, paired with its question.
     The session check prevents a candidate from targeting another session's
     interaction; raising (rather than falling back to a cursor) is what makes
-    run/test/submit safe to retry.
+    run/test/submit safe to retry. The question's hidden test cases, and the
+    reference solution that expands generated ones, are only loaded
+    `with_test_cases`.
     """
     interaction = await db.get(DsaInteraction, interaction_id)
     if interaction is None or interaction.session_id != session_id:
         raise NotFoundError("DSA question not found for this session")
     question = (
-        await db.get(DsaQuestion, interaction.question_id)
+        await db.get(
+            DsaQuestion,
+            interaction.question_id,
+            options=(
+                [undefer(DsaQuestion.test_cases), undefer(DsaQuestion.sample_solution)]
+                if with_test_cases
+                else None
+            ),
+        )
         if interaction.question_id is not None
         else None
     )
@@ -0,0 +1,173 @@
+"""
+Cache of LLM responses for the agent layer.
+
+Re-grading a transcript, re-screening an identical resume PDF and retried
+tasks all used to call the provider again for byte-identical input.
+CachedLLMProvider keys each call on the SHA-256 of (model, prompt template,
+output format instructions, variables): the template and format
+instructions are hashed whole, so editing a prompt or an output schema
+starts from a cold cache rather than serving answers to the old one, and the
+variables are canonical JSON (sorted keys), so the same request always maps
+to the same entry. Failed calls, and answers that don't validate against
+the agent's output model, are never stored, so a retry of a malformed
+answer asks the provider again; identical calls in flight at once share
+one provider call.
+
+Every BaseAgent is wrapped on construction with its `cache_ttl_s` (None:
+LLM_CACHE_TTL_S); agents that must produce something new on every call,
+like the DSA question generator, set 0 to opt out. LLM_CACHE_BACKEND picks
+the store as EXECUTION_CACHE_BACKEND does for the execution cache:
+"memory", "redis" or "none". Hits, misses and shared calls are counted in
+app.utils.metrics.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+from typing import Any
+
+from langchain_core.output_parsers import BaseOutputParser
+from langchain_core.prompts.base import BasePromptTemplate
+from pydantic import BaseModel, ValidationError
+
+from app.config import settings
+from app.interfaces.cache_backend import CacheBackendInterface
+from app.interfaces.llm_provider import LLMProviderInterface
+from app.logger import get_logger
+from app.utils import metrics
+from app.utils.cache_backends import MemoryCacheBackend, RedisCacheBackend
+
+logger = get_logger(__name__)
+
+_backend: CacheBackendInterface | None = None
+# Key -> the provider call answering it, while one is in flight.
+_in_flight: dict[str, asyncio.Future[Any]] = {}
+
+
+def llm_cache_backend() -> CacheBackendInterface | None:
+    """The process-wide LLM response store, or None when caching is off."""
+    global _backend
+    if settings.LLM_CACHE_BACKEND == "none":
+        return None
+    if _backend is None:
+        if settings.LLM_CACHE_BACKEND == "memory":
+            _backend = MemoryCacheBackend(settings.LLM_CACHE_MAX_ENTRIES)
+        elif settings.LLM_CACHE_BACKEND == "redis":
+            _backend = RedisCacheBackend(prefix="interxai:llm:v1:")
+        else:
+            raise ValueError(f"Unknown LLM cache backend: '{settings.LLM_CACHE_BACKEND}'")
+    return _backend
+
+
+def cached_llm_provider(
+    provider: LLMProviderInterface,
+    ttl_s: int | None = None,
+    output_model: type[BaseModel] | None = None,
+) -> LLMProviderInterface:
+    """
+    Wrap `provider` in the LLM response cache with entries kept `ttl_s`
+    (None: LLM_CACHE_TTL_S), unless caching is disabled or `ttl_s` is 0.
+    With `output_model`, only answers that validate against it are stored.
+    """
+    if isinstance(provider, CachedLLMProvider):
+        provider = provider.inner
+    ttl_s = settings.LLM_CACHE_TTL_S if ttl_s is None else ttl_s
+    backend = llm_cache_backend()
+    if backend is None or ttl_s <= 0:
+        return provider
+    return CachedLLMProvider(provider, backend, ttl_s, output_model)
+
+
+class CachedLLMProvider(LLMProviderInterface):
+    """Decorator over another provider: lookups first, and only misses reach it."""
+
+    def __init__(
+        self,
+        inner: LLMProviderInterface,
+        backend: CacheBackendInterface,
+        ttl_s: int,
+        output_model: type[BaseModel] | None = None,
+    ) -> None:
+        self.inner = inner
+        self.backend = backend
+        self.ttl_s = ttl_s
+        self.output_model = output_model
+
+    def model_id(self) -> str:
+        return self.inner.model_id()
+
+    async def generate_response(  # type: ignore[override]
+        self,
+        prompt: BasePromptTemplate[Any],
+        variables: dict[str, Any],
+        output_parser: BaseOutputParser[Any],
+    ) -> Any:
+        key = self._key(prompt, variables, output_parser)
+        stored = await self.backend.get(key)
+        if stored is not None:
+            metrics.incr("llm_cache.hits")
+            return json.loads(stored)
+
+        pending = _in_flight.get(key)
+        if pending is not None:
+            metrics.incr("llm_cache.shared")
+            # A copy: callers may modify what they get back.
+            return copy.deepcopy(await asyncio.shield(pending))
+
+        metrics.incr("llm_cache.misses")
+        call = asyncio.ensure_future(
+            self._call_and_store(key, prompt, dict(variables), output_parser)
+        )
+        _in_flight[key] = call
+        call.add_done_callback(lambda _: _in_flight.pop(key, None))
+        return copy.deepcopy(await asyncio.shield(call))
+
+    async def _call_and_store(
+        self,
+        key: str,
+        prompt: BasePromptTemplate[Any],
+        variables: dict[str, Any],
+        output_parser: BaseOutputParser[Any],
+    ) -> Any:
+        result = await self.inner.generate_response(
+            prompt=prompt, variables=variables, output_parser=output_parser
+        )
+        if self.output_model is not None:
+            try:
+                self.output_model.model_validate(result)
+            except ValidationError:
+                metrics.incr("llm_cache.invalid")
+                return result
+        try:
+            value = json.dumps(result)
+        except (TypeError, ValueError):
+            logger.warning("LLM response of type %s not cacheable", type(result).__name__)
+        else:
+            await self.backend.set(key, value, self.ttl_s)
+        return result
+
+    def _key(
+        self,
+        prompt: BasePromptTemplate[Any],
+        variables: dict[str, Any],
+        output_parser: BaseOutputParser[Any],
+    ) -> str:
+        # The provider fills format_instructions from the parser itself; the
+        # parser's own instructions stand in for it.
+        instructions = (
+            output_parser.get_format_instructions()
+            if hasattr(output_parser, "get_format_instructions")
+            else type(output_parser).__name__
+        )
+        material = json.dumps(
+            [
+                self.inner.model_id(),
+                prompt.to_json(),
+                instructions,
+                {k: v for k, v in variables.items() if k != "format_instructions"},
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(material.encode()).hexdigest()
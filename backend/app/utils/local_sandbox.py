@@ -0,0 +1,372 @@
+"""
+Piston-free CompilerRuntimeInterface: runs submissions as local subprocesses.
+
+Each run gets a fresh scratch directory (its cwd, $HOME and $TMPDIR, removed
+afterwards) and rlimits applied in the child before exec:
+
+- RLIMIT_CPU: the time limit rounded up plus a second — a backstop behind
+  the wall-clock kill;
+- RLIMIT_AS: LOCAL_SANDBOX_MEMORY_MB, except for runtimes that reserve huge
+  virtual ranges at start-up (JVM, Mono, Node, Go), where it would only stop
+  them from starting;
+- RLIMIT_FSIZE: LOCAL_SANDBOX_MAX_OUTPUT_BYTES for anything written to disk
+  (not for compilers, whose object files outgrow it); stdout/stderr are
+  capped at the same size by the reader, which kills the run once either is
+  exceeded;
+- RLIMIT_NPROC: LOCAL_SANDBOX_MAX_PROCESSES. The kernel counts every process
+  and thread of the user, so run the service under a dedicated account;
+- RLIMIT_CORE: 0.
+
+The child leads its own process group and the whole group is SIGKILLed at
+the time limit, which — as with Piston — reports exit code -1.
+
+Every source is materialised once per distinct (runtime, source) as an
+artifact directory under LOCAL_SANDBOX_CACHE_DIR, named by its SHA-256;
+compiled languages (C, C++, Go, Java, C#) are built there, once, and every
+case of a submission and every resubmit reuses the binary. A failed build
+is cached the same way, so broken code compiles once rather than once per
+case. The LOCAL_SANDBOX_CACHE_MAX_ENTRIES most recently used artifacts are
+kept.
+
+This is NOT an isolation boundary like Piston's: no namespaces, no network
+cut-off, same uid as the service. Use it for trusted code (CI, benchmarks,
+single-tenant installs) or inside a container that provides the isolation.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import math
+import os
+import resource
+import shutil
+import signal
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.config import settings
+from app.interfaces.compiler_runtime import (
+    CompilerRuntimeInterface,
+    ExecutionResult,
+    RuntimeInfo,
+    UnsupportedLanguageError,
+)
+from app.logger import get_logger
+from app.utils.piston_client import LANGUAGE_ALIASES
+
+logger = get_logger(__name__)
+
+# Piston's own default, so a question without a limit behaves the same on both.
+DEFAULT_RUN_TIMEOUT_MS = 3000
+_READ_CHUNK = 65536
+# Builds of different sources proceed in parallel; the same source builds once.
+_BUILD_LOCKS = [asyncio.Lock() for _ in range(64)]
+
+
+@dataclass(frozen=True)
+class _LanguageSpec:
+    source_file: str
+    # Run in the artifact directory; None for interpreted languages.
+    compile_cmd: list[str] | None
+    # "{artifact}" stands for the artifact directory's absolute path.
+    run_cmd: list[str]
+    limit_address_space: bool = True
+
+    @property
+    def toolchain(self) -> list[str]:
+        commands = [self.run_cmd] if self.compile_cmd is None else [self.compile_cmd, self.run_cmd]
+        return [cmd[0] for cmd in commands if not cmd[0].startswith("{artifact}")]
+
+
+LANGUAGES: dict[str, _LanguageSpec] = {
+    "python": _LanguageSpec("main.py", None, ["python3", "{artifact}/main.py"]),
+    "javascript": _LanguageSpec(
+        "main.js", None, ["node", "{artifact}/main.js"], limit_address_space=False
+    ),
+    "bash": _LanguageSpec("main.sh", None, ["bash", "{artifact}/main.sh"]),
+    "c": _LanguageSpec(
+        "main.c", ["gcc", "-O2", "-std=gnu17", "-o", "main", "main.c", "-lm"], ["{artifact}/main"]
+    ),
+    "c++": _LanguageSpec(
+        "main.cpp", ["g++", "-O2", "-std=gnu++17", "-o", "main", "main.cpp"], ["{artifact}/main"]
+    ),
+    "go": _LanguageSpec(
+        "main.go",
+        ["go", "build", "-o", "main", "main.go"],
+        ["{artifact}/main"],
+        limit_address_space=False,
+    ),
+    # The public class must be called Main, as on most judges.
+    "java": _LanguageSpec(
+        "Main.java",
+        ["javac", "-encoding", "UTF-8", "Main.java"],
+        ["java", "-cp", "{artifact}", "Main"],
+        limit_address_space=False,
+    ),
+    "csharp": _LanguageSpec(
+        "main.cs",
+        ["mcs", "-optimize+", "-out:main.exe", "main.cs"],
+        ["mono", "{artifact}/main.exe"],
+        limit_address_space=False,
+    ),
+}
+
+
+class LocalSandboxRuntime(CompilerRuntimeInterface):
+    def __init__(self) -> None:
+        self.cache_dir = Path(settings.LOCAL_SANDBOX_CACHE_DIR or tempfile.gettempdir()) / (
+            "interxai-artifacts"
+        )
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    async def execute(
+        self,
+        source_code: str,
+        language: str,
+        stdin: str = "",
+        run_timeout_ms: int | None = None,
+    ) -> ExecutionResult:
+        runtime = self.runtime_id(language)
+        spec = self._spec(language)
+        artifact, build_failure, compile_time_ms = await self._artifact(runtime, spec, source_code)
+        if build_failure is not None:
+            return build_failure
+
+        timeout_ms = run_timeout_ms or DEFAULT_RUN_TIMEOUT_MS
+        cmd = [part.replace("{artifact}", str(artifact)) for part in spec.run_cmd]
+        logger.debug(
+            "Local execute: language=%s stdin_len=%d run_timeout_ms=%d",
+            runtime,
+            len(stdin),
+            timeout_ms,
+        )
+        with tempfile.TemporaryDirectory(prefix="interxai-run-") as scratch:
+            result = await _run_process(
+                cmd,
+                cwd=scratch,
+                env=sandbox_env(scratch),
+                stdin=stdin.encode(),
+                timeout_s=timeout_ms / 1000,
+                limits=_limits(
+                    math.ceil(timeout_ms / 1000) + 1,
+                    limit_address_space=spec.limit_address_space,
+                    limit_file_size=True,
+                ),
+            )
+        result.compile_time_ms = compile_time_ms
+        return result
+
+    async def list_runtimes(self) -> list[RuntimeInfo]:
+        return [
+            RuntimeInfo(
+                language=name,
+                version="local",
+                aliases=[
+                    a for a, target in LANGUAGE_ALIASES.items() if target == name and a != name
+                ],
+            )
+            for name, spec in LANGUAGES.items()
+            if all(shutil.which(tool) for tool in spec.toolchain)
+        ]
+
+    async def validate_language(self, language: str) -> None:
+        spec = self._spec(language)
+        if not all(shutil.which(tool) for tool in spec.toolchain):
+            raise UnsupportedLanguageError(f"Language '{language}' is not installed")
+
+    def runtime_id(self, language: str) -> str:
+        return LANGUAGE_ALIASES.get(language.lower(), language.lower())
+
+    def _spec(self, language: str) -> _LanguageSpec:
+        spec = LANGUAGES.get(self.runtime_id(language))
+        if spec is None:
+            raise UnsupportedLanguageError(f"Language '{language}' is not supported")
+        return spec
+
+    async def _artifact(
+        self, runtime: str, spec: _LanguageSpec, source_code: str
+    ) -> tuple[Path, ExecutionResult | None, int | None]:
+        """
+        The artifact directory for this source, building it on first use.
+        Returns the cached compile failure instead when the build failed, and
+        the compile's wall time when this call ran one.
+        """
+        key = hashlib.sha256(json.dumps([runtime, source_code]).encode()).hexdigest()
+        artifact = self.cache_dir / key
+        compile_time_ms = None
+        async with _BUILD_LOCKS[int(key[:8], 16) % len(_BUILD_LOCKS)]:
+            if not (artifact / "build.json").exists():
+                started = time.monotonic()
+                await self._build(artifact, spec, source_code)
+                if spec.compile_cmd is not None:
+                    compile_time_ms = int((time.monotonic() - started) * 1000)
+            else:
+                os.utime(artifact)  # most recently used, for eviction
+        build = json.loads((artifact / "build.json").read_text())
+        if build["code"] == 0:
+            return artifact, None, compile_time_ms
+        return (
+            artifact,
+            ExecutionResult(
+                stdout=build["stdout"],
+                stderr=build["stderr"],
+                exit_code=build["code"],
+                compile_time_ms=compile_time_ms,
+                compile_error=True,
+            ),
+            compile_time_ms,
+        )
+
+    async def _build(self, artifact: Path, spec: _LanguageSpec, source_code: str) -> None:
+        # Build in a private directory and rename it into place, so another
+        # worker process never sees a half-built artifact.
+        staging = Path(tempfile.mkdtemp(prefix=".build-", dir=self.cache_dir))
+        (staging / spec.source_file).write_text(source_code)
+        build = {"code": 0, "stdout": "", "stderr": ""}
+        if spec.compile_cmd is not None:
+            env = sandbox_env(str(staging))
+            # Go keeps its build cache next to the artifacts, shared by every build.
+            env["GOCACHE"] = str(self.cache_dir / ".go-build")
+            env["GOPATH"] = str(self.cache_dir / ".go-path")
+            result = await _run_process(
+                spec.compile_cmd,
+                cwd=str(staging),
+                env=env,
+                stdin=b"",
+                timeout_s=settings.LOCAL_SANDBOX_COMPILE_TIMEOUT_S,
+                limits=_limits(
+                    math.ceil(settings.LOCAL_SANDBOX_COMPILE_TIMEOUT_S) + 1,
+                    limit_address_space=False,
+                    limit_file_size=False,
+                ),
+            )
+            build = {"code": result.exit_code, "stdout": result.stdout, "stderr": result.stderr}
+        (staging / "build.json").write_text(json.dumps(build))
+        try:
+            staging.rename(artifact)
+        except OSError:
+            # Another process finished the same build first; theirs is as good.
+            shutil.rmtree(staging, ignore_errors=True)
+        self._evict()
+
+    def _evict(self) -> None:
+        artifacts = [p for p in self.cache_dir.iterdir() if not p.name.startswith(".")]
+        excess = len(artifacts) - settings.LOCAL_SANDBOX_CACHE_MAX_ENTRIES
+        if excess > 0:
+            artifacts.sort(key=lambda p: p.stat().st_mtime)
+            for stale in artifacts[:excess]:
+                shutil.rmtree(stale, ignore_errors=True)
+
+
+def sandbox_env(home: str) -> dict[str, str]:
+    """The whole environment a sandboxed program sees; `home` is its scratch dir."""
+    return {
+        "PATH": os.environ.get("PATH", "/usr/local/bin:/usr/bin:/bin"),
+        "HOME": home,
+        "TMPDIR": home,
+        "LANG": "C.UTF-8",
+    }
+
+
+def _limits(cpu_s: int, *, limit_address_space: bool, limit_file_size: bool) -> Callable[[], None]:
+    def apply() -> None:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_s, cpu_s + 1))
+        if limit_address_space:
+            memory = settings.LOCAL_SANDBOX_MEMORY_MB * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+        if limit_file_size:
+            output = settings.LOCAL_SANDBOX_MAX_OUTPUT_BYTES
+            resource.setrlimit(resource.RLIMIT_FSIZE, (output, output))
+        processes = settings.LOCAL_SANDBOX_MAX_PROCESSES
+        resource.setrlimit(resource.RLIMIT_NPROC, (processes, processes))
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+    return apply
+
+
+async def _run_process(
+    cmd: list[str],
+    *,
+    cwd: str,
+    env: dict[str, str],
+    stdin: bytes,
+    timeout_s: float,
+    limits: Callable[[], None],
+) -> ExecutionResult:
+    started = time.monotonic()
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=cwd,
+            env=env,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+            preexec_fn=limits,
+        )
+    except FileNotFoundError as e:
+        raise UnsupportedLanguageError(f"'{cmd[0]}' is not installed") from e
+
+    assert proc.stdin is not None and proc.stdout is not None and proc.stderr is not None
+    out, err = bytearray(), bytearray()
+    exceeded = False
+
+    def kill() -> None:
+        with contextlib.suppress(ProcessLookupError, PermissionError):
+            os.killpg(proc.pid, signal.SIGKILL)
+
+    async def feed() -> None:
+        assert proc.stdin is not None
+        with contextlib.suppress(BrokenPipeError, ConnectionResetError):
+            proc.stdin.write(stdin)
+            await proc.stdin.drain()
+        proc.stdin.close()
+
+    async def collect(stream: asyncio.StreamReader, buf: bytearray) -> None:
+        nonlocal exceeded
+        limit = settings.LOCAL_SANDBOX_MAX_OUTPUT_BYTES
+        while chunk := await stream.read(_READ_CHUNK):
+            if len(buf) + len(chunk) > limit:
+                buf += chunk[: limit - len(buf)]
+                exceeded = True
+                kill()
+                break
+            buf += chunk
+        # Read to EOF so the pipe closes with the (possibly killed) process.
+        while await stream.read(_READ_CHUNK):
+            pass
+
+    timed_out = False
+    try:
+        async with asyncio.timeout(timeout_s):
+            await asyncio.gather(feed(), collect(proc.stdout, out), collect(proc.stderr, err))
+            await proc.wait()
+    except TimeoutError:
+        timed_out = True
+        kill()
+        await proc.wait()
+        with contextlib.suppress(TimeoutError):
+            async with asyncio.timeout(1):
+                await asyncio.gather(
+                    collect(proc.stdout, bytearray()), collect(proc.stderr, bytearray())
+                )
+
+    stderr = err.decode(errors="replace")
+    if exceeded:
+        stderr += "\n[output limit exceeded]"
+    code = proc.returncode
+    return ExecutionResult(
+        stdout=out.decode(errors="replace"),
+        stderr=stderr,
+        # Killed by us or by a signal: -1, matching Piston's null exit code.
+        exit_code=-1 if timed_out or exceeded or code is None or code < 0 else code,
+        wall_time_ms=int((time.monotonic() - started) * 1000),
+        signal=signal.Signals(-code).name if code is not None and code < 0 else None,
+        timed_out=timed_out,
+        output_limit_exceeded=exceeded,
+    )
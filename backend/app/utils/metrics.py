@@ -0,0 +1,25 @@
+"""
+Process-local counters and gauges.
+
+Deliberately tiny: a name → number map that hot paths bump without awaiting
+anything, read back as a JSON snapshot by GET /metrics. Every API process and
+taskiq worker keeps its own numbers; aggregate across processes in whatever
+scrapes the endpoint.
+"""
+
+from collections import defaultdict
+
+_counters: defaultdict[str, int] = defaultdict(int)
+_gauges: dict[str, float] = {}
+
+
+def incr(name: str, value: int = 1) -> None:
+    _counters[name] += value
+
+
+def set_gauge(name: str, value: float) -> None:
+    _gauges[name] = value
+
+
+def snapshot() -> dict[str, dict[str, float]]:
+    return {"counters": dict(_counters), "gauges": dict(_gauges)}
@@ -0,0 +1,55 @@
+"""
+Verdict comparison between a run's stdout and a case's expected output.
+
+The old check, `stdout.strip() == expected.strip()`, built two stripped
+copies of the whole output per case. outputs_match() instead walks both
+texts token by token (maximal runs of non-whitespace) and stops at the
+first difference, so a wrong answer that prints megabytes is rejected
+after its first wrong token, without copying it. Token comparison also
+ignores how whitespace is laid out — trailing spaces, blank lines, CRLF —
+as most judges do.
+
+With a per-question float_tolerance, tokens that both parse as numbers
+match when they differ by at most the tolerance, absolutely or relative
+to the expected value; everything else must match exactly.
+
+Expected outputs are put through normalize_expected() once, when the
+question is stored, so they are already in canonical form here.
+"""
+
+import math
+import re
+from itertools import zip_longest
+
+_TOKEN = re.compile(r"\S+")
+
+
+def normalize_expected(text: str) -> str:
+    """
+    Canonical form of an expected output: trailing whitespace dropped from
+    every line, leading/trailing blank lines dropped, "\\n" line endings.
+    """
+    return "\n".join(line.rstrip() for line in text.strip().splitlines())
+
+
+def _numbers_close(actual: str, expected: str, tolerance: float) -> bool:
+    try:
+        a, e = float(actual), float(expected)
+    except ValueError:
+        return False
+    if math.isnan(a) or math.isnan(e):
+        return False
+    return abs(a - e) <= tolerance * max(1.0, abs(e))
+
+
+def outputs_match(actual: str, expected: str, float_tolerance: float | None = None) -> bool:
+    """Whether `actual` is token-for-token `expected` (see the module docstring)."""
+    for a, e in zip_longest(_TOKEN.finditer(actual), _TOKEN.finditer(expected)):
+        if a is None or e is None:
+            return False
+        a_token, e_token = a.group(), e.group()
+        if a_token == e_token:
+            continue
+        if float_tolerance is None or not _numbers_close(a_token, e_token, float_tolerance):
+            return False
+    return True
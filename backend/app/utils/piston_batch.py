@@ -0,0 +1,423 @@
+"""
+Single-invocation multi-case harness for Piston (opt-in batch mode).
+
+One /api/v2/execute call per hidden case means compiled languages pay the
+compiler N times per submission, and every language pays Piston's per-job
+sandbox setup N times. In batch mode the candidate's program is wrapped in a
+small per-language driver and shipped ONCE with every case's stdin:
+
+- the source is compiled (C/C++) or byte-compiled (Python) once;
+- the driver forks a fresh child per case, so global state never leaks
+  between cases, with stdin/stdout/stderr redirected to that case's own
+  scratch files;
+- the parent kills a child that outlives the per-case time limit (SIGKILL,
+  reported as exit code -1 exactly like a Piston timeout) and writes one
+  length-prefixed frame per case: exit code, wall time, stdout, stderr.
+
+Each child leads its own process group, and the whole group is killed when
+the case ends, so a process the candidate forked can't keep running past
+its case's limit. Cases' inputs are read from the driver's stdin one at a
+time, just before they run, and wiped from memory once spilled to the
+case's file, so the candidate's code never holds any other case's input.
+
+The driver stops starting cases once the invocation's overall budget could
+not fit another full time limit; whatever it did not report (budget, a
+driver/candidate name clash, output truncated by Piston's output cap —
+raise the server's PISTON_OUTPUT_MAX_SIZE) is simply re-run one case at a
+time by PistonClient, so batch mode can only ever save work, never change a
+verdict.
+
+For C/C++ the driver runs as a start-up constructor ahead of the
+candidate's static initialisers, and each child returns from it into the
+program's own start-up and main(), so exit codes (including main's
+implicit return 0), exit(), abort(), uncaught exceptions and signals are
+exactly those of a standalone run. JVM, .NET and Go runtimes launch a
+single source file in Piston and have no portable fork-after-start, so
+they are not batched.
+"""
+
+from collections.abc import Sequence
+
+from app.interfaces.compiler_runtime import ExecutionResult
+
+# Piston runtimes with a batch driver.
+BATCH_RUNTIMES: frozenset[str] = frozenset({"python", "c", "c++"})
+# Piston's own per-run default when the request carries no run_timeout.
+PISTON_DEFAULT_RUN_TIMEOUT_MS = 3000
+# Headroom on top of the cases' worst case for startup and framing.
+BATCH_SLACK_MS = 1000
+
+_FRAME_MARKER = b"\x1eIXCASE "
+_SOURCE_TOKEN = "__INTERXAI_CANDIDATE_SOURCE__"
+
+_PYTHON_DRIVER = r"""import builtins
+import os
+import sys
+import time
+import traceback
+
+SOURCE = __INTERXAI_CANDIDATE_SOURCE__
+
+
+def _spill(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _slurp(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _read_exact(buf):
+    view = memoryview(buf)
+    while view:
+        got = os.readv(0, [view])
+        if got <= 0:
+            raise EOFError
+        view = view[got:]
+
+
+def _read_line():
+    line = bytearray()
+    while not line.endswith(b"\n"):
+        chunk = os.read(0, 1)
+        if not chunk:
+            raise EOFError
+        line += chunk
+    return bytes(line)
+
+
+def _kill_group(pid):
+    try:
+        os.killpg(pid, 9)
+    except OSError:
+        pass
+
+
+def _unlink(*paths):
+    for path in paths:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def _child(code, compile_error, in_path, out_path, err_path):
+    status = 1
+    try:
+        os.setpgid(0, 0)
+        fd = os.open(in_path, os.O_RDONLY)
+        os.dup2(fd, 0)
+        os.close(fd)
+        fd = os.open(out_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.dup2(fd, 1)
+        os.close(fd)
+        fd = os.open(err_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.dup2(fd, 2)
+        os.close(fd)
+        sys.stdin = open(0, encoding="utf-8", closefd=False)
+        sys.stdout = open(1, "w", encoding="utf-8", closefd=False)
+        sys.stderr = open(2, "w", encoding="utf-8", closefd=False)
+        sys.argv = ["solution.py"]
+        if compile_error is not None:
+            sys.stderr.write(compile_error)
+        else:
+            status = 0
+            try:
+                exec(code, {"__name__": "__main__", "__builtins__": builtins})
+            except SystemExit as e:
+                if e.code is None:
+                    status = 0
+                elif isinstance(e.code, int):
+                    status = e.code & 0xFF
+                else:
+                    print(e.code, file=sys.stderr)
+                    status = 1
+            except BaseException:
+                traceback.print_exc()
+                status = 1
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        os._exit(status)
+
+
+def main():
+    started = time.monotonic()
+    # Read straight from fd 0, never through sys.stdin's buffer, so the cases
+    # not run yet stay in the pipe rather than in memory a child inherits.
+    count, limit_ms, budget_ms = (int(field) for field in _read_line().split())
+
+    code = None
+    compile_error = None
+    try:
+        code = compile(SOURCE, "solution.py", "exec")
+    except BaseException:
+        compile_error = traceback.format_exc()
+
+    for index in range(count):
+        if (time.monotonic() - started) * 1000 + limit_ms > budget_ms:
+            break
+        case_input = bytearray(int(_read_line()))
+        _read_exact(case_input)
+        in_path, out_path, err_path = (
+            f".interxai_{index}.{name}" for name in ("in", "out", "err")
+        )
+        _spill(in_path, case_input)
+        case_input[:] = bytes(len(case_input))
+        del case_input
+
+        t0 = time.monotonic()
+        pid = os.fork()
+        if pid == 0:
+            _child(code, compile_error, in_path, out_path, err_path)
+        try:
+            os.setpgid(pid, pid)
+        except OSError:
+            pass
+        deadline = t0 + limit_ms / 1000
+        while True:
+            done, status = os.waitpid(pid, os.WNOHANG)
+            if done:
+                break
+            if time.monotonic() >= deadline:
+                _kill_group(pid)
+                _, status = os.waitpid(pid, 0)
+                break
+            time.sleep(0.001)
+        elapsed = int((time.monotonic() - t0) * 1000)
+        exit_code = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -1
+        # Whatever the case left running dies with it.
+        _kill_group(pid)
+
+        out = _slurp(out_path)
+        err = _slurp(err_path)
+        _unlink(in_path, out_path, err_path)
+        frame = b"\x1eIXCASE %d %d %d %d\n" % (exit_code, elapsed, len(out), len(err))
+        os.write(1, frame + out + err)
+
+
+main()
+"""
+
+# Placed BEFORE the candidate's code, so none of its macros (`#define int
+# long long`, `#define s second`) can reach the system headers or the driver.
+# The driver is a constructor that runs ahead of every static initialiser:
+# the parent never returns from it, and each forked child returns straight
+# into the program's own start-up, static initialisers and main(), so main()
+# keeps its implicit `return 0` and the case's exit code is exactly a
+# standalone run's. The candidate's main() is untouched and sees argc == 1,
+# which is why the limits travel in the stdin header rather than argv.
+_C_DRIVER = r"""#if !defined(__cplusplus) && !defined(_POSIX_C_SOURCE)
+#define _POSIX_C_SOURCE 200809L
+#endif
+#include <fcntl.h>
+#include <signal.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/types.h>
+#include <sys/wait.h>
+#include <time.h>
+#include <unistd.h>
+
+static long ix_now_ms(void) {
+    struct timespec ix_ts;
+    clock_gettime(CLOCK_MONOTONIC, &ix_ts);
+    return (long)ix_ts.tv_sec * 1000 + ix_ts.tv_nsec / 1000000;
+}
+
+static char *ix_slurp_fd(int ix_fd, long *ix_len) {
+    size_t ix_cap = 65536, ix_used = 0;
+    char *ix_buf = (char *)malloc(ix_cap);
+    for (;;) {
+        if (ix_used == ix_cap) {
+            ix_cap *= 2;
+            ix_buf = (char *)realloc(ix_buf, ix_cap);
+        }
+        ssize_t ix_got = read(ix_fd, ix_buf + ix_used, ix_cap - ix_used);
+        if (ix_got <= 0) break;
+        ix_used += (size_t)ix_got;
+    }
+    *ix_len = (long)ix_used;
+    return ix_buf;
+}
+
+static char *ix_slurp(const char *ix_path, long *ix_len) {
+    int ix_fd = open(ix_path, O_RDONLY);
+    char *ix_buf = ix_slurp_fd(ix_fd, ix_len);
+    close(ix_fd);
+    return ix_buf;
+}
+
+static void ix_write_all(int ix_fd, const char *ix_buf, long ix_len) {
+    while (ix_len > 0) {
+        ssize_t ix_put = write(ix_fd, ix_buf, (size_t)ix_len);
+        if (ix_put <= 0) return;
+        ix_buf += ix_put;
+        ix_len -= ix_put;
+    }
+}
+
+/* Unbuffered reads from fd 0, so the cases not run yet stay in the pipe
+   rather than in memory a child inherits. */
+static int ix_read_exact(char *ix_buf, long ix_len) {
+    while (ix_len > 0) {
+        ssize_t ix_got = read(0, ix_buf, (size_t)ix_len);
+        if (ix_got <= 0) return -1;
+        ix_buf += ix_got;
+        ix_len -= ix_got;
+    }
+    return 0;
+}
+
+/* A decimal field of the stdin framing; consumes the byte ending it. */
+static long ix_read_long(void) {
+    long ix_value = 0;
+    char ix_c;
+    while (read(0, &ix_c, 1) == 1 && ix_c >= '0' && ix_c <= '9') {
+        ix_value = ix_value * 10 + (ix_c - '0');
+    }
+    return ix_value;
+}
+
+static void ix_kill_group(pid_t ix_pid) {
+    kill(-ix_pid, SIGKILL);
+}
+
+static void ix_spill(const char *ix_path, const char *ix_buf, long ix_len) {
+    int ix_fd = open(ix_path, O_WRONLY | O_CREAT | O_TRUNC, 0600);
+    ix_write_all(ix_fd, ix_buf, ix_len);
+    close(ix_fd);
+}
+
+static void ix_redirect(const char *ix_path, int ix_flags, int ix_target) {
+    int ix_fd = open(ix_path, ix_flags, 0600);
+    dup2(ix_fd, ix_target);
+    close(ix_fd);
+}
+
+__attribute__((constructor(101))) static void ix_driver(void) {
+    long ix_started = ix_now_ms();
+    long ix_count = ix_read_long();
+    long ix_limit_ms = ix_read_long();
+    long ix_budget_ms = ix_read_long();
+
+    for (long ix_i = 0; ix_i < ix_count; ix_i++) {
+        if (ix_now_ms() - ix_started + ix_limit_ms > ix_budget_ms) break;
+        long ix_case_len = ix_read_long();
+        char *ix_case = (char *)malloc(ix_case_len > 0 ? (size_t)ix_case_len : 1);
+        if (ix_read_exact(ix_case, ix_case_len) < 0) break;
+        char ix_in[64], ix_out_path[64], ix_err_path[64];
+        snprintf(ix_in, sizeof ix_in, ".interxai_%ld.in", ix_i);
+        snprintf(ix_out_path, sizeof ix_out_path, ".interxai_%ld.out", ix_i);
+        snprintf(ix_err_path, sizeof ix_err_path, ".interxai_%ld.err", ix_i);
+        ix_spill(ix_in, ix_case, ix_case_len);
+        memset(ix_case, 0, (size_t)ix_case_len);
+        free(ix_case);
+
+        long ix_t0 = ix_now_ms();
+        pid_t ix_pid = fork();
+        if (ix_pid < 0) break;
+        if (ix_pid == 0) {
+            setpgid(0, 0);
+            ix_redirect(ix_in, O_RDONLY, 0);
+            ix_redirect(ix_out_path, O_WRONLY | O_CREAT | O_TRUNC, 1);
+            ix_redirect(ix_err_path, O_WRONLY | O_CREAT | O_TRUNC, 2);
+            return;
+        }
+        setpgid(ix_pid, ix_pid);
+
+        int ix_status = 0;
+        for (;;) {
+            if (waitpid(ix_pid, &ix_status, WNOHANG) == ix_pid) break;
+            if (ix_now_ms() - ix_t0 >= ix_limit_ms) {
+                ix_kill_group(ix_pid);
+                waitpid(ix_pid, &ix_status, 0);
+                break;
+            }
+            struct timespec ix_nap = {0, 1000000};
+            nanosleep(&ix_nap, NULL);
+        }
+        long ix_elapsed = ix_now_ms() - ix_t0;
+        int ix_exit = WIFEXITED(ix_status) ? WEXITSTATUS(ix_status) : -1;
+        /* Whatever the case left running dies with it. */
+        ix_kill_group(ix_pid);
+
+        long ix_out_len = 0, ix_err_len = 0;
+        char *ix_out = ix_slurp(ix_out_path, &ix_out_len);
+        char *ix_err = ix_slurp(ix_err_path, &ix_err_len);
+        unlink(ix_in);
+        unlink(ix_out_path);
+        unlink(ix_err_path);
+        char ix_header[96];
+        int ix_header_len = snprintf(ix_header, sizeof ix_header,
+            "\x1eIXCASE %d %ld %ld %ld\n", ix_exit, ix_elapsed, ix_out_len, ix_err_len);
+        ix_write_all(1, ix_header, ix_header_len);
+        ix_write_all(1, ix_out, ix_out_len);
+        ix_write_all(1, ix_err, ix_err_len);
+        free(ix_out);
+        free(ix_err);
+    }
+    _exit(0);
+}
+
+"""
+
+
+def wrap_source(runtime: str, source_code: str) -> str | None:
+    """The driver program for `runtime` with the candidate's code embedded, or
+    None when that runtime can't be batched."""
+    if runtime not in BATCH_RUNTIMES:
+        return None
+    if runtime == "python":
+        return _PYTHON_DRIVER.replace(_SOURCE_TOKEN, repr(source_code))
+    return f"{_C_DRIVER}{source_code}\n"
+
+
+def encode_inputs(stdins: Sequence[str], limit_ms: int, budget_ms: int) -> str:
+    """
+    The driver's stdin: a `<cases> <per-case limit ms> <budget ms>` header,
+    then each case as `<bytes>\\n<payload>`.
+    """
+    parts = [f"{len(stdins)} {limit_ms} {budget_ms}\n"]
+    for stdin in stdins:
+        parts.append(f"{len(stdin.encode())}\n{stdin}")
+    return "".join(parts)
+
+
+def parse_frames(stdout: str) -> list[ExecutionResult]:
+    """
+    Split the driver's stdout back into per-case results, in case order.
+    Parsing stops at the first incomplete or malformed frame, so a truncated
+    or killed run yields only the cases that really finished.
+    """
+    data = stdout.encode()
+    results: list[ExecutionResult] = []
+    pos = 0
+    while data.startswith(_FRAME_MARKER, pos):
+        nl = data.find(b"\n", pos)
+        if nl < 0:
+            break
+        fields = data[pos + len(_FRAME_MARKER) : nl].split()
+        if len(fields) != 4:
+            break
+        try:
+            exit_code, elapsed_ms, out_len, err_len = (int(f) for f in fields)
+        except ValueError:
+            break
+        body = nl + 1
+        end = body + out_len + err_len
+        if out_len < 0 or err_len < 0 or end > len(data):
+            break
+        results.append(
+            ExecutionResult(
+                stdout=data[body : body + out_len].decode(errors="replace"),
+                stderr=data[body + out_len : end].decode(errors="replace"),
+                exit_code=exit_code,
+                wall_time_ms=elapsed_ms,
+            )
+        )
+        pos = end
+    return results
@@ -3,16 +3,39 @@ Piston API client for local code execution.
 Docs: https://github.com/engineer-man/piston#api-v2
 """
 
+import json
+import time
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
 from typing import Any
 
 import httpx
+from fastapi import FastAPI
 
 from app.config import settings
-from app.interfaces.compiler_runtime import CompilerRuntimeInterface, ExecutionResult
+from app.interfaces.compiler_runtime import (
+    CompilerRuntimeInterface,
+    ExecutionResult,
+    RuntimeInfo,
+    UnsupportedLanguageError,
+)
 from app.logger import get_logger
+from app.utils.http_clients import piston_http, piston_pool
+from app.utils.piston_batch import (
+    BATCH_RUNTIMES,
+    BATCH_SLACK_MS,
+    PISTON_DEFAULT_RUN_TIMEOUT_MS,
+    encode_inputs,
+    parse_frames,
+    wrap_source,
+)
+from app.utils.piston_runtimes import find_runtime, runtime_registry
 
 logger = get_logger(__name__)
 
+# Room in an execute response for everything besides stdout and stderr.
+_RESPONSE_OVERHEAD_BYTES = 64 * 1024
+
 # Supported language aliases → Piston runtime name.
 # Run GET /api/v2/runtimes on your local instance to see what's installed.
 LANGUAGE_ALIASES: dict[str, str] = {
@@ -52,8 +75,11 @@ class PistonClient(CompilerRuntimeInterface):
     stdout/stderr in a single response. No polling needed.
     """
 
-    def __init__(self) -> None:
-        self.base_url = settings.PISTON_URL.rstrip("/")
+    def __init__(self, http: httpx.AsyncClient | None = None) -> None:
+        # The process-wide pooled client unless one is injected; requests are
+        # spread over the PISTON_URL nodes either way.
+        self.http = http or piston_http()
+        self.nodes = piston_pool()
 
     async def execute(
         self,
@@ -62,11 +88,11 @@ class PistonClient(CompilerRuntimeInterface):
         stdin: str = "",
         run_timeout_ms: int | None = None,
     ) -> ExecutionResult:
-        runtime = LANGUAGE_ALIASES.get(language.lower(), language.lower())
+        runtime, version = await self._resolve(language)
 
         payload: dict[str, Any] = {
             "language": runtime,
-            "version": "*",
+            "version": version,
             "files": [{"content": source_code}],
             "stdin": stdin,
         }
@@ -80,35 +106,223 @@ class PistonClient(CompilerRuntimeInterface):
             run_timeout_ms,
         )
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/api/v2/execute",
-                json=payload,
-                timeout=30.0,
+        started = time.monotonic()
+        result = self._to_result(await self._post_execute(payload, cases=1))
+        result.round_trip_ms = int((time.monotonic() - started) * 1000)
+        return result
+
+    async def validate_language(self, language: str) -> None:
+        await self._resolve(language)
+
+    def runtime_id(self, language: str) -> str:
+        # Include the installed version when known, so a runtime upgrade
+        # doesn't serve results cached from the old one.
+        runtime = self._runtime(language)
+        info = find_runtime(runtime_registry.snapshot() or [], runtime)
+        return runtime if info is None else f"{info.language}@{info.version}"
+
+    def batch_size(self, language: str) -> int:
+        if not settings.PISTON_BATCH_ENABLED or self._runtime(language) not in BATCH_RUNTIMES:
+            return 1
+        return max(1, settings.PISTON_BATCH_MAX_CASES)
+
+    async def execute_batch(
+        self,
+        source_code: str,
+        language: str,
+        stdins: Sequence[str],
+        run_timeout_ms: int | None = None,
+    ) -> list[ExecutionResult]:
+        """
+        Run every case in ONE Piston invocation through the batch driver (see
+        app.utils.piston_batch). Cases the driver didn't report are re-run one
+        at a time, so the results always match per-case execution.
+        """
+        runtime, version = await self._resolve(language)
+        program = wrap_source(runtime, source_code)
+        if program is None or len(stdins) < 2:
+            return await super().execute_batch(source_code, language, stdins, run_timeout_ms)
+
+        limit_ms = run_timeout_ms or PISTON_DEFAULT_RUN_TIMEOUT_MS
+        budget_ms = min(settings.PISTON_MAX_RUN_TIMEOUT_MS, limit_ms * len(stdins) + BATCH_SLACK_MS)
+        logger.debug(
+            "Piston batch: language=%s cases=%d run_timeout_ms=%d budget_ms=%d",
+            runtime,
+            len(stdins),
+            limit_ms,
+            budget_ms,
+        )
+        body = await self._post_execute(
+            {
+                "language": runtime,
+                "version": version,
+                "files": [{"content": program}],
+                "stdin": encode_inputs(stdins, limit_ms, budget_ms - BATCH_SLACK_MS),
+                "run_timeout": budget_ms,
+            },
+            cases=len(stdins),
+        )
+        if body is None:
+            # Some case printed past the cap; find out which one by one.
+            return await super().execute_batch(source_code, language, stdins, run_timeout_ms)
+
+        if self._compile_failed(body):
+            # Either the candidate's code doesn't build — the same failure for
+            # every case — or the driver clashed with it. One plain run tells.
+            first_body = await self._post_execute(
+                {
+                    "language": runtime,
+                    "version": version,
+                    "files": [{"content": source_code}],
+                    "stdin": stdins[0],
+                    "run_timeout": limit_ms,
+                },
+                cases=1,
+            )
+            first = self._to_result(first_body)
+            if first_body is not None and self._compile_failed(first_body):
+                return [first] * len(stdins)
+            logger.warning("Piston batch driver failed to build for %s; running per case", runtime)
+            return [first] + await super().execute_batch(
+                source_code, language, stdins[1:], run_timeout_ms
+            )
+
+        results = parse_frames((body.get("run") or {}).get("stdout") or "")[: len(stdins)]
+        if len(results) < len(stdins):
+            logger.debug(
+                "Piston batch reported %d/%d cases; running the rest per case",
+                len(results),
+                len(stdins),
             )
+            results += await super().execute_batch(
+                source_code, language, stdins[len(results) :], run_timeout_ms
+            )
+        return results
+
+    async def list_runtimes(self) -> list[RuntimeInfo]:
+        """Installed runtimes from the process-wide registry ([] if Piston never answered)."""
+        return await runtime_registry.runtimes(self._fetch_runtimes) or []
+
+    async def _fetch_runtimes(self) -> list[RuntimeInfo]:
+        response = await self.nodes.request(
+            self.http,
+            "GET",
+            "/api/v2/runtimes",
+            idempotent=True,
+            timeout=self._timeout(settings.PISTON_RUNTIMES_TIMEOUT_S),
+        )
+        response.raise_for_status()
+        return [RuntimeInfo.model_validate(r) for r in response.json()]
+
+    async def _resolve(self, language: str) -> tuple[str, str]:
+        """
+        (Piston language, exact version) for `language`. Raises
+        UnsupportedLanguageError when Piston doesn't have it installed; sends
+        version "*" when the runtime list couldn't be loaded at all.
+        """
+        runtime = self._runtime(language)
+        runtimes = await runtime_registry.runtimes(self._fetch_runtimes)
+        if runtimes is None:
+            return runtime, "*"
+        info = find_runtime(runtimes, runtime)
+        if info is None:
+            raise UnsupportedLanguageError(f"Language '{language}' is not supported")
+        return info.language, info.version
+
+    @staticmethod
+    def _runtime(language: str) -> str:
+        return LANGUAGE_ALIASES.get(language.lower(), language.lower())
+
+    async def _post_execute(self, payload: dict[str, Any], cases: int) -> dict[str, Any] | None:
+        """
+        The execute response, read as it streams in and abandoned — None —
+        once it outgrows what `cases` runs within DSA_MAX_OUTPUT_BYTES each
+        could produce, so a program printing in a loop never lands in memory.
+        """
+        # Executions are pure functions of the payload, so safe to retry.
+        response = await self.nodes.request(
+            self.http,
+            "POST",
+            "/api/v2/execute",
+            idempotent=True,
+            stream=True,
+            json=payload,
+            timeout=self._timeout(settings.PISTON_EXECUTE_TIMEOUT_S),
+        )
+        try:
             response.raise_for_status()
+            # stdout and stderr each up to the cap, plus JSON framing.
+            limit = cases * 2 * settings.DSA_MAX_OUTPUT_BYTES + _RESPONSE_OVERHEAD_BYTES
+            data = bytearray()
+            async for chunk in response.aiter_bytes():
+                data += chunk
+                if len(data) > limit:
+                    logger.debug("Piston response passed %d bytes; output limit exceeded", limit)
+                    return None
+        finally:
+            await response.aclose()
+        body: dict[str, Any] = json.loads(data)
+        return body
+
+    @staticmethod
+    def _compile_failed(body: dict[str, Any]) -> bool:
+        compile_stage = body.get("compile")
+        return compile_stage is not None and compile_stage.get("code") != 0
 
-        run = response.json().get("run", {})
+    @classmethod
+    def _to_result(cls, body: dict[str, Any] | None) -> ExecutionResult:
+        if body is None:
+            return ExecutionResult(
+                stdout="",
+                stderr="[output limit exceeded]",
+                exit_code=-1,
+                output_limit_exceeded=True,
+            )
+        # A failed compile stage means Piston never ran the program; surface
+        # the compiler's output instead of an empty run.
+        compile_error = cls._compile_failed(body)
+        stage = (body.get("compile") if compile_error else body.get("run")) or {}
         # `code` is null when Piston kills the process via signal (e.g. timeout).
-        exit_code = run.get("code")
+        exit_code = stage.get("code")
         if exit_code is None:
             exit_code = -1
 
+        # Piston 3.1+ reports timings (ms) and peak memory (bytes) per stage,
+        # and a status ("TO": time limit).
+        compile_stage = body.get("compile") or {}
         return ExecutionResult(
-            stdout=run.get("stdout", "") or "",
-            stderr=run.get("stderr", "") or "",
+            stdout=stage.get("stdout", "") or "",
+            stderr=stage.get("stderr", "") or "",
             exit_code=exit_code,
+            wall_time_ms=_whole(stage.get("wall_time")),
+            cpu_time_ms=_whole(stage.get("cpu_time")),
+            memory_bytes=_whole(stage.get("memory")),
+            compile_time_ms=_whole(compile_stage.get("wall_time")),
+            signal=stage.get("signal"),
+            timed_out=stage.get("status") == "TO",
+            compile_error=compile_error,
         )
 
-    async def list_runtimes(self) -> list[str]:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/api/v2/runtimes",
-                timeout=10.0,
-            )
-            response.raise_for_status()
-            return [r["language"] for r in response.json()]
+    @staticmethod
+    def _timeout(read_s: float) -> httpx.Timeout:
+        return httpx.Timeout(
+            read_s,
+            connect=settings.HTTP_CONNECT_TIMEOUT_S,
+            pool=settings.HTTP_POOL_TIMEOUT_S,
+        )
+
+
+async def warm_runtime_registry() -> None:
+    """Load the runtime list up front (API lifespan / worker startup)."""
+    if settings.COMPILER_RUNTIME == "piston":
+        await PistonClient().list_runtimes()
+
+
+@asynccontextmanager
+async def piston_runtimes_lifespan(_: FastAPI) -> AsyncIterator[None]:
+    await warm_runtime_registry()
+    yield
 
 
-def get_piston_client() -> CompilerRuntimeInterface:
-    return PistonClient()
+def _whole(value: Any) -> int | None:
+    return None if value is None else round(value)
@@ -0,0 +1,75 @@
+"""
+Process-wide cache of the runtimes installed in Piston.
+
+GET /api/v2/runtimes changes only when someone installs a package, yet every
+execution needs it: to send an exact version instead of "*", and to turn an
+uninstalled language into an immediate 400 instead of one failed sandbox
+round trip per test case. The registry loads the list at startup and
+refreshes it at most every PISTON_RUNTIMES_TTL_S; concurrent callers share a
+single refresh.
+
+When Piston can't be reached the last good list keeps serving, and a failed
+load is retried after PISTON_RUNTIMES_RETRY_S rather than on every request.
+With no list at all, callers fall back to the old behaviour (version "*",
+no pre-dispatch rejection).
+"""
+
+import asyncio
+import re
+import time
+from collections.abc import Awaitable, Callable
+
+import httpx
+
+from app.config import settings
+from app.interfaces.compiler_runtime import RuntimeInfo
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _version_key(version: str) -> tuple[int, ...]:
+    return tuple(int(part) for part in re.findall(r"\d+", version))
+
+
+def find_runtime(runtimes: list[RuntimeInfo], name: str) -> RuntimeInfo | None:
+    """The newest installed runtime called `name` (or aliased to it)."""
+    matches = [r for r in runtimes if r.language == name or name in r.aliases]
+    return max(matches, key=lambda r: _version_key(r.version), default=None)
+
+
+class RuntimeRegistry:
+    def __init__(self) -> None:
+        self._runtimes: list[RuntimeInfo] | None = None
+        self._next_refresh = 0.0
+        self._lock = asyncio.Lock()
+
+    def snapshot(self) -> list[RuntimeInfo] | None:
+        """The cached list as-is, without refreshing; None if never loaded."""
+        return self._runtimes
+
+    async def runtimes(
+        self, fetch: Callable[[], Awaitable[list[RuntimeInfo]]]
+    ) -> list[RuntimeInfo] | None:
+        """The cached list, refreshed through `fetch` once the TTL has run out."""
+        if time.monotonic() < self._next_refresh:
+            return self._runtimes
+        async with self._lock:
+            # Another caller may have refreshed while this one waited.
+            if time.monotonic() < self._next_refresh:
+                return self._runtimes
+            try:
+                self._runtimes = await fetch()
+                self._next_refresh = time.monotonic() + settings.PISTON_RUNTIMES_TTL_S
+                logger.info("Loaded %d Piston runtimes", len(self._runtimes))
+            except (httpx.HTTPError, ValueError) as e:
+                self._next_refresh = time.monotonic() + settings.PISTON_RUNTIMES_RETRY_S
+                logger.warning(
+                    "Could not load Piston runtimes (%s); %s",
+                    e,
+                    "keeping the previous list" if self._runtimes else "versions unresolved",
+                )
+        return self._runtimes
+
+
+runtime_registry = RuntimeRegistry()
@@ -0,0 +1,404 @@
+"""
+CompilerRuntimeInterface that runs Python from a pool of warm fork servers.
+
+Most submissions — and every reference-solution validation — are Python,
+and a fresh interpreter per case spends far longer starting up than the
+case takes to run. With PYTHON_POOL_SIZE > 0, default_compiler_runtime()
+wraps the configured runtime in PythonPoolRuntime: Python goes to one of up
+to PYTHON_POOL_SIZE long-lived python3 processes (app/utils/python_zygote.py)
+that have the usual stdlib modules imported already, and each case forks a
+fresh child of one of them. Every other language passes through to the
+wrapped runtime unchanged.
+
+A case is still an independent process — forked from a clean server, never
+reused — with the local sandbox's limits: stdin/stdout/stderr redirected to
+files in a private directory, its own session, the LOCAL_SANDBOX_* rlimits,
+and the whole session SIGKILLed at the time limit (exit code -1, as with
+Piston). Output past LOCAL_SANDBOX_MAX_OUTPUT_BYTES kills the run the same
+way.
+
+As with COMPILER_RUNTIME="local", this is NOT an isolation boundary like
+Piston's; only enable it where that is acceptable.
+
+Servers start lazily (or up front via warm_python_pool()) and belong to the
+event loop that started them. One that dies is replaced on the next case.
+"""
+
+import asyncio
+import contextlib
+import json
+import math
+import os
+import shutil
+import signal
+import tempfile
+import time
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
+
+from fastapi import FastAPI
+
+from app.config import settings
+from app.interfaces.compiler_runtime import (
+    CompilerRuntimeInterface,
+    ExecutionResult,
+    RuntimeInfo,
+    UnsupportedLanguageError,
+)
+from app.logger import get_logger
+from app.utils.local_sandbox import DEFAULT_RUN_TIMEOUT_MS, sandbox_env
+from app.utils.piston_client import LANGUAGE_ALIASES
+
+logger = get_logger(__name__)
+
+_SERVER_SCRIPT = Path(__file__).with_name("python_zygote.py")
+_INTERPRETER = "python3"
+
+
+class _ServerDiedError(Exception):
+    """The fork server closed its pipe; it is discarded and replaced."""
+
+
+def _kill_session(pid: int) -> None:
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        # Killed before the child's setsid(): it has no group of its own yet.
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(pid, signal.SIGKILL)
+
+
+class _ForkServer:
+    def __init__(self, proc: asyncio.subprocess.Process, version: str) -> None:
+        self.proc = proc
+        self.version = version
+
+    @classmethod
+    async def start(cls) -> "_ForkServer":
+        home = tempfile.gettempdir()
+        proc = await asyncio.create_subprocess_exec(
+            _INTERPRETER,
+            "-I",
+            str(_SERVER_SCRIPT),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            env=sandbox_env(home),
+            cwd=home,
+            start_new_session=True,
+        )
+        server = cls(proc, version="")
+        server.version = (await server._receive())["version"]
+        return server
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.returncode is None
+
+    async def _receive(self) -> dict[str, Any]:
+        assert self.proc.stdout is not None
+        line = await self.proc.stdout.readline()
+        if not line:
+            raise _ServerDiedError
+        message: dict[str, Any] = json.loads(line)
+        return message
+
+    async def send(self, request: dict[str, Any]) -> int:
+        """Start one child; returns its pid."""
+        assert self.proc.stdin is not None
+        try:
+            self.proc.stdin.write(json.dumps(request).encode() + b"\n")
+            await self.proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise _ServerDiedError from e
+        pid: int = (await self._receive())["pid"]
+        return pid
+
+    async def wait(self) -> dict[str, Any]:
+        """The exit report ({"status", "cpu_ms", "max_rss_kb"}) of the last send()'s child."""
+        return await self._receive()
+
+    def stop(self) -> None:
+        with contextlib.suppress(ProcessLookupError):
+            self.proc.kill()
+        if self.proc.stdin is not None:
+            self.proc.stdin.close()
+
+
+class _ForkServerPool:
+    def __init__(self, size: int) -> None:
+        self.size = max(1, size)
+        self.loop = asyncio.get_running_loop()
+        self.version = ""
+        self._idle: asyncio.Queue[_ForkServer] = asyncio.Queue()
+        self._started = 0
+        # Cases whose caller went away: their server is handed back once the
+        # killed child has been reaped.
+        self._reaping: set[asyncio.Task[None]] = set()
+
+    async def fill(self) -> None:
+        """Start servers up to the pool size."""
+        missing = self.size - self._started
+        self._started += missing
+        for server in await asyncio.gather(
+            *(self._start() for _ in range(missing)), return_exceptions=True
+        ):
+            if isinstance(server, _ForkServer):
+                self._idle.put_nowait(server)
+            else:
+                self._started -= 1
+                logger.warning("Could not start a Python fork server: %r", server)
+
+    async def _start(self) -> _ForkServer:
+        server = await _ForkServer.start()
+        self.version = server.version
+        return server
+
+    async def _acquire(self) -> _ForkServer:
+        while True:
+            if self._idle.empty() and self._started < self.size:
+                self._started += 1
+                try:
+                    return await self._start()
+                except BaseException:
+                    self._started -= 1
+                    raise
+            server = await self._idle.get()
+            if server.alive:
+                return server
+            self._started -= 1
+
+    def _release(self, server: _ForkServer) -> None:
+        if server.alive:
+            self._idle.put_nowait(server)
+        else:
+            self._started -= 1
+
+    def _discard(self, server: _ForkServer) -> None:
+        server.stop()
+        self._started -= 1
+
+    async def run(self, request: dict[str, Any], timeout_s: float) -> tuple[dict[str, Any], bool]:
+        """
+        Run one case; returns (exit report, timed out). The request never ran
+        if the server dies before acknowledging it, so it is retried once on
+        a fresh server.
+        """
+        for attempt in (1, 2):
+            server = await self._acquire()
+            try:
+                pid = await server.send(request)
+            except _ServerDiedError:
+                self._discard(server)
+                if attempt == 2:
+                    raise
+                logger.warning("Python fork server exited; retrying on a fresh one")
+                continue
+            except BaseException:
+                self._discard(server)
+                raise
+            break
+
+        timed_out = False
+        try:
+            try:
+                async with asyncio.timeout(timeout_s):
+                    report = await server.wait()
+            except TimeoutError:
+                timed_out = True
+                _kill_session(pid)
+                report = await server.wait()
+        except _ServerDiedError:
+            # The program killed its own server; count it as a crash.
+            self._discard(server)
+            _kill_session(pid)
+            return {"status": -1}, timed_out
+        except BaseException:
+            # Cancelled (fail-fast, client gone): kill the child and take the
+            # server back once it has reported the exit.
+            _kill_session(pid)
+            task = asyncio.create_task(self._reap(server))
+            self._reaping.add(task)
+            task.add_done_callback(self._reaping.discard)
+            raise
+        self._release(server)
+        return report, timed_out
+
+    async def _reap(self, server: _ForkServer) -> None:
+        try:
+            await server.wait()
+        except _ServerDiedError:
+            self._discard(server)
+        else:
+            self._release(server)
+
+    def abandon(self) -> None:
+        """Kill the servers of a pool whose event loop has gone, pipes and all."""
+        while not self._idle.empty():
+            with contextlib.suppress(ProcessLookupError):
+                self._idle.get_nowait().proc.kill()
+        self._started = 0
+
+    async def close(self) -> None:
+        servers = []
+        while not self._idle.empty():
+            server = self._idle.get_nowait()
+            server.stop()
+            servers.append(server)
+        self._started = 0
+        await asyncio.gather(*(server.proc.wait() for server in servers))
+
+
+_pool: _ForkServerPool | None = None
+
+
+def _current_pool() -> _ForkServerPool:
+    global _pool
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool.loop is not loop:
+        if _pool is not None:
+            _pool.abandon()
+        _pool = _ForkServerPool(settings.PYTHON_POOL_SIZE)
+    return _pool
+
+
+def _read_capped(path: Path, limit: int) -> tuple[str, bool]:
+    """The file's text up to `limit` bytes, and whether it reached the cap."""
+    try:
+        with path.open("rb") as f:
+            data = f.read(limit + 1)
+    except FileNotFoundError:
+        return "", False
+    return data[:limit].decode(errors="replace"), len(data) >= limit
+
+
+class PythonPoolRuntime(CompilerRuntimeInterface):
+    """Python through the fork-server pool; every other language through `fallback`."""
+
+    def __init__(self, fallback: CompilerRuntimeInterface) -> None:
+        self.fallback = fallback
+
+    @staticmethod
+    def _pooled(language: str) -> bool:
+        return LANGUAGE_ALIASES.get(language.lower(), language.lower()) == "python"
+
+    async def execute(
+        self,
+        source_code: str,
+        language: str,
+        stdin: str = "",
+        run_timeout_ms: int | None = None,
+    ) -> ExecutionResult:
+        if not self._pooled(language):
+            return await self.fallback.execute(source_code, language, stdin, run_timeout_ms)
+
+        timeout_ms = run_timeout_ms or DEFAULT_RUN_TIMEOUT_MS
+        output_limit = settings.LOCAL_SANDBOX_MAX_OUTPUT_BYTES
+        logger.debug("Pooled execute: stdin_len=%d run_timeout_ms=%d", len(stdin), timeout_ms)
+        with tempfile.TemporaryDirectory(prefix="interxai-run-") as root:
+            io_dir = Path(root)
+            scratch = io_dir / "run"
+            scratch.mkdir()
+            (io_dir / "main.py").write_text(source_code)
+            (io_dir / "stdin").write_text(stdin)
+            request = {
+                "source": str(io_dir / "main.py"),
+                "stdin": str(io_dir / "stdin"),
+                "stdout": str(io_dir / "stdout"),
+                "stderr": str(io_dir / "stderr"),
+                "cwd": str(scratch),
+                "env": sandbox_env(str(scratch)),
+                "limits": {
+                    "cpu_s": math.ceil(timeout_ms / 1000) + 1,
+                    "memory_bytes": settings.LOCAL_SANDBOX_MEMORY_MB * 1024 * 1024,
+                    "file_bytes": output_limit,
+                    "processes": settings.LOCAL_SANDBOX_MAX_PROCESSES,
+                },
+            }
+            started = time.monotonic()
+            report, timed_out = await _current_pool().run(request, timeout_ms / 1000)
+            wall_time_ms = int((time.monotonic() - started) * 1000)
+            stdout, stdout_full = _read_capped(io_dir / "stdout", output_limit)
+            stderr, stderr_full = _read_capped(io_dir / "stderr", output_limit)
+
+        exceeded = stdout_full or stderr_full
+        if exceeded:
+            stderr += "\n[output limit exceeded]"
+        status: int = report["status"]
+        max_rss_kb: int | None = report.get("max_rss_kb")
+        return ExecutionResult(
+            stdout=stdout,
+            stderr=stderr,
+            # Killed by us or by a signal: -1, matching Piston's null exit code.
+            exit_code=-1 if timed_out or exceeded or status < 0 else status,
+            wall_time_ms=wall_time_ms,
+            cpu_time_ms=report.get("cpu_ms"),
+            memory_bytes=None if max_rss_kb is None else max_rss_kb * 1024,
+            signal=signal.Signals(-status).name if status < 0 else None,
+            timed_out=timed_out,
+            output_limit_exceeded=exceeded,
+        )
+
+    async def execute_batch(
+        self,
+        source_code: str,
+        language: str,
+        stdins: Sequence[str],
+        run_timeout_ms: int | None = None,
+    ) -> list[ExecutionResult]:
+        if not self._pooled(language):
+            return await self.fallback.execute_batch(source_code, language, stdins, run_timeout_ms)
+        return await super().execute_batch(source_code, language, stdins, run_timeout_ms)
+
+    async def list_runtimes(self) -> list[RuntimeInfo]:
+        runtimes = [r for r in await self.fallback.list_runtimes() if r.language != "python"]
+        if shutil.which(_INTERPRETER):
+            runtimes.append(
+                RuntimeInfo(
+                    language="python",
+                    version=(_pool.version if _pool is not None else "") or "local",
+                    aliases=[
+                        a
+                        for a, target in LANGUAGE_ALIASES.items()
+                        if target == "python" and a != "python"
+                    ],
+                )
+            )
+        return runtimes
+
+    async def validate_language(self, language: str) -> None:
+        if not self._pooled(language):
+            await self.fallback.validate_language(language)
+        elif shutil.which(_INTERPRETER) is None:
+            raise UnsupportedLanguageError(f"'{_INTERPRETER}' is not installed")
+
+    def runtime_id(self, language: str) -> str:
+        # Distinct from Piston's "python@x.y.z": the interpreter differs.
+        return "python" if self._pooled(language) else self.fallback.runtime_id(language)
+
+    def batch_size(self, language: str) -> int:
+        # A fork is cheaper than any batching; one case per call.
+        return 1 if self._pooled(language) else self.fallback.batch_size(language)
+
+
+async def warm_python_pool() -> None:
+    """Start every fork server up front (API lifespan / worker startup)."""
+    if settings.PYTHON_POOL_SIZE > 0:
+        await _current_pool().fill()
+
+
+async def stop_python_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+@asynccontextmanager
+async def python_pool_lifespan(_: FastAPI) -> AsyncIterator[None]:
+    await warm_python_pool()
+    try:
+        yield
+    finally:
+        await stop_python_pool()
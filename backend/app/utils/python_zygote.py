@@ -0,0 +1,151 @@
+"""
+Fork server behind app.utils.python_pool. Runs under the sandbox's python3
+(started with -I), not the service's interpreter, so it imports nothing
+from the app.
+
+Protocol, one JSON object per line: on start-up it writes {"version": ...}
+once the modules in _PRELOAD are imported. Then, for each request read on
+stdin, it forks a child that runs the request's source and writes
+{"pid": ...} as soon as the child exists and {"status": ..., "cpu_ms": ...,
+"max_rss_kb": ...} once it has exited (status negative: killed by that
+signal). Children inherit every
+pre-imported module, so they start in well under a millisecond instead of
+paying interpreter start-up per test case.
+"""
+
+import builtins
+import importlib
+import json
+import os
+import platform
+import random
+import resource
+import signal
+import sys
+import traceback
+from pathlib import Path
+from typing import Any, NoReturn
+
+# What DSA solutions commonly import; anything else is imported by the child.
+_PRELOAD = (
+    "array",
+    "bisect",
+    "collections",
+    "copy",
+    "dataclasses",
+    "decimal",
+    "fractions",
+    "functools",
+    "heapq",
+    "io",
+    "itertools",
+    "math",
+    "operator",
+    "re",
+    "statistics",
+    "string",
+    "typing",
+)
+
+
+def _reply(message: dict[str, Any]) -> None:
+    sys.stdout.write(json.dumps(message) + "\n")
+    sys.stdout.flush()
+
+
+def _apply_limits(limits: dict[str, int]) -> None:
+    resource.setrlimit(resource.RLIMIT_CPU, (limits["cpu_s"], limits["cpu_s"] + 1))
+    resource.setrlimit(resource.RLIMIT_AS, (limits["memory_bytes"], limits["memory_bytes"]))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (limits["file_bytes"], limits["file_bytes"]))
+    resource.setrlimit(resource.RLIMIT_NPROC, (limits["processes"], limits["processes"]))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+
+def _exit_status(e: SystemExit) -> int:
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    print(e.code, file=sys.stderr)
+    return 1
+
+
+def _print_exception(e: BaseException) -> None:
+    # Drop this file's frames so the traceback reads like `python3 main.py`.
+    tb = e.__traceback__
+    while tb is not None and tb.tb_frame.f_code.co_filename == __file__:
+        tb = tb.tb_next
+    traceback.print_exception(type(e), e, tb)
+
+
+def _child(request: dict[str, Any]) -> NoReturn:
+    status = 70
+    try:
+        os.setsid()
+        for fd, path, flags in (
+            (0, request["stdin"], os.O_RDONLY),
+            (1, request["stdout"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC),
+            (2, request["stderr"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC),
+        ):
+            target = os.open(path, flags, 0o600)
+            os.dup2(target, fd)
+            os.close(target)
+        sys.stdin = open(0, encoding="utf-8", closefd=False)  # noqa: SIM115
+        sys.stdout = open(1, "w", encoding="utf-8", closefd=False)  # noqa: SIM115
+        sys.stderr = open(  # noqa: SIM115
+            2, "w", encoding="utf-8", errors="backslashreplace", buffering=1, closefd=False
+        )
+
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.argv = [request["source"]]
+        sys.path.insert(0, str(Path(request["source"]).parent))
+        # Every child would otherwise replay the server's random sequence.
+        random.seed()
+        # CPython ignores SIGXFSZ; restore it so the output cap kills the run.
+        signal.signal(signal.SIGXFSZ, signal.SIG_DFL)
+        _apply_limits(request["limits"])
+
+        try:
+            source = Path(request["source"]).read_text(encoding="utf-8")
+            code = compile(source, request["source"], "exec")
+            exec(
+                code,
+                {"__name__": "__main__", "__file__": request["source"], "__builtins__": builtins},
+            )
+            status = 0
+        except SystemExit as e:
+            status = _exit_status(e)
+        except BaseException as e:  # noqa: BLE001 — the program's own crash
+            _print_exception(e)
+            status = 1
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        # Never fall back into the server loop, whatever happened above.
+        os._exit(status)
+
+
+def main() -> None:
+    for name in _PRELOAD:
+        importlib.import_module(name)
+    _reply({"version": platform.python_version()})
+    for line in sys.stdin:
+        request = json.loads(line)
+        pid = os.fork()
+        if pid == 0:
+            _child(request)
+        _reply({"pid": pid})
+        _, status, usage = os.wait4(pid, 0)
+        _reply(
+            {
+                "status": os.waitstatus_to_exitcode(status),
+                "cpu_ms": int((usage.ru_utime + usage.ru_stime) * 1000),
+                "max_rss_kb": usage.ru_maxrss,
+            }
+        )
+
+
+if __name__ == "__main__":
+    main()
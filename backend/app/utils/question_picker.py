@@ -0,0 +1,214 @@
+"""
+Least-served DSA question selection without a hot row.
+
+Every candidate of an interview maps to the same (topic, difficulty), so a
+synchronized start funnels every assignment through the same few
+dsa_questions rows; incrementing times_served there per assignment
+serializes the assigns on those row locks. Here each (topic, difficulty)
+is a Redis sorted set of question ids scored by times served. One Lua call
+takes the lowest-scored id of each group and increments it, atomically, so
+concurrent assigns never wait on each other and the counts within a group
+never drift more than one apart.
+
+- A group's set is built from the DB (times_served plus picks not yet
+  folded back) on first use and expires after DSA_PICKER_REFRESH_S, which
+  is how questions added to or removed from the bank are picked up.
+- Every pick is also added to a pending-delta hash. reconcile() folds that
+  into times_served with a single UPDATE, at most once per
+  DSA_PICKER_RECONCILE_S across every worker, so the column stays the
+  durable record the DB fallback balances on.
+
+pick() returns None when DSA_QUESTION_PICKER is "db" or Redis can't be
+reached; the caller then picks in Postgres instead.
+"""
+
+from collections.abc import Iterable, Mapping
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import Integer, column, select, tuple_, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.logger import get_logger
+from app.models.dsa_question import DsaQuestion
+from app.utils import metrics
+from app.utils.cache_backends import redis_from_url
+
+logger = get_logger(__name__)
+
+_PREFIX = "interxai:dsa:served:"
+_PENDING_KEY = _PREFIX + "pending"
+_RECONCILE_KEY = _PREFIX + "reconcile"
+
+# KEYS: one sorted set per group, then the pending hash; ARGV[g]: picks
+# wanted from KEYS[g]. Per group, the picked ids in order, or -1 when the
+# set does not exist (never built, or expired). The n picks are the n
+# least-served ids, distinct as long as the group has n questions; only
+# past that do they wrap around, so the k-th topic of a (topic,
+# difficulty) gets the k-th least-served question however skewed the
+# scores are.
+_PICK_SCRIPT = """
+local pending = KEYS[#KEYS]
+local picked = {}
+for g = 1, #KEYS - 1 do
+  if redis.call('EXISTS', KEYS[g]) == 0 then
+    picked[g] = -1
+  else
+    local n = tonumber(ARGV[g])
+    local lowest = redis.call('ZRANGE', KEYS[g], 0, n - 1)
+    local ids = {}
+    for i = 1, n do
+      local id = lowest[(i - 1) % #lowest + 1]
+      redis.call('ZINCRBY', KEYS[g], 1, id)
+      redis.call('HINCRBY', pending, id, 1)
+      ids[i] = id
+    end
+    picked[g] = ids
+  end
+end
+return picked
+"""
+
+# Empties the pending hash and returns what it held, as a flat id/count list.
+_TAKE_PENDING_SCRIPT = """
+local pending = redis.call('HGETALL', KEYS[1])
+redis.call('DEL', KEYS[1])
+return pending
+"""
+
+_redis: Redis | None = None
+
+
+def _client() -> Redis:
+    global _redis
+    if _redis is None:
+        _redis = redis_from_url(settings.REDIS_URL)
+    return _redis
+
+
+def _key(group: tuple[str, str]) -> str:
+    topic, difficulty = group
+    # Difficulty first: it never contains ':', so the key is unambiguous.
+    return f"{_PREFIX}{difficulty}:{topic}"
+
+
+async def _build(db: AsyncSession, groups: Iterable[tuple[str, str]]) -> None:
+    """Create the sorted sets of `groups` from the DB; sets that exist meanwhile are kept."""
+    rows = (
+        await db.execute(
+            select(
+                DsaQuestion.id, DsaQuestion.topic, DsaQuestion.difficulty, DsaQuestion.times_served
+            ).where(tuple_(DsaQuestion.topic, DsaQuestion.difficulty).in_(sorted(groups)))
+        )
+    ).all()
+    if not rows:
+        return
+    redis = _client()
+    not_folded = await redis.hmget(_PENDING_KEY, [str(row.id) for row in rows])
+    members: dict[str, dict[str, int]] = {}
+    for row, extra in zip(rows, not_folded, strict=True):
+        members.setdefault(_key((row.topic, row.difficulty)), {})[str(row.id)] = (
+            row.times_served + int(extra or 0)
+        )
+    async with redis.pipeline(transaction=False) as pipe:
+        for key, scores in members.items():
+            pipe.zadd(key, scores, nx=True)
+            pipe.expire(key, settings.DSA_PICKER_REFRESH_S)
+        await pipe.execute()
+
+
+async def pick(
+    db: AsyncSession, wanted: Mapping[tuple[str, str], int]
+) -> dict[tuple[str, str], list[int]] | None:
+    """
+    wanted[(topic, difficulty)] least-served question ids per group, each
+    counted as served as it is picked (a group asked for more ids than it
+    has questions wraps around). A group without questions gets []. None
+    means "pick in the DB instead".
+    """
+    if settings.DSA_QUESTION_PICKER != "redis" or not wanted:
+        return None
+    groups = list(wanted)
+    picked: dict[tuple[str, str], list[int]] = {}
+    try:
+        script = _client().register_script(_PICK_SCRIPT)
+        for attempt in range(2):
+            todo = [group for group in groups if group not in picked]
+            replies = await script(
+                keys=[*(_key(group) for group in todo), _PENDING_KEY],
+                args=[wanted[group] for group in todo],
+            )
+            missing = []
+            for group, reply in zip(todo, replies, strict=True):
+                if reply == -1:
+                    missing.append(group)
+                else:
+                    picked[group] = [int(question_id) for question_id in reply]
+            if not missing:
+                break
+            if attempt == 0:
+                await _build(db, missing)
+        # Still missing after a build: no questions in the bank for them.
+        for group in groups:
+            picked.setdefault(group, [])
+    except RedisError as e:
+        logger.warning("Question picker unavailable, picking in the DB: %s", e)
+        metrics.incr("question_picker.fallbacks")
+        return None
+    return picked
+
+
+async def forget(groups: Iterable[tuple[str, str]]) -> None:
+    """Drop the sets of `groups` (e.g. one handed out a deleted question); rebuilt on next use."""
+    keys = [_key(group) for group in groups]
+    if settings.DSA_QUESTION_PICKER != "redis" or not keys:
+        return
+    try:
+        await _client().delete(*keys)
+    except RedisError as e:
+        logger.warning("Could not drop question picker sets: %s", e)
+
+
+async def reconcile() -> None:
+    """
+    Fold the picks made since the last fold into dsa_questions.times_served,
+    if no worker has done so in the last DSA_PICKER_RECONCILE_S. Counts the
+    UPDATE fails to write go back to the pending hash.
+    """
+    if settings.DSA_QUESTION_PICKER != "redis":
+        return
+    redis = _client()
+    try:
+        if not await redis.set(_RECONCILE_KEY, "1", nx=True, ex=settings.DSA_PICKER_RECONCILE_S):
+            return
+        flat = await redis.register_script(_TAKE_PENDING_SCRIPT)(keys=[_PENDING_KEY])
+    except RedisError as e:
+        logger.warning("Question picker reconcile skipped: %s", e)
+        return
+    counts = [(int(flat[i]), int(flat[i + 1])) for i in range(0, len(flat), 2)]
+    if not counts:
+        return
+
+    served = values(column("id", Integer), column("n", Integer), name="served").data(counts)
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(DsaQuestion)
+                .where(DsaQuestion.id == served.c.id)
+                .values(times_served=DsaQuestion.times_served + served.c.n)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+    except Exception:
+        logger.exception("Folding %d question pick counts into the DB failed", len(counts))
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for question_id, n in counts:
+                    pipe.hincrby(_PENDING_KEY, str(question_id), n)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Lost %d question pick counts: %s", len(counts), e)
+        return
+    metrics.incr("question_picker.reconciled", sum(n for _, n in counts))
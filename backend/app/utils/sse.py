@@ -0,0 +1,113 @@
+"""
+Server-Sent Events for the streaming DSA endpoints.
+
+stream_case_results() runs a grading coroutine in its own task and streams
+what it reports: an `event: case` per DsaTestCaseStatus as each case
+finishes (in completion order, not case order), then one `event: summary`
+with the same body the blocking endpoint returns, or an `event: error` with
+{"detail": ...} if grading raised. Between events a comment line goes out
+every _KEEPALIVE_S so idle proxies keep the connection open.
+
+Nothing is buffered on our side beyond the pending events of one request,
+and the response asks proxies not to buffer either (X-Accel-Buffering).
+"""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.exceptions.common import (
+    BadRequestError,
+    ForbiddenError,
+    NotFoundError,
+    ServiceUnavailableError,
+    TooManyRequestsError,
+)
+from app.logger import get_logger
+from app.schemas.session import DsaTestCaseStatus
+
+logger = get_logger(__name__)
+
+_KEEPALIVE_S = 15.0
+# Graders that must finish even if their client disconnects (submits).
+_detached: set[asyncio.Task[Any]] = set()
+
+OnCase = Callable[[DsaTestCaseStatus], None]
+
+
+def sse_event(event: str, data: BaseModel | dict[str, Any]) -> str:
+    payload = (
+        data.model_dump_json()
+        if isinstance(data, BaseModel)
+        else json.dumps(data, separators=(",", ":"))
+    )
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def _error_detail(e: Exception) -> str:
+    if isinstance(
+        e,
+        BadRequestError
+        | ForbiddenError
+        | NotFoundError
+        | ServiceUnavailableError
+        | TooManyRequestsError,
+    ):
+        return e.detail
+    logger.exception("Streaming grading run failed", exc_info=e)
+    return "Internal Server Error"
+
+
+def stream_case_results(
+    grade: Callable[[OnCase], Awaitable[BaseModel]], *, finish_on_disconnect: bool
+) -> StreamingResponse:
+    """
+    Stream `grade(on_case)` as described in the module docstring. When the
+    client goes away mid-run the grading task is cancelled, unless
+    `finish_on_disconnect` — then it runs to completion unobserved, so a
+    submit still gets recorded.
+    """
+    return StreamingResponse(
+        _events(grade, finish_on_disconnect),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _events(
+    grade: Callable[[OnCase], Awaitable[BaseModel]], finish_on_disconnect: bool
+) -> AsyncIterator[str]:
+    # None marks the end of the stream, after the summary or error event.
+    queue: asyncio.Queue[str | None] = asyncio.Queue()
+
+    async def run() -> None:
+        try:
+            summary = await grade(lambda status: queue.put_nowait(sse_event("case", status)))
+        except Exception as e:
+            queue.put_nowait(sse_event("error", {"detail": _error_detail(e)}))
+        else:
+            queue.put_nowait(sse_event("summary", summary))
+        queue.put_nowait(None)
+
+    task = asyncio.create_task(run())
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), _KEEPALIVE_S)
+            except TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                break
+            yield event
+    finally:
+        if not task.done():
+            if finish_on_disconnect:
+                _detached.add(task)
+                task.add_done_callback(_detached.discard)
+            else:
+                task.cancel()
@@ -0,0 +1,73 @@
+"""
+Per-question, per-language time limits calibrated from the reference solution.
+
+The LLM's time_limit_ms is a guess (5000 ms for most questions), so an
+infinite loop in a broken submission used to burn seconds of sandbox time
+on every hidden case. Instead, the reference solution's slowest case, as
+measured when the question is validated (or by the calibration job,
+app.background.taskiq.tasks.dsa_calibration), times DSA_TIME_LIMIT_FACTOR
+and clamped to [DSA_TIME_LIMIT_MIN_MS, DSA_TIME_LIMIT_MAX_MS], becomes the
+question's time_limit_ms. Reference solutions are Python, so runtimes whose
+start-up CPython doesn't pay (a JVM, the .NET runtime, node) get it added
+on top, in time_limits_ms. A question never calibrated keeps the LLM's
+limit for every language.
+"""
+
+import math
+from collections.abc import Sequence
+
+from app.config import settings
+from app.interfaces.compiler_runtime import ExecutionResult
+from app.models.dsa_question import DsaQuestion
+from app.utils.piston_client import LANGUAGE_ALIASES
+
+# Language (canonical name, the values of LANGUAGE_ALIASES) -> start-up
+# allowance in ms over the Python-calibrated limit. Keyed on the language
+# rather than on the runtime's id, which is whatever the runtime calls it
+# ("gcc", "csharp.net") and would miss the allowance.
+_STARTUP_ALLOWANCE_MS = {
+    "python": 0,
+    "c": 0,
+    "c++": 0,
+    "go": 0,
+    "bash": 0,
+    "javascript": 250,
+    "typescript": 250,
+    "java": 1000,
+    "csharp": 1000,
+}
+
+
+def reference_time_ms(results: Sequence[ExecutionResult]) -> int | None:
+    """The slowest case's wall time, or None if the runtime didn't report one for every case."""
+    times = [result.wall_time_ms for result in results]
+    if not times or any(t is None for t in times):
+        return None
+    return max(t for t in times if t is not None)
+
+
+def calibrate(reference_ms: int) -> tuple[int, dict[str, int]]:
+    """
+    The time limit for a reference solution whose slowest case took
+    `reference_ms`, and the limit per language.
+    """
+    base = min(
+        settings.DSA_TIME_LIMIT_MAX_MS,
+        max(
+            settings.DSA_TIME_LIMIT_MIN_MS,
+            math.ceil(reference_ms * settings.DSA_TIME_LIMIT_FACTOR),
+        ),
+    )
+    return base, {language: base + extra for language, extra in _STARTUP_ALLOWANCE_MS.items()}
+
+
+def apply(question: DsaQuestion, reference_ms: int) -> None:
+    question.reference_time_ms = reference_ms
+    question.time_limit_ms, question.time_limits_ms = calibrate(reference_ms)
+
+
+def time_limit_ms(question: DsaQuestion, language: str) -> int:
+    """The per-case time limit of `question` for a submission in `language` (any alias)."""
+    limits = question.time_limits_ms or {}
+    name = LANGUAGE_ALIASES.get(language.lower(), language.lower())
+    return limits.get(name, question.time_limit_ms)
@@ -0,0 +1,191 @@
+"""
+Client-side load balancing across the nodes of one upstream tier (Piston
+sandboxes, vision detectors), so the tier scales out without an external
+load balancer.
+
+- Each request goes to the live node with the fewest requests outstanding
+  from this process (ties broken at random).
+- Passive ejection: UPSTREAM_EJECT_AFTER_FAILURES consecutive failures
+  (connection errors, timeouts, 502/503/504) take a node out of rotation
+  for UPSTREAM_EJECT_S.
+- Active probes: with more than one node, a background task GETs every
+  node's probe path each UPSTREAM_PROBE_INTERVAL_S; a node failing its
+  probe stays out until it passes one again.
+- Retries: a request that never reached a node (connect failure) moves on
+  to the next node until every node has been tried. An idempotent request
+  is also retried after a gateway error or a dropped connection, on at most
+  UPSTREAM_MAX_ATTEMPTS nodes it actually reached — never after a read
+  timeout, which would only double the wait on an overloaded tier.
+
+If every node is out, requests still go to one of them — the tier's own
+error is more useful than a synthetic one — so a single-node setup behaves
+exactly as before.
+"""
+
+import asyncio
+import contextlib
+import random
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+from app.config import settings
+from app.logger import get_logger
+from app.utils import metrics
+
+logger = get_logger(__name__)
+
+_GATEWAY_ERRORS = frozenset({502, 503, 504})
+
+
+def endpoint_list(value: str) -> list[str]:
+    """Split a comma-separated endpoint setting into base URLs."""
+    return [url.strip().rstrip("/") for url in value.split(",") if url.strip()]
+
+
+@dataclass
+class _Node:
+    url: str
+    outstanding: int = 0
+    failures: int = 0
+    ejected_until: float = 0.0
+    probe_ok: bool = True
+
+    def live(self, now: float) -> bool:
+        return self.probe_ok and self.ejected_until <= now
+
+
+class UpstreamPool:
+    def __init__(self, name: str, urls: list[str], probe_path: str) -> None:
+        if not urls:
+            raise ValueError(f"No endpoints configured for upstream '{name}'")
+        self.name = name
+        self.probe_path = probe_path
+        self.nodes = [_Node(url) for url in urls]
+        self._probe_task: asyncio.Task[None] | None = None
+
+    async def request(
+        self,
+        http: httpx.AsyncClient,
+        method: str,
+        path: str,
+        *,
+        idempotent: bool,
+        stream: bool = False,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        Send `method path` to a live node through `http`, failing over as the
+        module docstring describes. Returns the response of the last attempt
+        (any status); raises the last attempt's transport error. With
+        `stream`, the body is left unread and the caller must aclose() it.
+        """
+        tried: set[str] = set()
+        attempts = 0  # requests that reached a node; connect failures are free
+        while True:
+            node = self._pick(tried)
+            tried.add(node.url)
+            untried_left = len(tried) < len(self.nodes)
+            node.outstanding += 1
+            try:
+                response = await http.send(
+                    http.build_request(method, f"{node.url}{path}", **kwargs), stream=stream
+                )
+            except httpx.PoolTimeout:
+                # Our own connection pool is exhausted; says nothing about the node.
+                raise
+            except httpx.TransportError as e:
+                self._failed(node)
+                if isinstance(e, httpx.ConnectError | httpx.ConnectTimeout):
+                    retry = untried_left
+                else:
+                    attempts += 1
+                    retry = (
+                        idempotent
+                        and not isinstance(e, httpx.TimeoutException)
+                        and untried_left
+                        and attempts < settings.UPSTREAM_MAX_ATTEMPTS
+                    )
+                if not retry:
+                    raise
+                logger.warning("%s node %s failed (%r); retrying elsewhere", self.name, node.url, e)
+                metrics.incr(f"upstream.{self.name}.retries")
+                continue
+            finally:
+                node.outstanding -= 1
+
+            if response.status_code not in _GATEWAY_ERRORS:
+                node.failures = 0
+                return response
+            self._failed(node)
+            attempts += 1
+            if not (idempotent and untried_left and attempts < settings.UPSTREAM_MAX_ATTEMPTS):
+                return response
+            await response.aclose()
+            logger.warning(
+                "%s node %s answered %d; retrying elsewhere",
+                self.name,
+                node.url,
+                response.status_code,
+            )
+            metrics.incr(f"upstream.{self.name}.retries")
+
+    def _pick(self, tried: set[str]) -> _Node:
+        now = time.monotonic()
+        untried = [n for n in self.nodes if n.url not in tried] or self.nodes
+        candidates = [n for n in untried if n.live(now)] or untried
+        fewest = min(n.outstanding for n in candidates)
+        return random.choice([n for n in candidates if n.outstanding == fewest])
+
+    def _failed(self, node: _Node) -> None:
+        node.failures += 1
+        if node.failures >= settings.UPSTREAM_EJECT_AFTER_FAILURES and len(self.nodes) > 1:
+            node.failures = 0
+            node.ejected_until = time.monotonic() + settings.UPSTREAM_EJECT_S
+            logger.warning(
+                "Ejecting %s node %s for %.0fs", self.name, node.url, settings.UPSTREAM_EJECT_S
+            )
+            metrics.incr(f"upstream.{self.name}.ejections")
+        self._publish()
+
+    def _publish(self) -> None:
+        now = time.monotonic()
+        metrics.set_gauge(
+            f"upstream.{self.name}.live_nodes", sum(1 for n in self.nodes if n.live(now))
+        )
+
+    # ── Active health probes ────────────────────────────────────────────────
+
+    def start_probes(self, http: httpx.AsyncClient) -> None:
+        """Probe every node in the background; a no-op with a single node."""
+        if len(self.nodes) > 1 and self._probe_task is None:
+            self._probe_task = asyncio.create_task(self._probe_loop(http))
+
+    async def stop_probes(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._probe_task
+            self._probe_task = None
+
+    async def _probe_loop(self, http: httpx.AsyncClient) -> None:
+        while True:
+            await asyncio.gather(*(self._probe(http, node) for node in self.nodes))
+            self._publish()
+            await asyncio.sleep(settings.UPSTREAM_PROBE_INTERVAL_S)
+
+    async def _probe(self, http: httpx.AsyncClient, node: _Node) -> None:
+        try:
+            response = await http.get(
+                f"{node.url}{self.probe_path}", timeout=settings.UPSTREAM_PROBE_TIMEOUT_S
+            )
+            ok = response.is_success
+        except httpx.HTTPError:
+            ok = False
+        if ok != node.probe_ok:
+            logger.info(
+                "%s node %s is %s", self.name, node.url, "back up" if ok else "failing its probe"
+            )
+        node.probe_ok = ok
@@ -5,27 +5,38 @@ import httpx
 from app.config import settings
 from app.interfaces.vision import VisionError, VisionInterface, VisionResult
 from app.logger import get_logger
+from app.utils.http_clients import vision_http, vision_pool
 
 logger = get_logger(__name__)
 
 
 class VisionClient(VisionInterface):
-    def __init__(self) -> None:
-        self.base_url = settings.VISION_URL.rstrip("/")
+    def __init__(self, http: httpx.AsyncClient | None = None) -> None:
+        # The process-wide pooled client unless one is injected; requests are
+        # spread over the VISION_URL nodes either way.
+        self.http = http or vision_http()
+        self.nodes = vision_pool()
 
     async def detect(self, frames: list[str]) -> VisionResult:
         headers: dict[str, str] = {}
         if settings.VISION_SHARED_SECRET:
             headers["X-Vision-Secret"] = settings.VISION_SHARED_SECRET
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/detect",
-                    json={"frames": frames, "checks": ["face_count"]},
-                    headers=headers,
-                    timeout=settings.VISION_TIMEOUT_S,
-                )
-                response.raise_for_status()
+            # Detection is stateless, so a failed call may be retried elsewhere.
+            response = await self.nodes.request(
+                self.http,
+                "POST",
+                "/detect",
+                idempotent=True,
+                json={"frames": frames, "checks": ["face_count"]},
+                headers=headers,
+                timeout=httpx.Timeout(
+                    settings.VISION_TIMEOUT_S,
+                    connect=settings.HTTP_CONNECT_TIMEOUT_S,
+                    pool=settings.HTTP_POOL_TIMEOUT_S,
+                ),
+            )
+            response.raise_for_status()
         except httpx.HTTPError as e:
             raise VisionError(f"Vision service request failed: {e}") from e
 
@@ -0,0 +1,5 @@
+"""
+DSA grading benchmarks: scripted candidate loads (benchmarks.scenarios) run
+through the service's grading path against a local fake Piston
+(benchmarks.fake_piston). See benchmarks.runner.
+"""
@@ -0,0 +1,121 @@
+"""
+A stand-in for the Piston HTTP API, for benchmarks: it runs nothing, it just
+answers like Piston after a sampled delay.
+
+- GET /api/v2/runtimes lists a fixed set of runtimes (_RUNTIMES).
+- POST /api/v2/execute echoes the request's stdin as the program's stdout,
+  so hidden cases whose expected output is their input pass. Per call it
+  waits a log-normal latency (median `latency_ms`, shape `latency_sigma`),
+  answers 502 with probability `failure_rate`, and with probability
+  `oversize_rate` prints `oversize_bytes` of junk instead of the echo. At
+  most `concurrency` executions are in progress; the rest queue, as
+  Piston's job limit makes them.
+- GET /_stats reports the calls served so far; POST /_reset zeroes them.
+
+Piston's batch mode (PISTON_BATCH_ENABLED) is not emulated: its driver
+program's per-case output would need actually running it.
+
+Run on its own with `python -m benchmarks.fake_piston --port 2000
+[--config '{"latency_ms": 50}']`; benchmarks.runner starts one per Piston node
+of each scenario.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+_RUNTIMES = [
+    {"language": "python", "version": "3.12.0", "aliases": ["py", "python3"]},
+    {"language": "c++", "version": "10.2.0", "aliases": ["cpp", "g++"]},
+    {"language": "c", "version": "10.2.0", "aliases": ["gcc"]},
+    {"language": "java", "version": "15.0.2", "aliases": []},
+    {"language": "javascript", "version": "18.15.0", "aliases": ["node-javascript", "js"]},
+    {"language": "go", "version": "1.16.2", "aliases": ["golang"]},
+]
+_COMPILED = frozenset({"c++", "c", "java", "go"})
+
+
+@dataclass(frozen=True)
+class FakePistonConfig:
+    latency_ms: float = 40.0
+    latency_sigma: float = 0.5
+    failure_rate: float = 0.0
+    oversize_rate: float = 0.0
+    oversize_bytes: int = 4 * 1024 * 1024
+    concurrency: int = 64
+    seed: int = 0
+
+
+@dataclass
+class _Stats:
+    executes: int = 0
+    failures: int = 0
+    oversized: int = 0
+    bytes_out: int = 0
+
+
+def create_app(config: FakePistonConfig) -> FastAPI:
+    app = FastAPI()
+    rng = random.Random(config.seed)
+    jobs = asyncio.Semaphore(config.concurrency)
+    stats = _Stats()
+
+    @app.get("/api/v2/runtimes")
+    async def runtimes() -> list[dict[str, Any]]:
+        return _RUNTIMES
+
+    @app.post("/api/v2/execute")
+    async def execute(request: Request) -> JSONResponse:
+        payload = await request.json()
+        stats.executes += 1
+        async with jobs:
+            await asyncio.sleep(
+                rng.lognormvariate(0.0, config.latency_sigma) * config.latency_ms / 1000
+            )
+        if rng.random() < config.failure_rate:
+            stats.failures += 1
+            return JSONResponse({"message": "injected failure"}, status_code=502)
+        stdout: str = payload.get("stdin", "")
+        if rng.random() < config.oversize_rate:
+            stats.oversized += 1
+            stdout = "x" * config.oversize_bytes
+        stats.bytes_out += len(stdout)
+        body: dict[str, Any] = {
+            "language": payload["language"],
+            "version": payload["version"],
+            "run": {"stdout": stdout, "stderr": "", "code": 0, "signal": None},
+        }
+        if payload["language"] in _COMPILED:
+            body["compile"] = {"stdout": "", "stderr": "", "code": 0, "signal": None}
+        return JSONResponse(body)
+
+    @app.get("/_stats")
+    async def get_stats() -> dict[str, int]:
+        return asdict(stats)
+
+    @app.post("/_reset")
+    async def reset() -> None:
+        nonlocal stats
+        stats = _Stats()
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Piston API for benchmarks.")
+    parser.add_argument("--port", type=int, default=2000)
+    parser.add_argument("--config", default="{}", help="FakePistonConfig fields as JSON")
+    args = parser.parse_args()
+    config = FakePistonConfig(**json.loads(args.config))
+    uvicorn.run(create_app(config), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Runs benchmarks.scenarios against a fake Piston (benchmarks.fake_piston)
+started on a local port, through the service's real grading path:
+PistonClient behind the execution cache, the admission scheduler, and
+app.background.taskiq.tasks.dsa_execution.grade_cases() — everything
+run_evaluate_submission does but the database writes. No Piston, Postgres
+or Redis needed.
+
+Reported per scenario: submit latency percentiles (grading start to
+verdict, over the submits that got one; null with fewer than two), failed
+submits, Piston /execute calls per submit (retries included), and the
+resident memory of this process, which plays the API. Linux only (memory
+comes from /proc).
+
+    python -m benchmarks                  # every scenario
+    python -m benchmarks smoke --json out.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from app.background.taskiq.tasks.dsa_execution import grade_cases
+from app.config import settings
+from app.models.dsa_question import DsaQuestion
+from app.utils.admission import Flow
+from app.utils.default_providers import default_compiler_runtime
+from app.utils.http_clients import shutdown_http_clients
+from benchmarks.scenarios import SCENARIOS, Scenario
+
+# The fake answers every language the same way; only the payload differs.
+_SOURCES = {
+    "python": "import sys\nsys.stdout.write(sys.stdin.read())\n",
+    "c++": "#include <iostream>\nint main() { std::cout << std::cin.rdbuf(); }\n",
+    "java": "public class Main { public static void main(String[] a) throws Exception "
+    "{ System.in.transferTo(System.out); } }\n",
+    "javascript": "process.stdin.pipe(process.stdout);\n",
+    "go": 'package main\nimport ("io"; "os")\nfunc main() { io.Copy(os.Stdout, os.Stdin) }\n',
+}
+_COMMENT = {"python": "#"}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port: int = s.getsockname()[1]
+        return port
+
+
+def _rss_mb() -> float:
+    pages = int(Path("/proc/self/statm").read_text().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _question(scenario: Scenario) -> DsaQuestion:
+    cases = []
+    for i in range(scenario.cases):
+        line = f"{i} ".ljust(scenario.case_bytes - 1, "x")
+        cases.append({"stdin": line + "\n", "expected_stdout": line})
+    question = DsaQuestion(
+        problem_name=f"bench-{scenario.name}",
+        test_cases=cases,
+        sample_solution=None,
+        time_limit_ms=2000,
+        float_tolerance=None,
+    )
+    question.id = 0
+    return question
+
+
+def _source(language: str, scenario: Scenario, candidate: int, submit: int) -> str:
+    # Distinct per submit, so the execution cache never short-cuts a run.
+    comment = _COMMENT.get(language, "//")
+    return f"{comment} {scenario.name} candidate {candidate} submit {submit}\n{_SOURCES[language]}"
+
+
+async def _start_fakes(scenario: Scenario) -> tuple[list[subprocess.Popen[bytes]], list[str]]:
+    """One fake Piston process per node, each on a free local port, once answering."""
+    fakes: list[subprocess.Popen[bytes]] = []
+    urls: list[str] = []
+    for config in scenario.piston:
+        port = _free_port()
+        fakes.append(
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.fake_piston",
+                    "--port",
+                    str(port),
+                    "--config",
+                    json.dumps(asdict(config)),
+                ]
+            )
+        )
+        urls.append(f"http://127.0.0.1:{port}")
+    async with httpx.AsyncClient() as http:
+        for url in urls:
+            for _ in range(100):
+                try:
+                    await http.get(f"{url}/api/v2/runtimes")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            else:
+                _stop(fakes)
+                raise RuntimeError(f"fake Piston at {url} did not come up")
+    return fakes, urls
+
+
+def _stop(fakes: list[subprocess.Popen[bytes]]) -> None:
+    for fake in fakes:
+        fake.terminate()
+    for fake in fakes:
+        fake.wait()
+
+
+def _latency_summary(latencies: list[float]) -> dict[str, float | None]:
+    """p50/p95/p99/max in ms; percentiles are None below two samples, all of them with none."""
+    if len(latencies) < 2:
+        only = round(latencies[0], 1) if latencies else None
+        return {"p50": None, "p95": None, "p99": None, "max": only}
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50": round(cuts[49], 1),
+        "p95": round(cuts[94], 1),
+        "p99": round(cuts[98], 1),
+        "max": round(max(latencies), 1),
+    }
+
+
+async def run_scenario(scenario: Scenario) -> dict[str, Any]:
+    fakes, urls = await _start_fakes(scenario)
+    settings.PISTON_URL = ",".join(urls)
+    try:
+        question = _question(scenario)
+        runtime = default_compiler_runtime()
+        latencies: list[float] = []
+        verdicts: Counter[str] = Counter()
+        errors: Counter[str] = Counter()
+
+        async def candidate(index: int) -> None:
+            await asyncio.sleep(scenario.ramp_s * index / max(1, scenario.candidates))
+            language = scenario.languages[index % len(scenario.languages)]
+            for submit in range(scenario.submits):
+                started = time.perf_counter()
+                try:
+                    case_results, _ = await grade_cases(
+                        question,
+                        _source(language, scenario, index, submit),
+                        language,
+                        runtime,
+                        Flow(session_id=index, kind="submit"),
+                    )
+                except Exception as e:
+                    # What the service would answer 500 to, e.g. retries exhausted.
+                    errors[type(e).__name__] += 1
+                    continue
+                latencies.append((time.perf_counter() - started) * 1000)
+                verdicts.update(c["status"] for c in case_results)
+
+        rss_before = _rss_mb()
+        started = time.perf_counter()
+        await asyncio.gather(*(candidate(i) for i in range(scenario.candidates)))
+        elapsed = time.perf_counter() - started
+        rss_after = _rss_mb()
+
+        async with httpx.AsyncClient() as http:
+            nodes = [(await http.get(f"{url}/_stats")).json() for url in urls]
+    finally:
+        # Also forgets the node pool, so the next scenario's PISTON_URL applies.
+        await shutdown_http_clients()
+        _stop(fakes)
+
+    submits = len(latencies) + sum(errors.values())
+    return {
+        "scenario": scenario.name,
+        "cpu_count": os.cpu_count(),
+        "submits": submits,
+        "cases_per_submit": scenario.cases,
+        "wall_s": round(elapsed, 2),
+        "submits_per_s": round(submits / elapsed, 1) if elapsed > 0 else None,
+        "latency_ms": _latency_summary(latencies),
+        "piston_calls_per_submit": (
+            round(sum(n["executes"] for n in nodes) / submits, 2) if submits else None
+        ),
+        "piston_nodes": nodes,
+        "verdicts": dict(verdicts),
+        "failed_submits": dict(errors),
+        "rss_mb": {
+            "before": round(rss_before, 1),
+            "after": round(rss_after, 1),
+            "peak": round(_peak_rss_mb(), 1),
+        },
+    }
+
+
+def _shown(value: Any) -> Any:
+    # Values a scenario with too few successful submits couldn't measure.
+    return "-" if value is None else value
+
+
+def _print(report: dict[str, Any]) -> None:
+    latency = {key: _shown(value) for key, value in report["latency_ms"].items()}
+    rss = report["rss_mb"]
+    print(
+        f"{report['scenario']:<16} {report['submits']:>5} submits  "
+        f"{_shown(report['submits_per_s']):>7} /s  "
+        f"p50 {latency['p50']:>8} ms  p95 {latency['p95']:>8} ms  p99 {latency['p99']:>8} ms  "
+        f"piston/submit {_shown(report['piston_calls_per_submit']):>6}  "
+        f"rss {rss['before']}→{rss['after']} MB (peak {rss['peak']})  "
+        f"verdicts {report['verdicts']}  failed {report['failed_submits']}"
+    )
+
+
+async def _run(names: list[str], json_path: str | None) -> None:
+    # Everything through the fakes: no local Python pool, no shared cache.
+    settings.COMPILER_RUNTIME = "piston"
+    settings.PYTHON_POOL_SIZE = 0
+    settings.EXECUTION_CACHE_BACKEND = "memory"
+
+    reports = []
+    for name in names:
+        reports.append(await run_scenario(SCENARIOS[name]))
+        # Written after every scenario, so a later failure keeps what ran.
+        if json_path:
+            Path(json_path).write_text(json.dumps(reports, indent=2))
+        _print(reports[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="DSA grading benchmarks against a fake Piston.")
+    parser.add_argument("scenarios", nargs="*", metavar="SCENARIO", help="default: all")
+    parser.add_argument("--json", help="also write the reports to this file")
+    parser.add_argument("--list", action="store_true", help="list the scenarios and exit")
+    args = parser.parse_args()
+    if args.list:
+        for scenario in SCENARIOS.values():
+            print(f"{scenario.name:<16} {scenario.description}")
+        return
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)} (see --list)")
+    asyncio.run(_run(args.scenarios or list(SCENARIOS), args.json))
@@ -0,0 +1,73 @@
+"""
+Scripted grading loads for benchmarks.runner. Each candidate submits
+`submits` times, one after another, to the same `cases`-case question, in
+a language drawn round-robin from `languages`; all candidates start within
+`ramp_s` of each other, as at a synchronized interview start. `piston`
+holds one fake node's behaviour per Piston node.
+"""
+
+from dataclasses import dataclass
+
+from benchmarks.fake_piston import FakePistonConfig
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    description: str
+    candidates: int
+    cases: int
+    submits: int = 1
+    languages: tuple[str, ...] = ("python", "c++", "java", "javascript")
+    # Bytes of stdin per hidden case (echoed back as the expected output).
+    case_bytes: int = 256
+    ramp_s: float = 0.0
+    piston: tuple[FakePistonConfig, ...] = (FakePistonConfig(),)
+
+
+SCENARIOS: dict[str, Scenario] = {
+    s.name: s
+    for s in (
+        Scenario(
+            name="smoke",
+            description="Small and fast; what CI runs on every push.",
+            candidates=20,
+            cases=10,
+            submits=2,
+            piston=(FakePistonConfig(latency_ms=20.0),),
+        ),
+        Scenario(
+            name="interview-start",
+            description="200 candidates submitting 20-case questions at once.",
+            candidates=200,
+            cases=20,
+            ramp_s=2.0,
+        ),
+        Scenario(
+            name="flaky-node",
+            description="Two nodes, one answering 502 to 20% of executions.",
+            candidates=50,
+            cases=10,
+            submits=2,
+            piston=(
+                FakePistonConfig(latency_ms=20.0),
+                FakePistonConfig(latency_ms=20.0, failure_rate=0.2, seed=1),
+            ),
+        ),
+        Scenario(
+            name="large-output",
+            description="1% of runs print 4 MiB, against the per-case output cap.",
+            candidates=50,
+            cases=10,
+            case_bytes=64 * 1024,
+            piston=(FakePistonConfig(latency_ms=20.0, oversize_rate=0.01),),
+        ),
+        Scenario(
+            name="slow-sandbox",
+            description="Piston at 300 ms median with a long tail, capped at 32 jobs.",
+            candidates=100,
+            cases=15,
+            piston=(FakePistonConfig(latency_ms=300.0, latency_sigma=0.8, concurrency=32),),
+        ),
+    )
+}
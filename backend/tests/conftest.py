@@ -0,0 +1,158 @@
+"""
+Integration tests against a real PostgreSQL: the DSA submission path relies on
+row locks and conditional UPDATEs that only a real database gives meaning to.
+
+DATABASE_URL must name a disposable PostgreSQL database (CI runs a service
+container, see .github/workflows/backend-ci.yml); every test creates the schema
+if needed and empties every table first. Without one the tests are skipped.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+from app.config import settings
+from app.database import AsyncSessionLocal, Base, engine
+from app.interfaces.compiler_runtime import (
+    CompilerRuntimeInterface,
+    ExecutionResult,
+    RuntimeInfo,
+)
+from app.models.application import Application, CurrentRound, InterviewSession, InterviewStatus
+from app.models.dsa_question import DsaQuestion
+from app.models.interaction import DsaInteraction, ResumeConversation, ResumeQuestion
+from app.models.interview import CustomInterview, DsaTopic
+from app.models.organization import Organization
+from app.models.user import User
+
+
+@pytest.fixture(autouse=True)
+async def database() -> AsyncIterator[None]:
+    if not settings.DATABASE_URL.startswith("postgresql"):
+        pytest.skip("DATABASE_URL does not point at PostgreSQL")
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    yield
+    # Pooled connections belong to this test's event loop.
+    await engine.dispose()
+
+
+@dataclass
+class DsaRound:
+    session_id: int
+    interaction_id: int
+    question_id: int
+
+
+@pytest.fixture
+async def dsa_round() -> DsaRound:
+    """One candidate ONGOING in the DSA round of an interview, with a question assigned."""
+    now = datetime.now(UTC)
+    async with AsyncSessionLocal() as db:
+        candidate = User(username="candidate", email="candidate@example.com")
+        owner = User(username="org", email="org@example.com", is_organization=True)
+        db.add_all([candidate, owner])
+        await db.flush()
+        org = Organization(account_id=owner.id)
+        db.add(org)
+        await db.flush()
+        interview = CustomInterview(
+            org_id=org.id,
+            description="Backend engineer",
+            position="Backend Engineer",
+            experience="2 years",
+            submission_deadline=now,
+            start_time=now - timedelta(hours=1),
+            end_time=now + timedelta(hours=1),
+            dsa_score=50,
+            dev_score=50,
+        )
+        db.add(interview)
+        await db.flush()
+        topic = DsaTopic(interview_id=interview.id, topic="Arrays", difficulty="easy")
+        application = Application(user_id=candidate.id, interview_id=interview.id)
+        question = DsaQuestion(
+            problem_name="Echo",
+            topic="Arrays",
+            difficulty="easy",
+            description="Print the input.",
+            test_cases=[
+                {"stdin": "1\n", "expected_stdout": "1"},
+                {"stdin": "2\n", "expected_stdout": "2"},
+            ],
+        )
+        db.add_all([topic, application, question])
+        await db.flush()
+        session = InterviewSession(
+            application_id=application.id,
+            status=InterviewStatus.ONGOING.value,
+            current_round=CurrentRound.DSA.value,
+        )
+        db.add(session)
+        await db.flush()
+        interaction = DsaInteraction(
+            session_id=session.id, topic_id=topic.id, question_id=question.id
+        )
+        # A resume round to finish into, so /dsa/finish moves on to it.
+        conversation = ResumeConversation(session_id=session.id)
+        db.add_all([interaction, conversation])
+        await db.flush()
+        db.add(ResumeQuestion(conversation_id=conversation.id, question="Tell me about X."))
+        await db.commit()
+        return DsaRound(session.id, interaction.id, question.id)
+
+
+class GatedRuntime(CompilerRuntimeInterface):
+    """
+    A sandbox whose runs finish only when the test releases their source, so
+    tests decide which of several overlapping gradings ends first. Source
+    "echo" prints its stdin back (passes every case); anything else prints "1".
+    """
+
+    def __init__(self) -> None:
+        self.gates: dict[str, asyncio.Event] = {}
+        self.waiting: dict[str, asyncio.Event] = {}
+
+    def _gate(self, source: str) -> asyncio.Event:
+        self.waiting.setdefault(source, asyncio.Event())
+        return self.gates.setdefault(source, asyncio.Event())
+
+    async def started(self, source: str) -> None:
+        """Wait until a run of `source` is blocked on its gate."""
+        self._gate(source)
+        await asyncio.wait_for(self.waiting[source].wait(), 5)
+
+    def release(self, source: str) -> None:
+        self._gate(source).set()
+
+    async def execute(
+        self,
+        source_code: str,
+        language: str,  # noqa: ARG002
+        stdin: str = "",
+        run_timeout_ms: int | None = None,  # noqa: ARG002
+    ) -> ExecutionResult:
+        gate = self._gate(source_code)
+        self.waiting[source_code].set()
+        await gate.wait()
+        stdout = stdin.strip() if source_code == "echo" else "1"
+        return ExecutionResult(stdout=f"{stdout}\n", stderr="", exit_code=0, wall_time_ms=1)
+
+    async def list_runtimes(self) -> list[RuntimeInfo]:
+        return []
+
+
+@pytest.fixture
+def runtime(monkeypatch: pytest.MonkeyPatch) -> GatedRuntime:
+    gated = GatedRuntime()
+    monkeypatch.setattr(
+        "app.background.taskiq.tasks.dsa_execution.default_compiler_runtime", lambda: gated
+    )
+    return gated
@@ -0,0 +1,51 @@
+"""
+DSA question assignment (run_assign_dsa_questions) when the Redis picker is
+stale: a topic whose picked question was deleted since the picker's sets
+were built is assigned from the DB in the same run, not left empty.
+"""
+
+from collections.abc import Iterable, Mapping
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.background.taskiq.tasks.dsa_execution import run_assign_dsa_questions
+from app.database import AsyncSessionLocal
+from app.models.application import InterviewSession
+from app.models.interaction import DsaInteraction
+from app.utils import question_picker
+from tests.conftest import DsaRound
+
+
+async def test_topic_picked_a_deleted_question_is_assigned_from_the_db(
+    dsa_round: DsaRound, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(DsaInteraction))
+        await db.commit()
+    deleted_id = dsa_round.question_id + 1000
+    forgotten: list[set[tuple[str, str]]] = []
+
+    async def stale_pick(
+        db: AsyncSession,  # noqa: ARG001
+        wanted: Mapping[tuple[str, str], int],
+    ) -> dict[tuple[str, str], list[int]]:
+        return {group: [deleted_id] * n for group, n in wanted.items()}
+
+    async def forget(groups: Iterable[tuple[str, str]]) -> None:
+        forgotten.append(set(groups))
+
+    monkeypatch.setattr(question_picker, "pick", stale_pick)
+    monkeypatch.setattr(question_picker, "forget", forget)
+
+    assigned = await run_assign_dsa_questions(dsa_round.session_id)
+
+    assert len(assigned) == 1
+    assert forgotten == [{("Arrays", "easy")}]
+    async with AsyncSessionLocal() as db:
+        question_id = await db.scalar(select(DsaInteraction.question_id))
+        session = await db.get(InterviewSession, dsa_round.session_id)
+    assert question_id == dsa_round.question_id
+    assert session is not None
+    assert session.dsa_assigned_at is not None
@@ -0,0 +1,188 @@
+"""
+Overlapping DSA submits: the last SUBMITTED run wins whatever order grading
+finishes in, every run counts an attempt, and nothing is recorded once the
+session has left the DSA round (app.background.taskiq.tasks.dsa_execution).
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.background.taskiq.tasks.dsa_execution import run_evaluate_submission
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.application import InterviewSession, InterviewStatus
+from app.models.interaction import DsaInteraction
+from app.utils.interview_flow import transition_to_resume
+from app.utils.session_lifecycle import disqualify_if_stale
+from tests.conftest import DsaRound, GatedRuntime
+
+
+async def _interaction(interaction_id: int) -> DsaInteraction:
+    async with AsyncSessionLocal() as db:
+        interaction = await db.get(DsaInteraction, interaction_id)
+        assert interaction is not None
+        return interaction
+
+
+async def _lock_session(db: AsyncSession, session_id: int) -> InterviewSession:
+    """The session row FOR UPDATE, as /dsa/finish and disqualification take it."""
+    return (
+        await db.execute(
+            select(InterviewSession).where(InterviewSession.id == session_id).with_for_update()
+        )
+    ).scalar_one()
+
+
+async def _blocked_on_lock() -> None:
+    """Wait until some other connection is waiting for a row lock."""
+    async with AsyncSessionLocal() as db:
+        for _ in range(100):
+            waiting = await db.scalar(
+                text(
+                    "SELECT count(*) FROM pg_stat_activity "
+                    "WHERE wait_event_type = 'Lock' AND datname = current_database()"
+                )
+            )
+            if waiting:
+                return
+            await asyncio.sleep(0.05)
+    raise AssertionError("the recording write never waited for the session lock")
+
+
+async def test_newer_submission_wins_when_older_finishes_grading_last(
+    dsa_round: DsaRound, runtime: GatedRuntime
+) -> None:
+    older_at = datetime.utcnow()
+    newer_at = older_at + timedelta(seconds=1)
+    older = asyncio.create_task(
+        run_evaluate_submission(dsa_round.interaction_id, "print(1)", "python", older_at)
+    )
+    newer = asyncio.create_task(
+        run_evaluate_submission(dsa_round.interaction_id, "echo", "python", newer_at)
+    )
+    await runtime.started("print(1)")
+    await runtime.started("echo")
+
+    runtime.release("echo")
+    newer_summary = await newer
+    runtime.release("print(1)")
+    older_summary = await older
+
+    assert newer_summary["recorded"] is True
+    assert older_summary["recorded"] is False
+    assert older_summary["attempts"] == 2
+    stored = await _interaction(dsa_round.interaction_id)
+    assert stored.code == "echo"
+    assert stored.score == 10.0
+    assert stored.passed_cases == 2
+    assert stored.last_submitted_at == newer_at
+    assert stored.attempts == 2
+
+
+async def test_newer_submission_wins_when_it_finishes_grading_last(
+    dsa_round: DsaRound, runtime: GatedRuntime
+) -> None:
+    older_at = datetime.utcnow()
+    newer_at = older_at + timedelta(seconds=1)
+    older = asyncio.create_task(
+        run_evaluate_submission(dsa_round.interaction_id, "print(1)", "python", older_at)
+    )
+    newer = asyncio.create_task(
+        run_evaluate_submission(dsa_round.interaction_id, "echo", "python", newer_at)
+    )
+    await runtime.started("print(1)")
+    await runtime.started("echo")
+
+    runtime.release("print(1)")
+    older_summary = await older
+    runtime.release("echo")
+    newer_summary = await newer
+
+    assert older_summary["recorded"] is True
+    assert newer_summary["recorded"] is True
+    stored = await _interaction(dsa_round.interaction_id)
+    assert stored.code == "echo"
+    assert stored.score == 10.0
+    assert stored.last_submitted_at == newer_at
+    assert stored.attempts == 2
+
+
+async def test_submit_graded_after_finish_is_not_recorded(
+    dsa_round: DsaRound, runtime: GatedRuntime
+) -> None:
+    submit = asyncio.create_task(
+        run_evaluate_submission(dsa_round.interaction_id, "echo", "python", datetime.utcnow())
+    )
+    await runtime.started("echo")
+    async with AsyncSessionLocal() as db:
+        await transition_to_resume(await _lock_session(db, dsa_round.session_id), db)
+
+    runtime.release("echo")
+    summary = await submit
+
+    assert summary["recorded"] is False
+    assert summary["attempts"] == 0
+    stored = await _interaction(dsa_round.interaction_id)
+    assert stored.code is None
+    assert stored.attempts == 0
+
+
+async def test_submit_waiting_on_finish_is_not_recorded(
+    dsa_round: DsaRound, runtime: GatedRuntime
+) -> None:
+    submit = asyncio.create_task(
+        run_evaluate_submission(dsa_round.interaction_id, "echo", "python", datetime.utcnow())
+    )
+    await runtime.started("echo")
+    async with AsyncSessionLocal() as db:
+        # /dsa/finish holds the session row while the graded run's write
+        # arrives; the write must wait for it and then see the new round.
+        session = await _lock_session(db, dsa_round.session_id)
+        runtime.release("echo")
+        await _blocked_on_lock()
+        await transition_to_resume(session, db)
+    summary = await submit
+
+    assert summary["recorded"] is False
+    assert summary["attempts"] == 0
+    stored = await _interaction(dsa_round.interaction_id)
+    assert stored.code is None
+    assert stored.attempts == 0
+
+
+async def test_submit_waiting_on_disqualification_is_not_recorded(
+    dsa_round: DsaRound, runtime: GatedRuntime, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "IMMEDIATE_DISQUALIFICATION", True)
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(InterviewSession)
+            .where(InterviewSession.id == dsa_round.session_id)
+            .values(last_heartbeat_at=datetime.utcnow() - timedelta(hours=1))
+        )
+        await db.commit()
+    submit = asyncio.create_task(
+        run_evaluate_submission(dsa_round.interaction_id, "echo", "python", datetime.utcnow())
+    )
+    await runtime.started("echo")
+    async with AsyncSessionLocal() as db:
+        session = await _lock_session(db, dsa_round.session_id)
+        runtime.release("echo")
+        await _blocked_on_lock()
+        assert await disqualify_if_stale(session, db)
+    summary = await submit
+
+    assert summary["recorded"] is False
+    assert summary["attempts"] == 0
+    async with AsyncSessionLocal() as db:
+        status = await db.scalar(
+            select(InterviewSession.status).where(InterviewSession.id == dsa_round.session_id)
+        )
+    assert status == InterviewStatus.DISQUALIFIED.value
+    stored = await _interaction(dsa_round.interaction_id)
+    assert stored.code is None
+    assert stored.attempts == 0
@@ -0,0 +1,94 @@
+"""
+Redelivered asynchronous submits (run_evaluate_tracked_submission): a
+duplicate delivery leaves a submission another worker is grading alone, and
+only a claim older than DSA_SUBMISSION_LEASE_S is taken over.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.background.taskiq.tasks.dsa_execution import run_evaluate_tracked_submission
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.interaction import DsaInteraction, DsaSubmission, SubmissionStatus
+from tests.conftest import DsaRound, GatedRuntime
+
+
+async def _submission(interaction_id: int, status: SubmissionStatus) -> DsaSubmission:
+    async with AsyncSessionLocal() as db:
+        submission = DsaSubmission(
+            interaction_id=interaction_id,
+            source_code="echo",
+            language="python",
+            submitted_at=datetime.utcnow(),
+            status=status.value,
+        )
+        db.add(submission)
+        await db.commit()
+        return submission
+
+
+async def _stored(submission_id: int) -> DsaSubmission:
+    async with AsyncSessionLocal() as db:
+        submission = await db.get(DsaSubmission, submission_id)
+        assert submission is not None
+        return submission
+
+
+def _grade(submission: DsaSubmission) -> "asyncio.Task[dict[str, object]]":
+    return asyncio.create_task(
+        run_evaluate_tracked_submission(
+            submission.id,
+            submission.interaction_id,
+            submission.source_code,
+            submission.language,
+            submission.submitted_at,
+        )
+    )
+
+
+async def test_duplicate_delivery_does_not_grade_a_running_submission(
+    dsa_round: DsaRound, runtime: GatedRuntime
+) -> None:
+    submission = await _submission(dsa_round.interaction_id, SubmissionStatus.QUEUED)
+    first = _grade(submission)
+    await runtime.started("echo")
+
+    # Grading it again would block on the gate until the timeout.
+    assert await asyncio.wait_for(_grade(submission), 5) == {}
+    runtime.release("echo")
+    assert (await first)["recorded"] is True
+
+    stored = await _stored(submission.id)
+    assert stored.status == SubmissionStatus.DONE.value
+    async with AsyncSessionLocal() as db:
+        interaction = await db.get(DsaInteraction, dsa_round.interaction_id)
+    assert interaction is not None
+    assert interaction.attempts == 1
+
+
+async def test_running_submission_is_reclaimed_once_its_lease_expires(
+    dsa_round: DsaRound, runtime: GatedRuntime
+) -> None:
+    submission = await _submission(dsa_round.interaction_id, SubmissionStatus.RUNNING)
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(DsaSubmission)
+            .where(DsaSubmission.id == submission.id)
+            .values(
+                claimed_at=datetime.utcnow()
+                - timedelta(seconds=settings.DSA_SUBMISSION_LEASE_S + 60)
+            )
+        )
+        await db.commit()
+    runtime.release("echo")
+
+    summary = await _grade(submission)
+
+    assert summary["recorded"] is True
+    stored = await _stored(submission.id)
+    assert stored.status == SubmissionStatus.DONE.value
+    assert stored.claimed_at is not None
+    assert stored.claimed_at > datetime.utcnow() - timedelta(minutes=1)
@@ -425,8 +425,12 @@ export default function DsaPanel({
             <span
               style={{ display: "inline-flex", alignItems: "center", gap: 5 }}
             >
-              <ClockIcon /> {(selected.time_limit_ms / 1000).toFixed(1)}s per
-              case
+              <ClockIcon />{" "}
+              {(
+                (selected.time_limits_ms?.[editor.language] ??
+                  selected.time_limit_ms) / 1000
+              ).toFixed(1)}
+              s per case
             </span>
           </div>
 
@@ -69,6 +69,8 @@ export interface DsaRoundQuestion {
     expected_stdout: string;
   }> | null;
   time_limit_ms: number;
+  // Per language where calibrated; others use time_limit_ms.
+  time_limits_ms: Record<string, number> | null;
   attempts: number;
   score: number | null;
   passed_cases: number | null;